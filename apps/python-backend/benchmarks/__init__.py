@@ -0,0 +1,4 @@
+"""Performance benchmarks for ingestion and the query engine.
+
+Run with ``nox -s bench`` or ``python -m benchmarks.run``.
+"""
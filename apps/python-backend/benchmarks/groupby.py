@@ -0,0 +1,151 @@
+"""Micro-benchmark of single-core and multi-core QuerySpec aggregation.
+
+Compares ``QueryRunner``'s single ``groupby`` with
+:func:`city_data_backend.services.query_parallel.parallel_partial_aggregate`
+for increasing worker counts. The time of the parallel path includes encoding
+the columns and copying them to shared memory; the shared process pool is
+started by the first repetition, so the best time is that of a warm pool, as in
+a running server. The crossover point is what ``QUERY_PARALLEL_THRESHOLD_ROWS``
+should be set to.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_frame
+from city_data_backend.services.query_aggregation import finalize_partial
+from city_data_backend.services.query_parallel import parallel_partial_aggregate
+from city_data_backend.services.query_runner import QueryRunner
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from city_data_backend.models.dspy import QuerySpecDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROWS = 2_000_000
+DEFAULT_REPEAT = 3
+
+QUERY_SPEC: QuerySpecDict = {
+    "group_by": ["ward", "year"],
+    "metrics": [
+        {"agg": "sum", "column": "value"},
+        {"agg": "avg", "column": "value"},
+        {"agg": "max", "column": "value"},
+        {"agg": "count"},
+    ],
+}
+
+
+@dataclass
+class GroupbyMeasurement:
+    """Best time of one aggregation path and whether it matched the serial one."""
+
+    workers: int
+    best_s: float
+    identical: bool
+
+
+def serial_aggregate(frame: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate with ``QueryRunner``'s single-core ``groupby``."""
+    runner = QueryRunner.__new__(QueryRunner)
+    return runner._apply_group_and_metrics(frame, QUERY_SPEC)  # noqa: SLF001
+
+
+def parallel_aggregate(frame: pd.DataFrame, workers: int) -> pd.DataFrame:
+    """Aggregate with ``workers`` processes and finalize the merged partial."""
+    group_by = QUERY_SPEC["group_by"]
+    metrics = QUERY_SPEC["metrics"]
+    partial = parallel_partial_aggregate(frame, group_by, metrics, workers)
+    if partial is None:
+        msg = "The synthetic frame should always be shareable"
+        raise RuntimeError(msg)
+    return finalize_partial(partial, group_by, metrics)
+
+
+def run(
+    rows: int,
+    repeat: int,
+    worker_counts: Sequence[int],
+) -> list[GroupbyMeasurement]:
+    """Measure the serial path (``workers=1``) and each parallel worker count."""
+    frame = synthetic_frame(rows)
+    expected = serial_aggregate(frame)
+    timings: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        serial_aggregate(frame)
+        timings.append(time.perf_counter() - started)
+    results = [GroupbyMeasurement(1, min(timings), identical=True)]
+    for workers in worker_counts:
+        timings = []
+        actual = expected
+        for _ in range(repeat):
+            started = time.perf_counter()
+            actual = parallel_aggregate(frame, workers)
+            timings.append(time.perf_counter() - started)
+        try:
+            pd.testing.assert_frame_equal(actual, expected, check_exact=False)
+        except AssertionError:
+            identical = False
+        else:
+            identical = True
+        results.append(GroupbyMeasurement(workers, min(timings), identical))
+    return results
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Return parsed CLI arguments for the group-by micro-benchmark.
+
+    Parameters
+    ----------
+    argv:
+        Optional arguments to parse. When omitted, defaults to ``sys.argv``.
+
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare single-core and multi-core QuerySpec aggregation.",
+    )
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[2, max(2, os.cpu_count() or 2)],
+        help="Worker counts above 1 to measure besides the serial path",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Print the time of every worker count; fail if any result differs."""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    args = parse_args(argv)
+    results = run(
+        args.rows,
+        args.repeat,
+        sorted({count for count in args.workers if count > 1}),
+    )
+    for result in results:
+        logger.info(
+            "workers %3d  %8.4fs  identical=%s",
+            result.workers,
+            result.best_s,
+            result.identical,
+        )
+    return 0 if all(result.identical for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
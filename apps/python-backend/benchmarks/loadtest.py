@@ -0,0 +1,450 @@
+"""HTTP load generator for the REST interface.
+
+By default the harness seeds a synthetic dataset into a SQLite file, builds a
+``RestAPIInterface`` app in-process and drives it through ``httpx`` with an
+ASGI transport, so no server has to be started. ``--base-url`` points the same
+request mix at a running uvicorn deployment instead, which is how worker counts
+are sized before a rollout.
+
+Run with ``python -m benchmarks.loadtest --concurrency 16 --requests 2000``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import httpx
+
+from benchmarks.suite import INTERACTIVE_QUESTIONS, QUERY_SHAPES
+from benchmarks.synthetic import write_city_csv
+from city_data_backend.database import configure_engine, session_scope
+from city_data_backend.services.datasets import DatasetRepository, init_database
+from city_data_backend.services.dspy_program import (
+    persist_compiled_program,
+    set_active_program,
+)
+from city_data_backend.utils.settings import get_auth_settings, reset_auth_settings
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+    from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIX: dict[str, int] = {
+    "interactive": 5,
+    "datasets": 3,
+    "experiments_list": 1,
+    "experiments_create": 1,
+}
+DEFAULT_TOKEN = "loadtest-token"  # noqa: S105 - only used for the in-process app
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class RequestOutcome:
+    """Result of a single request."""
+
+    endpoint: str
+    status: int | None
+    latency_s: float
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """True for 2xx responses."""
+        return self.error is None and self.status is not None and self.status < 400  # noqa: PLR2004
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Return the nearest-rank percentile of ``values`` (0.0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+@dataclass
+class LoadTestReport:
+    """Latency distribution, throughput and error rate of a load test run."""
+
+    outcomes: list[RequestOutcome] = field(default_factory=list[RequestOutcome])
+    elapsed_s: float = 0.0
+    concurrency: int = 1
+
+    def _stats(self, outcomes: list[RequestOutcome]) -> dict[str, Any]:
+        latencies = [outcome.latency_s for outcome in outcomes]
+        errors = sum(1 for outcome in outcomes if not outcome.ok)
+        stats: dict[str, Any] = {
+            "requests": len(outcomes),
+            "errors": errors,
+            "error_rate": errors / len(outcomes) if outcomes else 0.0,
+            "throughput_rps": len(outcomes) / self.elapsed_s if self.elapsed_s else 0,
+            "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        }
+        for pct in PERCENTILES:
+            stats[f"p{pct}_ms"] = percentile(latencies, pct) * 1000
+        return stats
+
+    def summary(self) -> dict[str, Any]:
+        """Return overall and per-endpoint statistics."""
+        endpoints = sorted({outcome.endpoint for outcome in self.outcomes})
+        return {
+            "concurrency": self.concurrency,
+            "elapsed_s": self.elapsed_s,
+            "overall": self._stats(self.outcomes),
+            "endpoints": {
+                endpoint: self._stats(
+                    [o for o in self.outcomes if o.endpoint == endpoint],
+                )
+                for endpoint in endpoints
+            },
+        }
+
+    def format_table(self) -> str:
+        """Return a human-readable latency table."""
+        summary = self.summary()
+        header = (
+            f"{'endpoint':<20} {'reqs':>6} {'rps':>8} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+        )
+        rows = [*summary["endpoints"].items(), ("TOTAL", summary["overall"])]
+        lines = [
+            f"{self.concurrency} concurrent clients, {summary['elapsed_s']:.2f}s",
+            header,
+        ]
+        lines.extend(
+            f"{name:<20} {stats['requests']:>6} {stats['throughput_rps']:>8.1f} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+            f"{stats['p99_ms']:>8.1f} {stats['error_rate']:>7.1%}"
+            for name, stats in rows
+        )
+        return "\n".join(lines)
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """Parse ``name=weight,...`` into a request mix."""
+    mix: dict[str, int] = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX:
+            msg = f"Unknown endpoint '{name}'; expected one of {sorted(DEFAULT_MIX)}"
+            raise ValueError(msg)
+        mix[name] = int(weight or 1)
+    if not any(mix.values()):
+        msg = "The request mix needs at least one positive weight"
+        raise ValueError(msg)
+    return mix
+
+
+def build_request(
+    endpoint: str,
+    dataset_id: int,
+    rng: random.Random,
+) -> tuple[str, str, dict[str, Any] | None]:
+    """Return ``(method, path, json_body)`` for one request of the mix."""
+    if endpoint == "interactive":
+        question = rng.choice(INTERACTIVE_QUESTIONS)
+        return (
+            "POST",
+            "/dspy/interactive",
+            {
+                "dataset_id": dataset_id,
+                "question": question,
+            },
+        )
+    if endpoint == "experiments_create":
+        return (
+            "POST",
+            "/experiments",
+            {
+                "goal_description": "区ごとの人口推移を比較する",
+                "dataset_ids": [dataset_id],
+            },
+        )
+    if endpoint == "experiments_list":
+        return "GET", "/experiments", None
+    return "GET", "/datasets", None
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    dataset_id: int,
+    mix: dict[str, int],
+    requests: int = 500,
+    concurrency: int = 8,
+    duration_s: float | None = None,
+    seed: int = 0,
+) -> LoadTestReport:
+    """Send the request mix with ``concurrency`` workers.
+
+    The run stops after ``requests`` requests, or after ``duration_s`` seconds
+    when a duration is given.
+    """
+    rng = random.Random(seed)  # noqa: S311 - reproducible request mix
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    report = LoadTestReport(concurrency=concurrency)
+    issued = 0
+    started = time.perf_counter()
+    deadline = started + duration_s if duration_s else None
+
+    def _next_endpoint() -> str | None:
+        nonlocal issued
+        if deadline is not None:
+            if time.perf_counter() >= deadline:
+                return None
+        elif issued >= requests:
+            return None
+        issued += 1
+        return rng.choices(names, weights)[0]
+
+    async def _worker() -> None:
+        while (endpoint := _next_endpoint()) is not None:
+            method, path, body = build_request(endpoint, dataset_id, rng)
+            request_started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+            except httpx.HTTPError as exc:
+                report.outcomes.append(
+                    RequestOutcome(
+                        endpoint,
+                        None,
+                        time.perf_counter() - request_started,
+                        f"{type(exc).__name__}: {exc}",
+                    ),
+                )
+                continue
+            report.outcomes.append(
+                RequestOutcome(
+                    endpoint,
+                    response.status_code,
+                    time.perf_counter() - request_started,
+                ),
+            )
+
+    await asyncio.gather(*(_worker() for _ in range(max(1, concurrency))))
+    report.elapsed_s = time.perf_counter() - started
+    return report
+
+
+def prepare_in_process_app(workdir: Path, rows: int) -> tuple[FastAPI, int, str]:
+    """Seed a SQLite database and build the REST app against it.
+
+    An active compiled-program artifact with valid query specs for the seeded
+    dataset is registered so that ``/dspy/interactive`` exercises the compiled
+    path instead of the sample artifact shipped under ``dspy/``. Returns the
+    app, the seeded dataset id and the bearer token to send.
+    """
+    from city_data_backend.interfaces.restapi import RestAPIInterface
+
+    configure_engine(f"sqlite:///{workdir / 'loadtest.db'}")
+    csv_path = write_city_csv(workdir / "loadtest.csv", rows)
+    with session_scope() as session:
+        init_database(session)
+        dataset = DatasetRepository(session).import_csv(
+            category_slug="benchmark",
+            dataset_slug="loadtest",
+            csv_path=csv_path,
+            dataset_name="Load test data",
+            description="Synthetic Kawasaki-style load test data",
+            year=None,
+        )
+        trainset = [
+            {
+                "question": question,
+                "dataset_meta": {"id": dataset.id},
+                "query_spec": QUERY_SHAPES[shape],
+            }
+            for question, shape in zip(
+                INTERACTIVE_QUESTIONS,
+                ("filter_eq", "group_by_ward_year_metric", "group_by_ward"),
+                strict=True,
+            )
+        ]
+        artifact = persist_compiled_program(
+            "loadtest",
+            trainset,
+            metric=None,
+            session=session,
+            base_dir=workdir,
+        )
+        set_active_program(artifact.id, active=True, session=session)
+    if not get_auth_settings().api_token:
+        os.environ["API_TOKEN"] = DEFAULT_TOKEN
+        reset_auth_settings()
+    token = get_auth_settings().api_token or DEFAULT_TOKEN
+    return RestAPIInterface().app, dataset.id, token
+
+
+@contextmanager
+def py_spy_flamegraph(output: Path | None, rate: int = 100) -> Iterator[None]:
+    """Record a flamegraph of this process with py-spy while the block runs.
+
+    Does nothing without ``output``. py-spy needs ptrace permission (root or
+    ``kernel.yama.ptrace_scope=0``); when it cannot start the run continues
+    unprofiled. Profile a uvicorn server by running py-spy against its PID.
+    """
+    if output is None:
+        yield
+        return
+    try:
+        profiler = subprocess.Popen(  # noqa: S603
+            [  # noqa: S607
+                "py-spy",
+                "record",
+                "--pid",
+                str(os.getpid()),
+                "--rate",
+                str(rate),
+                "--output",
+                str(output),
+                "--format",
+                "flamegraph",
+            ],
+        )
+    except OSError as exc:
+        logger.warning("Could not start py-spy, continuing unprofiled: %s", exc)
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.send_signal(signal.SIGINT)
+        profiler.wait()
+        logger.info("Wrote flamegraph to %s", output)
+
+
+async def _run_cli(args: argparse.Namespace, workdir: Path) -> LoadTestReport:
+    mix = parse_mix(args.mix)
+    if args.base_url:
+        token = args.token or os.getenv("API_TOKEN", "")
+        client = httpx.AsyncClient(
+            base_url=args.base_url,
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=args.timeout,
+        )
+        dataset_id = args.dataset_id
+    else:
+        app, dataset_id, token = prepare_in_process_app(workdir, args.rows)
+        client = httpx.AsyncClient(
+            # Surface unhandled app errors as 500s, like a real server would.
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+            base_url="http://loadtest",
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=args.timeout,
+        )
+    async with client:
+        with py_spy_flamegraph(args.flamegraph):
+            return await run_load(
+                client,
+                dataset_id,
+                mix,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                duration_s=args.duration,
+                seed=args.seed,
+            )
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Return parsed CLI arguments for a load test.
+
+    Parameters
+    ----------
+    argv:
+        Optional arguments to parse. When omitted, defaults to ``sys.argv``.
+
+    """
+    parser = argparse.ArgumentParser(
+        description="Drive /dspy/interactive, /experiments and /datasets with a "
+        "weighted request mix and report latency percentiles.",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=None,
+        help="Run for this many seconds instead of a fixed request count",
+    )
+    parser.add_argument(
+        "--mix",
+        default=",".join(f"{name}={weight}" for name, weight in DEFAULT_MIX.items()),
+        help="Weighted endpoints, e.g. interactive=5,datasets=3",
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=10_000,
+        help="Rows in the seeded dataset for the in-process app",
+    )
+    parser.add_argument(
+        "--base-url",
+        dest="base_url",
+        default=None,
+        help="Target a running server instead of the in-process app",
+    )
+    parser.add_argument(
+        "--dataset-id",
+        dest="dataset_id",
+        type=int,
+        default=1,
+        help="Dataset used with --base-url",
+    )
+    parser.add_argument(
+        "--token",
+        default=None,
+        help="Bearer token used with --base-url (default: $API_TOKEN)",
+    )
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Write the summary as JSON",
+    )
+    parser.add_argument(
+        "--flamegraph",
+        type=Path,
+        default=None,
+        help="Record a py-spy flamegraph SVG of the run",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run a load test and report latency, throughput and errors."""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="city-loadtest-") as tmp:
+        report = asyncio.run(_run_cli(args, Path(tmp)))
+    logger.info("%s", report.format_table())
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report.summary(), indent=2), "utf-8")
+        logger.info("Wrote load test summary to %s", args.output)
+    return 1 if report.summary()["overall"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Micro-benchmark of ``order_by`` + ``limit`` over large results.
+
+Compares :func:`city_data_backend.services.query_ordering.sort_and_limit`,
+which partitions the leading key before sorting, with a full stable sort
+followed by ``head``. Both must return identical frames, ties included.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from benchmarks.synthetic import synthetic_frame
+from city_data_backend.services.query_ordering import sort_and_limit
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROWS = 1_000_000
+DEFAULT_REPEAT = 5
+DEFAULT_LIMIT = 20
+
+# (columns, ascending) pairs: one key with many ties, then a multi-key order.
+ORDERS: dict[str, tuple[list[str], list[bool]]] = {
+    "value_desc": (["value"], [False]),
+    "year_value": (["year", "value", "town_code"], [False, True, True]),
+}
+
+
+@dataclass
+class OrderingMeasurement:
+    """Best time of the full sort and the top-k path for one order."""
+
+    order: str
+    full_sort_s: float
+    top_k_s: float
+    identical: bool
+
+
+def full_sort(
+    frame: pd.DataFrame,
+    columns: list[str],
+    ascending: list[bool],
+    limit: int,
+) -> pd.DataFrame:
+    """Sort every row with a stable sort and keep the first ``limit``."""
+    return frame.sort_values(by=columns, ascending=ascending, kind="stable").head(
+        limit,
+    )
+
+
+def _best(func: Callable[[], pd.DataFrame], repeat: int) -> tuple[float, pd.DataFrame]:
+    timings: list[float] = []
+    result = func()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def run(
+    rows: int,
+    repeat: int,
+    limit: int = DEFAULT_LIMIT,
+) -> list[OrderingMeasurement]:
+    """Measure both paths for every entry of :data:`ORDERS`."""
+    frame = synthetic_frame(rows)
+    results: list[OrderingMeasurement] = []
+    for name, (columns, ascending) in ORDERS.items():
+        full_s, expected = _best(
+            lambda columns=columns, ascending=ascending: full_sort(
+                frame,
+                columns,
+                ascending,
+                limit,
+            ),
+            repeat,
+        )
+        top_k_s, actual = _best(
+            lambda columns=columns, ascending=ascending: sort_and_limit(
+                frame,
+                columns,
+                ascending,
+                limit,
+            ),
+            repeat,
+        )
+        results.append(
+            OrderingMeasurement(name, full_s, top_k_s, expected.equals(actual)),
+        )
+    return results
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Return parsed CLI arguments for the ordering micro-benchmark.
+
+    Parameters
+    ----------
+    argv:
+        Optional arguments to parse. When omitted, defaults to ``sys.argv``.
+
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare full sorts with top-k selection for order_by + limit.",
+    )
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Print both timings per order; fail if the results ever differ."""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    args = parse_args(argv)
+    results = run(args.rows, args.repeat, args.limit)
+    for result in results:
+        logger.info(
+            "%-12s full sort %8.4fs  top-k %8.4fs  identical=%s",
+            result.order,
+            result.full_sort_s,
+            result.top_k_s,
+            result.identical,
+        )
+    return 0 if all(result.identical for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""CLI entrypoint for the benchmark suite.
+
+Results are written as JSON (by default to ``benchmarks/results/``) and, when
+a baseline file exists, compared case by case against it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from benchmarks.suite import (
+    DEFAULT_REPEAT,
+    DEFAULT_SIZES,
+    DEFAULT_THRESHOLD,
+    FULL_SIZES,
+    compare_to_baseline,
+    format_comparison,
+    run_suite,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+DEFAULT_RESULTS_DIR = BENCHMARK_DIR / "results"
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Return parsed CLI arguments for a benchmark run.
+
+    Parameters
+    ----------
+    argv:
+        Optional arguments to parse. When omitted, defaults to ``sys.argv``.
+
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark CSV ingestion, QueryRunner and the interactive "
+        "pipeline on synthetic city datasets.",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_SIZES),
+        help="Dataset sizes in rows (default: 10k and 100k)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Run every size from 10k up to 10M rows",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="Repetitions per query case",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Result JSON path (default: benchmarks/results/<commit>.json)",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="Baseline JSON to compare against",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Also write the results to the baseline path",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Relative slowdown reported as a regression (default: 0.10)",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit with status 1 when any case regresses",
+    )
+    parser.add_argument(
+        "--workdir",
+        type=Path,
+        default=None,
+        help="Directory for generated CSV and SQLite files (default: temp dir)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the suite, store results and compare them with the baseline."""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    args = parse_args(argv)
+    sizes = list(FULL_SIZES) if args.full else args.sizes
+
+    with tempfile.TemporaryDirectory(prefix="city-bench-") as tmp:
+        workdir = args.workdir or Path(tmp)
+        run = run_suite(sizes, workdir, repeat=args.repeat)
+    payload = run.to_dict()
+
+    output = args.output or DEFAULT_RESULTS_DIR / f"{run.commit or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    logger.info("Wrote %s benchmark results to %s", len(run.results), output)
+
+    exit_code = 0
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        comparisons = compare_to_baseline(payload, baseline)
+        logger.info(
+            "Compared with baseline %s (commit %s)\n%s",
+            args.baseline,
+            baseline.get("commit"),
+            format_comparison(comparisons, args.threshold),
+        )
+        regressed = [c for c in comparisons if c.is_regression(args.threshold)]
+        if regressed and args.fail_on_regression:
+            exit_code = 1
+    else:
+        logger.info("No baseline at %s; skipping comparison", args.baseline)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        logger.info("Saved baseline to %s", args.baseline)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""Startup-time benchmarks based on ``python -X importtime``.
+
+Every target is imported in a fresh interpreter so module caches from the
+benchmark process do not hide import costs. Besides the cumulative import time,
+the set of loaded modules is checked against :data:`HEAVY_MODULES` to catch
+eager imports of frameworks the entry point does not need.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Entry point name -> module imported at startup.
+STARTUP_TARGETS: dict[str, str] = {
+    "main": "city_data_backend.main",
+    "cli": "city_data_backend.interfaces.cli",
+    "worker": "city_data_backend.worker",
+    "load_csv": "scripts.load_csv",
+}
+
+HEAVY_MODULES = ("fastapi", "uvicorn", "fastmcp", "pandas", "sqlalchemy")
+
+# Heavy modules each entry point may legitimately import at startup.
+ALLOWED_HEAVY: dict[str, frozenset[str]] = {
+    "main": frozenset(),
+    "cli": frozenset(),
+    "worker": frozenset({"sqlalchemy"}),
+    "load_csv": frozenset({"sqlalchemy"}),
+}
+
+
+def _run_python(args: Sequence[str]) -> subprocess.CompletedProcess[str]:
+    env = dict(os.environ)
+    paths = [str(PROJECT_ROOT / "src"), str(PROJECT_ROOT), env.get("PYTHONPATH")]
+    env["PYTHONPATH"] = os.pathsep.join(path for path in paths if path)
+    return subprocess.run(  # noqa: S603 - runs this interpreter on fixed modules
+        [sys.executable, *args],
+        capture_output=True,
+        check=True,
+        cwd=PROJECT_ROOT,
+        env=env,
+        text=True,
+    )
+
+
+def import_time_s(module: str) -> float:
+    """Return the cumulative import time of ``module`` in a fresh interpreter."""
+    completed = _run_python(["-X", "importtime", "-c", f"import {module}"])
+    for line in completed.stderr.splitlines():
+        # Lines look like "import time: <self us> | <cumulative us> | <module>".
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) == 3 and parts[2].strip() == module:  # noqa: PLR2004
+            return int(parts[1]) / 1_000_000
+    msg = f"No importtime entry for {module}"
+    raise RuntimeError(msg)
+
+
+def loaded_heavy_modules(module: str) -> set[str]:
+    """Return which of :data:`HEAVY_MODULES` importing ``module`` loads."""
+    code = f"import sys, {module}; print('\\n'.join(sys.modules))"
+    loaded = set(_run_python(["-c", code]).stdout.split())
+    return {name for name in HEAVY_MODULES if name in loaded}
+
+
+def unexpected_heavy_modules() -> dict[str, set[str]]:
+    """Return heavy modules imported by entry points that should not need them."""
+    unexpected: dict[str, set[str]] = {}
+    for name, module in STARTUP_TARGETS.items():
+        extra = loaded_heavy_modules(module) - ALLOWED_HEAVY[name]
+        if extra:
+            unexpected[name] = extra
+    return unexpected
+
+
+def measure_startup(repeat: int) -> dict[str, list[float]]:
+    """Return ``repeat`` import-time samples per startup target."""
+    return {
+        name: [import_time_s(module) for _ in range(repeat)]
+        for name, module in STARTUP_TARGETS.items()
+    }
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Return parsed CLI arguments for the startup benchmark.
+
+    Parameters
+    ----------
+    argv:
+        Optional arguments to parse. When omitted, defaults to ``sys.argv``.
+
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure entry point import times with -X importtime.",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per target")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Print import times and fail when an entry point imports heavy modules."""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    args = parse_args(argv)
+    for name, timings in measure_startup(args.repeat).items():
+        logger.info("%-10s %8.3fs (min of %d)", name, min(timings), len(timings))
+    unexpected = unexpected_heavy_modules()
+    for name, modules in unexpected.items():
+        logger.error("%s imports %s at startup", name, ", ".join(sorted(modules)))
+    return 1 if unexpected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""Benchmark cases and baseline comparison for the query engine."""
+
+from __future__ import annotations
+
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+from benchmarks.startup import measure_startup
+from benchmarks.synthetic import write_city_csv
+from city_data_backend.database import configure_engine, session_scope
+from city_data_backend.models.dspy import InteractiveRequest
+from city_data_backend.services.datasets import DatasetRepository, init_database
+from city_data_backend.services.dspy_program import (
+    CompiledInteractiveProgram,
+    InteractiveAnalysisProgram,
+)
+from city_data_backend.services.query_runner import QueryRunner
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from pathlib import Path
+
+DEFAULT_SIZES = (10_000, 100_000)
+FULL_SIZES = (10_000, 100_000, 1_000_000, 10_000_000)
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.10
+
+QUERY_SHAPES: dict[str, dict[str, Any]] = {
+    "count_all": {
+        "filters": [],
+        "group_by": [],
+        "metrics": [{"agg": "count", "column": None}],
+        "order_by": [],
+    },
+    "filter_eq": {
+        "filters": [{"column": "year", "op": "eq", "value": 2023}],
+        "group_by": [],
+        "metrics": [{"agg": "sum", "column": "value"}],
+        "order_by": [],
+    },
+    "filter_range": {
+        "filters": [
+            {"column": "year", "op": "gte", "value": 2010},
+            {"column": "year", "op": "lt", "value": 2020},
+            {"column": "month", "op": "lte", "value": 6},
+        ],
+        "group_by": [],
+        "metrics": [
+            {"agg": "avg", "column": "value"},
+            {"agg": "max", "column": "value"},
+        ],
+        "order_by": [],
+    },
+    "filter_multi": {
+        "filters": [
+            {"column": "year", "op": "gte", "value": 2005},
+            {"column": "year", "op": "lt", "value": 2020},
+            {"column": "ward", "op": "eq", "value": "中原区"},
+            {"column": "metric", "op": "eq", "value": "population"},
+        ],
+        "group_by": [],
+        "metrics": [{"agg": "sum", "column": "value"}],
+        "order_by": [],
+    },
+    "filter_in": {
+        "filters": [
+            {"column": "ward", "op": "in", "value": ["川崎区", "幸区", "中原区"]},
+            {"column": "value", "op": "between", "value": [100, 500]},
+        ],
+        "group_by": ["ward"],
+        "metrics": [{"agg": "count", "column": None}],
+        "order_by": [],
+    },
+    "group_by_ward": {
+        "filters": [],
+        "group_by": ["ward"],
+        "metrics": [{"agg": "sum", "column": "value"}],
+        "order_by": [{"column": "ward", "direction": "asc"}],
+    },
+    "group_by_ward_year_metric": {
+        "filters": [],
+        "group_by": ["ward", "year", "metric"],
+        "metrics": [
+            {"agg": "count", "column": None},
+            {"agg": "avg", "column": "value"},
+            {"agg": "min", "column": "value"},
+            {"agg": "max", "column": "value"},
+        ],
+        "order_by": [],
+    },
+    "top_k": {
+        "filters": [{"column": "metric", "op": "eq", "value": "population"}],
+        "group_by": ["town_code"],
+        "metrics": [{"agg": "sum", "column": "value"}],
+        "order_by": [{"column": "value", "direction": "desc"}],
+        "limit": 20,
+    },
+}
+
+INTERACTIVE_QUESTIONS: tuple[str, ...] = (
+    "2023年の区ごとの合計",
+    "年度別の平均",
+    "区ごとの最大",
+)
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings for one benchmark case at one dataset size."""
+
+    name: str
+    rows: int
+    timings: list[float]
+
+    @property
+    def key(self) -> str:
+        """Identifier used to match results against a baseline."""
+        return f"{self.name}[{self.rows}]"
+
+    @property
+    def median_s(self) -> float:
+        """Median wall time in seconds."""
+        return statistics.median(self.timings)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable representation."""
+        return {
+            "name": self.name,
+            "rows": self.rows,
+            "repeat": len(self.timings),
+            "min_s": min(self.timings),
+            "median_s": self.median_s,
+            "mean_s": statistics.fmean(self.timings),
+            "rows_per_s": self.rows / self.median_s if self.median_s else None,
+        }
+
+
+@dataclass
+class Comparison:
+    """Change of one benchmark case relative to the baseline."""
+
+    key: str
+    baseline_s: float
+    current_s: float
+
+    @property
+    def ratio(self) -> float:
+        """Current median divided by the baseline median."""
+        return self.current_s / self.baseline_s if self.baseline_s else float("inf")
+
+    def is_regression(self, threshold: float) -> bool:
+        """Return True when the case slowed down by more than ``threshold``."""
+        return self.ratio > 1 + threshold
+
+
+@dataclass
+class BenchmarkRun:
+    """All results of one benchmark run plus environment metadata."""
+
+    results: list[BenchmarkResult] = field(default_factory=list)
+    commit: str | None = None
+    created_at: str = field(default_factory=lambda: datetime.now(UTC).isoformat())
+    python: str = field(default_factory=platform.python_version)
+    machine: str = field(default_factory=platform.platform)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable representation."""
+        payload = asdict(self)
+        payload["results"] = [result.to_dict() for result in self.results]
+        return payload
+
+
+def current_commit() -> str | None:
+    """Return the short hash of HEAD, or None outside a git checkout."""
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def _measure(func: Callable[[], object], repeat: int) -> list[float]:
+    timings: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run_size(
+    rows: int,
+    workdir: Path,
+    repeat: int = DEFAULT_REPEAT,
+) -> list[BenchmarkResult]:
+    """Benchmark ingestion, every query shape and the interactive pipeline."""
+    csv_path = write_city_csv(workdir / f"city_{rows}.csv", rows)
+    configure_engine(f"sqlite:///{workdir / f'bench_{rows}.db'}")
+    results: list[BenchmarkResult] = []
+
+    with session_scope() as session:
+        init_database(session)
+        repo = DatasetRepository(session)
+        dataset_ids: list[int] = []
+
+        def _import() -> None:
+            dataset = repo.import_csv(
+                category_slug="benchmark",
+                dataset_slug=f"city_{rows}",
+                csv_path=csv_path,
+                dataset_name=f"Synthetic city data ({rows} rows)",
+                description="Synthetic Kawasaki-style benchmark data",
+                year=None,
+                index_columns=["year", "ward_code"],
+            )
+            dataset_ids.append(dataset.id)
+
+        # A second import would be skipped by the fingerprint, so time it once.
+        results.append(BenchmarkResult("import_csv", rows, _measure(_import, 1)))
+        session.commit()
+        dataset_id = dataset_ids[0]
+
+        runner = QueryRunner(session)
+        for shape, spec in QUERY_SHAPES.items():
+            timings = _measure(lambda spec=spec: runner.run(dataset_id, spec), repeat)
+            results.append(BenchmarkResult(f"query_runner.{shape}", rows, timings))
+
+        program = InteractiveAnalysisProgram(
+            repo,
+            runner=runner,
+            compiled_program=CompiledInteractiveProgram(version="bench", trainset=[]),
+        )
+        for position, question in enumerate(INTERACTIVE_QUESTIONS):
+            request = InteractiveRequest(dataset_id=dataset_id, question=question)
+            timings = _measure(lambda request=request: program.run(request), repeat)
+            results.append(BenchmarkResult(f"interactive.q{position}", rows, timings))
+    return results
+
+
+def run_suite(
+    sizes: Iterable[int],
+    workdir: Path,
+    repeat: int = DEFAULT_REPEAT,
+) -> BenchmarkRun:
+    """Run the startup cases and every benchmark case for each dataset size."""
+    run = BenchmarkRun(commit=current_commit())
+    for name, timings in measure_startup(repeat).items():
+        run.results.append(BenchmarkResult(f"startup.{name}", 0, timings))
+    for rows in sizes:
+        run.results.extend(run_size(rows, workdir, repeat))
+    return run
+
+
+def compare_to_baseline(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+) -> list[Comparison]:
+    """Pair up cases present in both runs by name and size."""
+    baseline_medians = {
+        f"{result['name']}[{result['rows']}]": result["median_s"]
+        for result in baseline.get("results", [])
+    }
+    comparisons: list[Comparison] = []
+    for result in current.get("results", []):
+        key = f"{result['name']}[{result['rows']}]"
+        if key in baseline_medians:
+            comparisons.append(
+                Comparison(key, baseline_medians[key], result["median_s"]),
+            )
+    return comparisons
+
+
+def format_comparison(comparisons: list[Comparison], threshold: float) -> str:
+    """Return a table of per-case changes, flagging regressions."""
+    lines = [f"{'case':<48} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for comparison in comparisons:
+        flag = "  REGRESSION" if comparison.is_regression(threshold) else ""
+        lines.append(
+            f"{comparison.key:<48} {comparison.baseline_s:>9.4f}s "
+            f"{comparison.current_s:>9.4f}s {comparison.ratio - 1:>+7.1%}{flag}",
+        )
+    return "\n".join(lines)
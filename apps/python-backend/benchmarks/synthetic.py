@@ -0,0 +1,73 @@
+"""Synthetic Kawasaki-style datasets for benchmarks.
+
+Rows enumerate ward x metric x year x month x town combinations so that every
+size has realistic group cardinalities: 7 wards, a handful of metrics, 25 years
+and a town dimension that grows with the row count.
+"""
+
+from __future__ import annotations
+
+import csv
+import random
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+KAWASAKI_WARDS: tuple[tuple[str, str], ...] = (
+    ("14131", "川崎区"),
+    ("14132", "幸区"),
+    ("14133", "中原区"),
+    ("14134", "高津区"),
+    ("14135", "多摩区"),
+    ("14136", "宮前区"),
+    ("14137", "麻生区"),
+)
+METRICS: tuple[str, ...] = (
+    "population",
+    "households",
+    "births",
+    "deaths",
+    "move_in",
+    "move_out",
+)
+FIRST_YEAR = 2000
+YEAR_COUNT = 25
+MONTH_COUNT = 12
+HEADER = ("year", "month", "ward_code", "ward", "town_code", "metric", "value")
+
+
+def synthetic_row(index: int, rng: random.Random) -> tuple[object, ...]:
+    """Return the ``index``-th row of the synthetic dataset."""
+    ward_code, ward = KAWASAKI_WARDS[index % len(KAWASAKI_WARDS)]
+    index //= len(KAWASAKI_WARDS)
+    metric = METRICS[index % len(METRICS)]
+    index //= len(METRICS)
+    year = FIRST_YEAR + index % YEAR_COUNT
+    index //= YEAR_COUNT
+    month = 1 + index % MONTH_COUNT
+    town = index // MONTH_COUNT
+    value = rng.randint(0, 50_000) if metric == "population" else rng.randint(0, 900)
+    return (year, month, ward_code, ward, f"{ward_code}{town:04d}", metric, value)
+
+
+def write_city_csv(path: Path, rows: int, seed: int = 0) -> Path:
+    """Write a deterministic synthetic CSV with ``rows`` data rows."""
+    rng = random.Random(seed)  # noqa: S311 - reproducible benchmark data
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(synthetic_row(index, rng) for index in range(rows))
+    return path
+
+
+def synthetic_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Return the synthetic benchmark dataset as an in-memory frame."""
+    rng = random.Random(seed)  # noqa: S311 - reproducible benchmark data
+    return pd.DataFrame(
+        [synthetic_row(index, rng) for index in range(rows)],
+        columns=list(HEADER),
+    )
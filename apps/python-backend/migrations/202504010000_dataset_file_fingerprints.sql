@@ -0,0 +1,8 @@
+-- Migration: add content fingerprints to dataset_files for incremental re-import
+BEGIN;
+ALTER TABLE dataset_files ADD COLUMN size_bytes BIGINT;
+ALTER TABLE dataset_files ADD COLUMN mtime FLOAT;
+ALTER TABLE dataset_files ADD COLUMN content_hash VARCHAR(64);
+ALTER TABLE dataset_files ADD COLUMN updated_at DATETIME;
+CREATE INDEX IF NOT EXISTS idx_dataset_files_dataset_path ON dataset_files(dataset_id, path);
+COMMIT;
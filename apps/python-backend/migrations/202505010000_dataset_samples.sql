@@ -0,0 +1,19 @@
+-- Migration: stratified reservoir samples for approximate queries
+BEGIN;
+CREATE TABLE IF NOT EXISTS dataset_sample_strata (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dataset_id INTEGER NOT NULL REFERENCES datasets(id),
+    stratum VARCHAR(255) NOT NULL,
+    row_count BIGINT NOT NULL DEFAULT 0,
+    CONSTRAINT uq_dataset_sample_stratum UNIQUE (dataset_id, stratum)
+);
+CREATE INDEX IF NOT EXISTS ix_dataset_sample_strata_dataset_id ON dataset_sample_strata(dataset_id);
+CREATE TABLE IF NOT EXISTS dataset_sample_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dataset_id INTEGER NOT NULL REFERENCES datasets(id),
+    record_id INTEGER NOT NULL UNIQUE REFERENCES dataset_records(id),
+    stratum VARCHAR(255) NOT NULL,
+    priority FLOAT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dataset_sample_priority ON dataset_sample_records(dataset_id, stratum, priority);
+COMMIT;
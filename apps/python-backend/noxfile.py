@@ -101,6 +101,16 @@ def test(session: Session) -> None:
     session.run("pytest", "--cov=src", f"--cov-fail-under={COVER_MIN}")
 
 
+@nox.session(python=["3.13"], tags=["bench"])
+def bench(session: Session) -> None:
+    """Run the performance benchmarks and compare against the baseline.
+
+    Extra arguments are forwarded, e.g. ``nox -s bench -- --full``.
+    """
+    session.install("-c", constraints(session).as_posix(), ".")
+    session.run("python", "-m", "benchmarks.run", *session.posargs)
+
+
 @nox.session(python=["3.13"], tags=["security"])
 def security(session: Session) -> None:
     """Run security checks: pip-audit."""
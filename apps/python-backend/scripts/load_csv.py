@@ -1,4 +1,4 @@
-"""CLI script to ingest CSV files into the city-data backend."""
+"""CLI script to ingest CSV or Excel files into the city-data backend."""
 
 from __future__ import annotations
 
@@ -7,7 +7,11 @@ import logging
 from pathlib import Path
 
 from city_data_backend.database import configure_engine, session_scope
-from city_data_backend.services.datasets import DatasetRepository, init_database
+from city_data_backend.services.datasets import (
+    EXCEL_SUFFIXES,
+    DatasetRepository,
+    init_database,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +26,11 @@ def parse_args() -> argparse.Namespace:
         "dataset_slug",
         help="Dataset slug (e.g., population_by_ward_2023)",
     )
-    parser.add_argument("csv_path", type=Path, help="Path to the CSV file")
+    parser.add_argument(
+        "csv_path",
+        type=Path,
+        help="Path to the CSV file or .xlsx workbook",
+    )
     parser.add_argument("dataset_name", help="Human-friendly dataset name")
     parser.add_argument("description", help="Dataset description")
     parser.add_argument("--year", type=int, default=None, help="Year for the dataset")
@@ -32,6 +40,25 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Columns to treat as index columns",
     )
+    parser.add_argument(
+        "--sheet",
+        dest="sheets",
+        action="append",
+        default=None,
+        help="Worksheet to load from a workbook (repeatable; default: all sheets)",
+    )
+    parser.add_argument(
+        "--encoding",
+        default=None,
+        help="CSV encoding (e.g. utf-8, cp932); detected from the file by default",
+    )
+    parser.add_argument(
+        "--hash-workers",
+        dest="hash_workers",
+        type=int,
+        default=1,
+        help="Threads used to compute row hashes in chunks",
+    )
     parser.add_argument(
         "--database-url",
         dest="database_url",
@@ -42,7 +69,7 @@ def parse_args() -> argparse.Namespace:
 
 
 def main() -> None:
-    """Entrypoint for loading a CSV file into the database."""
+    """Entrypoint for loading a CSV file or workbook into the database."""
     logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
     args = parse_args()
     if args.database_url:
@@ -51,22 +78,40 @@ def main() -> None:
     with session_scope() as session:
         init_database(session)
         repo = DatasetRepository(session)
-        dataset = repo.import_csv(
-            category_slug=args.category_slug,
-            dataset_slug=args.dataset_slug,
-            csv_path=args.csv_path,
-            dataset_name=args.dataset_name,
-            description=args.description,
-            year=args.year,
-            index_columns=args.index,
-        )
-        row_count = len(repo.get_records(dataset.id))
-        logger.info(
-            "Imported dataset %s (id=%s) with %s rows",
-            dataset.slug,
-            dataset.id,
-            row_count,
-        )
+        if args.csv_path.suffix.lower() in EXCEL_SUFFIXES:
+            datasets = repo.import_excel(
+                category_slug=args.category_slug,
+                dataset_slug=args.dataset_slug,
+                excel_path=args.csv_path,
+                dataset_name=args.dataset_name,
+                description=args.description,
+                year=args.year,
+                index_columns=args.index,
+                sheet_names=args.sheets,
+                hash_workers=args.hash_workers,
+            )
+        else:
+            datasets = [
+                repo.import_csv(
+                    category_slug=args.category_slug,
+                    dataset_slug=args.dataset_slug,
+                    csv_path=args.csv_path,
+                    dataset_name=args.dataset_name,
+                    description=args.description,
+                    year=args.year,
+                    index_columns=args.index,
+                    hash_workers=args.hash_workers,
+                    encoding=args.encoding,
+                ),
+            ]
+        for dataset in datasets:
+            row_count = len(repo.get_records(dataset.id))
+            logger.info(
+                "Imported dataset %s (id=%s) with %s rows",
+                dataset.slug,
+                dataset.id,
+                row_count,
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+"""CLI script to bulk-ingest many CSV files described by a manifest."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from city_data_backend.database import configure_engine
+from city_data_backend.services.bulk_import import (
+    DEFAULT_MAX_WRITERS,
+    BulkImporter,
+    load_manifest,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Return parsed CLI arguments for manifest-driven ingestion.
+
+    Parameters
+    ----------
+    argv:
+        Optional arguments to parse. When omitted, defaults to ``sys.argv``.
+
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Load every CSV listed in a YAML/JSON manifest into the datasets"
+            " tables, parsing files in parallel."
+        ),
+    )
+    parser.add_argument("manifest", type=Path, help="Path to the manifest file")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of parse/hash worker processes (defaults to CPU count)",
+    )
+    parser.add_argument(
+        "--max-writers",
+        dest="max_writers",
+        type=int,
+        default=DEFAULT_MAX_WRITERS,
+        help="Maximum concurrent dataset writers on server databases",
+    )
+    parser.add_argument(
+        "--database-url",
+        dest="database_url",
+        default=None,
+        help="Override DATABASE_URL",
+    )
+    return parser.parse_args(list(argv) if argv is not None else None)
+
+
+def main() -> None:
+    """Entrypoint for bulk loading a manifest of CSV files."""
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
+    args = parse_args()
+    if args.database_url:
+        configure_engine(args.database_url)
+
+    entries = load_manifest(args.manifest)
+    importer = BulkImporter(
+        parse_workers=args.workers,
+        max_writers=args.max_writers,
+    )
+    report = importer.run(entries)
+    logger.info("%s", report.format_summary())
+    if report.files_failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,19 @@
 """Clean interfaces package."""
 
-from city_data_backend.base import BaseComponent
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from city_data_backend.base import BaseComponent
 
 __all__ = ["BaseComponent"]
+
+
+def __getattr__(name: str) -> Any:
+    # Imported lazily: BaseComponent pulls in structlog and pydantic settings,
+    # which one-shot scripts importing a submodule do not need.
+    if name == "BaseComponent":
+        from city_data_backend.base import BaseComponent
+
+        return BaseComponent
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
@@ -9,7 +9,11 @@ from pathlib import Path
 from dotenv import load_dotenv
 
 from city_data_backend.interfaces.factory import InterfaceFactory
-from city_data_backend.utils.logger import configure_logging, get_logger
+from city_data_backend.utils.logger import (
+    configure_logging,
+    get_logger,
+    shutdown_logging,
+)
 from city_data_backend.utils.settings import get_interface_settings, get_settings
 
 
@@ -38,6 +42,9 @@ class Application:
             log_level=settings.log_level,
             log_format=settings.log_format,
             log_file=settings.log_file_path,
+            async_sink=settings.log_async,
+            queue_size=settings.log_queue_size,
+            overflow=settings.log_queue_overflow,
         )
         self.logger = get_logger(__name__)
 
@@ -63,6 +70,7 @@ class Application:
             raise
         finally:
             self.logger.info("Application shutting down")
+            shutdown_logging()
 
 
 def create_app(dotenv_path: Path | None = None) -> Application:
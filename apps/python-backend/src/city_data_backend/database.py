@@ -4,21 +4,32 @@ This module centralizes SQLAlchemy engine/session setup so tests and runtime can
 share the same initialization logic. The default database is a local SQLite
 file under ``./data/city_data.db`` but it can be overridden with the
 ``DATABASE_URL`` environment variable.
+
+File-backed SQLite databases are switched to WAL journaling with tuned pragmas
+so the API can read while ``WorkerOrchestrator`` writes. Query traffic uses
+:func:`get_read_session`, which rotates over the read replicas listed in
+``DATABASE_READ_URLS`` or, without replicas, uses a read-only engine on the
+primary. Server databases get a ``QueuePool`` sized by the ``DB_POOL_*``
+variables.
 """
 
 from __future__ import annotations
 
+import itertools
 import os
+import threading
 from contextlib import contextmanager
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from city_data_backend.utils.metrics import DB_POOL_CHECKED_OUT, DB_POOL_CHECKOUTS
+
 if TYPE_CHECKING:  # pragma: no cover - imports for type checking only
-    from collections.abc import Generator
+    from collections.abc import Generator, Sequence
 
     from sqlalchemy.engine import Connection, Engine
 
@@ -26,6 +37,26 @@ Base = declarative_base()
 
 _engine: Engine | None = None
 _SessionLocal: sessionmaker[Session] | None = None
+# Read engines with their session factories, built on first use.
+_read_targets: list[tuple[Engine, sessionmaker[Session]]] = []
+_read_urls: list[str] | None = None
+_read_counter = itertools.count()
+_read_lock = threading.Lock()
+
+# Pool defaults for server databases; each can be overridden via the environment.
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_RECYCLE_S = 1800
+DEFAULT_POOL_TIMEOUT_S = 30
+
+# SQLite pragma defaults: 256 MiB of memory-mapped I/O, a 64 MiB page cache
+# (negative cache_size is in KiB) and five seconds of waiting on locks.
+DEFAULT_SQLITE_SYNCHRONOUS = "NORMAL"
+DEFAULT_SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+DEFAULT_SQLITE_CACHE_SIZE = -64 * 1024
+DEFAULT_SQLITE_BUSY_TIMEOUT_MS = 5000
+
+_SQLITE_SYNCHRONOUS_MODES = frozenset({"OFF", "NORMAL", "FULL", "EXTRA"})
 
 
 def get_database_url() -> str:
@@ -33,22 +64,111 @@ def get_database_url() -> str:
     return os.getenv("DATABASE_URL", "sqlite:///./data/city_data.db")
 
 
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value)
+    except ValueError as exc:
+        msg = f"{name} must be an integer, got {value!r}"
+        raise ValueError(msg) from exc
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    if not url.startswith("sqlite"):
+        return False
+    database = url.split("://", 1)[1].removeprefix("/")
+    return not database or database.startswith(":memory:")
+
+
+def sqlite_pragmas(*, read_only: bool = False) -> dict[str, str | int]:
+    """Return the pragmas applied to each new file-backed SQLite connection.
+
+    Args:
+        read_only: Add ``query_only`` so the connection rejects writes
+
+    Returns:
+        Mapping of pragma name to value, in the order they are applied
+
+    """
+    synchronous = os.getenv("SQLITE_SYNCHRONOUS", DEFAULT_SQLITE_SYNCHRONOUS).upper()
+    if synchronous not in _SQLITE_SYNCHRONOUS_MODES:
+        msg = f"SQLITE_SYNCHRONOUS must be one of {sorted(_SQLITE_SYNCHRONOUS_MODES)}"
+        raise ValueError(msg)
+    pragmas: dict[str, str | int] = {
+        "busy_timeout": _env_int(
+            "SQLITE_BUSY_TIMEOUT_MS",
+            DEFAULT_SQLITE_BUSY_TIMEOUT_MS,
+        ),
+        "journal_mode": "WAL",
+        "synchronous": synchronous,
+        "mmap_size": _env_int("SQLITE_MMAP_SIZE", DEFAULT_SQLITE_MMAP_SIZE),
+        "cache_size": _env_int("SQLITE_CACHE_SIZE", DEFAULT_SQLITE_CACHE_SIZE),
+    }
+    if read_only:
+        pragmas["query_only"] = "ON"
+    return pragmas
+
+
+def _install_sqlite_pragmas(engine: Engine, pragmas: dict[str, str | int]) -> None:
+    def _apply(dbapi_connection: Any, _record: object) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    event.listen(engine, "connect", _apply)
+
+
+def _server_pool_kwargs() -> dict[str, object]:
+    return {
+        "pool_size": _env_int("DB_POOL_SIZE", DEFAULT_POOL_SIZE),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", DEFAULT_MAX_OVERFLOW),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", DEFAULT_POOL_RECYCLE_S),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT_S),
+        "pool_pre_ping": True,
+    }
+
+
+def _on_pool_checkout(*_: object) -> None:
+    DB_POOL_CHECKOUTS.inc()
+    DB_POOL_CHECKED_OUT.inc()
+
+
+def _on_pool_checkin(*_: object) -> None:
+    DB_POOL_CHECKED_OUT.dec()
+
+
 def _build_engine(
     database_url: str | None = None,
+    *,
+    read_only: bool = False,
 ) -> tuple[Engine, sessionmaker[Session]]:
-    """Create an engine and sessionmaker for the provided URL."""
+    """Create an engine and sessionmaker for the provided URL.
+
+    ``read_only`` engines refuse writes on SQLite (``PRAGMA query_only``); on
+    server databases they are a separate pool so query traffic cannot starve
+    writers of connections.
+    """
     url = database_url or get_database_url()
     connect_args: dict[str, object] = {}
     pool_kwargs: dict[str, object] = {}
+    pragmas: dict[str, str | int] | None = None
 
-    if url.startswith("sqlite+pysqlite:///:memory:"):
+    if _is_memory_sqlite(url):
         connect_args = {"check_same_thread": False}
         pool_kwargs = {"poolclass": StaticPool}
     elif url.startswith("sqlite"):
         connect_args = {"check_same_thread": False}
-        if url.startswith("sqlite:///"):
-            db_path = Path(url.removeprefix("sqlite:///"))
+        pragmas = sqlite_pragmas(read_only=read_only)
+        if "///" in url:
+            db_path = Path(url.split("///", 1)[1].split("?", 1)[0])
             db_path.parent.mkdir(parents=True, exist_ok=True)
+    else:
+        pool_kwargs = _server_pool_kwargs()
 
     engine = create_engine(
         url,
@@ -57,6 +177,10 @@ def _build_engine(
         connect_args=connect_args,
         **pool_kwargs,
     )
+    if pragmas is not None:
+        _install_sqlite_pragmas(engine, pragmas)
+    event.listen(engine, "checkout", _on_pool_checkout)
+    event.listen(engine, "checkin", _on_pool_checkin)
     session_local: sessionmaker[Session] = sessionmaker(
         bind=engine,
         autoflush=False,
@@ -66,9 +190,30 @@ def _build_engine(
     return engine, session_local
 
 
-def configure_engine(database_url: str | None = None) -> Engine:
-    """Configure the global engine/session objects."""
-    global _engine, _SessionLocal
+def get_read_urls() -> list[str]:
+    """Return read replica URLs from the comma-separated ``DATABASE_READ_URLS``."""
+    raw = os.getenv("DATABASE_READ_URLS", "")
+    return [url.strip() for url in raw.split(",") if url.strip()]
+
+
+def configure_engine(
+    database_url: str | None = None,
+    read_urls: Sequence[str] | None = None,
+) -> Engine:
+    """Configure the global engine/session objects.
+
+    Read engines are built lazily on the next call to :func:`get_read_engine`:
+    one per replica in ``read_urls`` (``DATABASE_READ_URLS`` when omitted), or
+    a single read-only engine on the primary when there are no replicas.
+    In-memory SQLite shares the primary engine, since a second engine would
+    open a different, empty database.
+    """
+    global _engine, _SessionLocal, _read_urls  # noqa: PLW0603
+    for engine, _ in _read_targets:
+        if engine is not _engine:
+            engine.dispose()
+    _read_targets.clear()
+    _read_urls = list(read_urls) if read_urls is not None else None
     _engine, _SessionLocal = _build_engine(database_url)
     return _engine
 
@@ -93,6 +238,62 @@ def get_session() -> Session:
     return _SessionLocal()
 
 
+def _configure_read_engines() -> list[tuple[Engine, sessionmaker[Session]]]:
+    with _read_lock:
+        if _read_targets:
+            return _read_targets
+        engine = get_engine()
+        if _SessionLocal is None:
+            msg = "Session factory is not configured"
+            raise RuntimeError(msg)
+        urls = _read_urls if _read_urls is not None else get_read_urls()
+        database = engine.url.database or ""
+        if urls:
+            _read_targets.extend(_build_engine(url, read_only=True) for url in urls)
+        elif engine.dialect.name == "sqlite" and database in {"", ":memory:"}:
+            _read_targets.append((engine, _SessionLocal))
+        else:
+            _read_targets.append(
+                _build_engine(
+                    engine.url.render_as_string(hide_password=False),
+                    read_only=True,
+                ),
+            )
+        return _read_targets
+
+
+def _next_read_target() -> tuple[Engine, sessionmaker[Session]]:
+    targets = _read_targets or _configure_read_engines()
+    return targets[next(_read_counter) % len(targets)]
+
+
+def get_read_engines() -> list[Engine]:
+    """Return every engine that serves query traffic."""
+    targets = _read_targets or _configure_read_engines()
+    return [engine for engine, _ in targets]
+
+
+def get_read_engine() -> Engine:
+    """Return the next read engine, rotating through replicas round-robin."""
+    return _next_read_target()[0]
+
+
+def get_read_session(*, consistent: bool = False) -> Session:
+    """Return a new Session for query traffic.
+
+    Args:
+        consistent: Read from the primary instead of a replica, e.g. right
+            after ``import_csv`` when replicas may not have caught up yet
+
+    Returns:
+        Session bound to a read engine, or to the primary when ``consistent``
+
+    """
+    if consistent:
+        return get_session()
+    return _next_read_target()[1]()
+
+
 @contextmanager
 def session_scope() -> Generator[Session]:
     """Context manager yielding a session and ensuring cleanup."""
@@ -7,9 +7,12 @@ from typing import Any
 
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
     DateTime,
+    Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -136,6 +139,51 @@ class DatasetRecord(Base):
     dataset: Mapped[Dataset] = relationship("Dataset", back_populates="records")
 
 
+class DatasetSampleStratum(Base):
+    """Total row count of one stratum of a dataset's reservoir sample."""
+
+    __tablename__ = "dataset_sample_strata"
+    __table_args__ = (
+        UniqueConstraint("dataset_id", "stratum", name="uq_dataset_sample_stratum"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    dataset_id: Mapped[int] = mapped_column(
+        ForeignKey("datasets.id"),
+        nullable=False,
+        index=True,
+    )
+    stratum: Mapped[str] = mapped_column(String(255), nullable=False)
+    row_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class DatasetSampleRecord(Base):
+    """Record kept in the stratified reservoir sample of its dataset."""
+
+    __tablename__ = "dataset_sample_records"
+    __table_args__ = (
+        Index(
+            "idx_dataset_sample_priority",
+            "dataset_id",
+            "stratum",
+            "priority",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    dataset_id: Mapped[int] = mapped_column(
+        ForeignKey("datasets.id"),
+        nullable=False,
+    )
+    record_id: Mapped[int] = mapped_column(
+        ForeignKey("dataset_records.id"),
+        nullable=False,
+        unique=True,
+    )
+    stratum: Mapped[str] = mapped_column(String(255), nullable=False)
+    priority: Mapped[float] = mapped_column(Float, nullable=False)
+
+
 class AnalysisQuery(Base):
     """History of interactive analysis requests."""
 
@@ -180,11 +228,15 @@ class DatasetFile(Base):
     )
     path: Mapped[str] = mapped_column(String(500), nullable=False)
     file_type: Mapped[str] = mapped_column(String(50), nullable=False, default="csv")
+    size_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    mtime: Mapped[float | None] = mapped_column(Float, nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
         default=lambda: datetime.now(UTC),
         nullable=False,
     )
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     dataset: Mapped[Dataset] = relationship("Dataset", back_populates="files")
 
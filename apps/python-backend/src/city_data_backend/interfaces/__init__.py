@@ -1,8 +1,30 @@
-"""Interfaces package for the City Data Backend."""
+"""Interfaces package for the City Data Backend.
 
-from .base import BaseInterface
-from .cli import CLIInterface
-from .factory import InterfaceFactory
-from .restapi import RestAPIInterface
+Interface classes are resolved on first attribute access so that importing the
+package does not import every web framework.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .base import BaseInterface
+    from .cli import CLIInterface
+    from .factory import InterfaceFactory
+    from .restapi import RestAPIInterface
 
 __all__ = ["BaseInterface", "CLIInterface", "InterfaceFactory", "RestAPIInterface"]
+
+_MODULES = {
+    "BaseInterface": ".base",
+    "CLIInterface": ".cli",
+    "InterfaceFactory": ".factory",
+    "RestAPIInterface": ".restapi",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _MODULES:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    return getattr(import_module(_MODULES[name], __name__), name)
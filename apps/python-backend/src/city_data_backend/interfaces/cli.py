@@ -1,9 +1,21 @@
 """CLI interface implementation using Typer."""
 
+import shutil
+from pathlib import Path
+from typing import Annotated, cast, get_args
+
 import typer
 from rich.console import Console
 
 from city_data_backend.models.io import WelcomeMessage
+from city_data_backend.utils.profiler import (
+    MAX_PROFILE_SECONDS,
+    PROFILE_FILE_SUFFIXES,
+    ProfileFormat,
+    fetch_remote_profile,
+    request_process_profile,
+    wait_for_profile,
+)
 
 from .base import BaseInterface
 
@@ -39,6 +51,7 @@ class CLIInterface(BaseInterface):
         """Set up CLI commands."""
         # Set the default command to welcome
         self.app.command(name="welcome")(self.welcome)
+        self.app.command(name="profile")(self.profile)
 
         # Add a callback that shows welcome when no command is specified
         self.app.callback(invoke_without_command=True)(self._main_callback)
@@ -59,6 +72,66 @@ class CLIInterface(BaseInterface):
         # Force flush to ensure output is visible
         console.file.flush()
 
+    def profile(
+        self,
+        url: Annotated[
+            str | None,
+            typer.Option(help="Base URL of a running REST API to profile"),
+        ] = None,
+        pid: Annotated[
+            int | None,
+            typer.Option(help="PID of a running worker to profile via SIGUSR2"),
+        ] = None,
+        seconds: Annotated[
+            float,
+            typer.Option(min=0.1, max=MAX_PROFILE_SECONDS, help="Capture duration"),
+        ] = 10.0,
+        profile_format: Annotated[
+            str,
+            typer.Option("--format", help="collapsed or speedscope"),
+        ] = "collapsed",
+        interval_ms: Annotated[
+            float,
+            typer.Option(min=1, max=1000, help="Sampling interval"),
+        ] = 5.0,
+        output: Annotated[
+            Path | None,
+            typer.Option(help="Output file (default: profile-<target>.<ext>)"),
+        ] = None,
+        token: Annotated[
+            str | None,
+            typer.Option(envvar="ADMIN_API_TOKEN", help="Admin bearer token for --url"),
+        ] = None,
+    ) -> None:
+        """Capture a sampling CPU profile of a running API or worker process."""
+        if profile_format not in get_args(ProfileFormat):
+            msg = f"Unknown format {profile_format!r}"
+            raise typer.BadParameter(msg, param_hint="--format")
+        if (url is None) == (pid is None):
+            msg = "Pass exactly one of --url or --pid"
+            raise typer.BadParameter(msg)
+        fmt = cast("ProfileFormat", profile_format)
+        target = "api" if url is not None else str(pid)
+        output = output or Path(f"profile-{target}{PROFILE_FILE_SUFFIXES[fmt]}")
+
+        console.print(f"Profiling {url or f'PID {pid}'} for {seconds:g}s...")
+        if url is not None:
+            output.write_bytes(
+                fetch_remote_profile(url, token, seconds, fmt, interval_ms / 1000),
+            )
+        else:
+            written = request_process_profile(
+                cast("int", pid),
+                seconds,
+                fmt,
+                interval_ms / 1000,
+            )
+            if not wait_for_profile(written, seconds + 30):
+                console.print(f"PID {pid} did not write a profile to {written}")
+                raise typer.Exit(1)
+            shutil.move(written, output)
+        console.print(f"Profile written to {output}")
+
     def run(self) -> None:
         """Run the CLI interface."""
         # Let Typer handle the command parsing
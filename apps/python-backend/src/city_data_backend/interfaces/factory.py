@@ -1,12 +1,13 @@
-"""Factory pattern implementation for creating interfaces."""
+"""Factory pattern implementation for creating interfaces.
+
+Interface modules are imported only when their type is requested, so the CLI
+does not pay for importing FastAPI, uvicorn, FastMCP, pandas or SQLAlchemy.
+"""
 
 from city_data_backend.types import InterfaceType
 from city_data_backend.utils.settings import get_interface_settings
 
 from .base import BaseInterface
-from .cli import CLIInterface
-from .mcp import MCPInterface
-from .restapi import RestAPIInterface
 
 
 class InterfaceFactory:
@@ -26,10 +27,16 @@ class InterfaceFactory:
 
         """
         if interface_type == InterfaceType.CLI:
+            from .cli import CLIInterface
+
             return CLIInterface()
         if interface_type == InterfaceType.RESTAPI:
+            from .restapi import RestAPIInterface
+
             return RestAPIInterface()
         if interface_type == InterfaceType.MCP:
+            from .mcp import MCPInterface
+
             return MCPInterface()
 
         msg = f"Unknown interface type: {interface_type}"
@@ -1,12 +1,15 @@
 """REST API interface implementation using FastAPI."""
 
-from collections.abc import Iterator
+import asyncio
+import os
+import time
+from collections.abc import Awaitable, Callable, Iterator
 from datetime import UTC, datetime
 from typing import Annotated, Any, cast
 
 import uvicorn
 import uvicorn.config
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.openapi.utils import get_openapi
@@ -17,9 +20,10 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 from starlette import status
 from starlette.requests import Request
+from starlette.responses import Response
 
 from city_data_backend.constants import PROJECT_NAME
-from city_data_backend.database import get_session
+from city_data_backend.database import get_read_session, get_session
 from city_data_backend.db_models import (
     CompiledProgramArtifact,
     Experiment,
@@ -62,7 +66,26 @@ from city_data_backend.services.dspy_program import (
 from city_data_backend.services.feedback import FeedbackService
 from city_data_backend.services.plan_experiments import PlanExperiments
 from city_data_backend.types import InterfaceType
+from city_data_backend.utils.logger import get_logger
+from city_data_backend.utils.metrics import (
+    CONTENT_TYPE,
+    HTTP_REQUEST_DURATION,
+    render_metrics,
+)
+from city_data_backend.utils.profiler import (
+    MAX_PROFILE_SECONDS,
+    PROFILE_FILE_SUFFIXES,
+    PROFILE_MEDIA_TYPES,
+    ProfileFormat,
+    ProfilerBusyError,
+    SamplingProfiler,
+)
 from city_data_backend.utils.settings import get_auth_settings
+from city_data_backend.utils.timing import (
+    SERVER_TIMING_HEADER,
+    finish_request_timings,
+    start_request_timings,
+)
 
 from .base import BaseInterface
 
@@ -76,7 +99,29 @@ def get_db() -> Iterator[Session]:
         session.close()
 
 
+def get_read_db(
+    consistent: Annotated[
+        bool,
+        Query(description="Read from the primary database instead of a replica"),
+    ] = False,
+) -> Iterator[Session]:
+    """Provide a read-engine session for query traffic.
+
+    ``?consistent=true`` routes the request to the primary database so that
+    rows written moments ago (e.g. by ``import_csv``) are visible even when
+    replicas lag behind.
+    """
+    session = get_read_session(consistent=consistent)
+    try:
+        yield session
+    finally:
+        session.close()
+
+
 db_dep = Annotated[Session, Depends(get_db)]
+read_db_dep = Annotated[Session, Depends(get_read_db)]
+
+timing_logger = get_logger(__name__)
 
 auth_scheme = HTTPBearer(auto_error=False)
 AuthCredentials = Annotated[HTTPAuthorizationCredentials | None, Depends(auth_scheme)]
@@ -103,6 +148,44 @@ def http_error_handler(_request: Request, exc: HTTPException) -> JSONResponse:
     )
 
 
+async def server_timing_middleware(
+    request: Request,
+    call_next: Callable[[Request], Awaitable[Response]],
+) -> Response:
+    """Collect stage timings per request and expose them as Server-Timing.
+
+    The end-to-end latency is also recorded in the request duration histogram,
+    labelled with the matched route template rather than the raw path.
+    """
+    token = start_request_timings()
+    started = time.perf_counter()
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        timings = finish_request_timings(token)
+        elapsed = time.perf_counter() - started
+        route = request.scope.get("route")
+        HTTP_REQUEST_DURATION.observe(
+            elapsed,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status_code,
+        )
+    total_ms = elapsed * 1000
+    response.headers[SERVER_TIMING_HEADER] = timings.server_timing(total_ms)
+    if timings.stages:
+        timing_logger.info(
+            "Request stage timings",
+            method=request.method,
+            path=request.url.path,
+            total_ms=round(total_ms, 3),
+            stages=timings.as_log_fields(),
+        )
+    return response
+
+
 def authenticate_request(credentials: AuthCredentials) -> HTTPAuthorizationCredentials:
     """Validate bearer token against configured settings."""
     if credentials is None:
@@ -123,6 +206,27 @@ def authenticate_request(credentials: AuthCredentials) -> HTTPAuthorizationCrede
     )
 
 
+def authenticate_admin(credentials: AuthCredentials) -> HTTPAuthorizationCredentials:
+    """Validate the admin bearer token; admin routes are off without one."""
+    settings = get_auth_settings()
+    if not settings.admin_api_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if credentials.credentials == settings.admin_api_token:
+        return credentials
+
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Invalid admin token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 def to_job_model(job: ExperimentJob) -> ExperimentJobModel:
     """Convert an ExperimentJob to its API model."""
     return ExperimentJobModel(
@@ -198,6 +302,8 @@ class RestAPIInterface(BaseInterface):
             },
         )
 
+        self.app.middleware("http")(server_timing_middleware)
+
         self._auth_dependency = Depends(authenticate_request)
         self._openapi_schema: dict[str, Any] | None = None
         self.app.openapi = self._custom_openapi  # type: ignore[assignment]
@@ -230,6 +336,7 @@ class RestAPIInterface(BaseInterface):
         self._setup_optimization_routes()
         self._setup_feedback_routes()
         self._setup_experiment_routes()
+        self._setup_admin_routes()
 
     def _custom_openapi(self) -> dict[str, Any]:
         """Generate OpenAPI schema with security definitions."""
@@ -276,6 +383,15 @@ class RestAPIInterface(BaseInterface):
             """Health check endpoint."""
             return HealthResponse()
 
+        @self.app.get(
+            "/metrics",
+            response_class=Response,
+            dependencies=dependencies,
+        )
+        async def metrics() -> Response:  # type: ignore[misc]
+            """Expose process metrics in the Prometheus text format."""
+            return Response(render_metrics(), media_type=CONTENT_TYPE)
+
         @self.app.get(
             "/api/v1/welcome",
             response_model=WelcomeResponse,
@@ -394,7 +510,7 @@ class RestAPIInterface(BaseInterface):
 
         @self.app.get("/datasets", dependencies=dependencies)
         async def list_datasets(  # type: ignore[misc]
-            db: db_dep,
+            db: read_db_dep,
         ) -> list[DatasetMetadata]:
             repo = DatasetRepository(db)
             return repo.list_datasets()
@@ -411,8 +527,9 @@ class RestAPIInterface(BaseInterface):
         async def run_interactive(  # type: ignore[misc]
             payload: InteractiveRequest,
             db: db_dep,
+            read_db: read_db_dep,
         ) -> InteractiveResponse:
-            repo = DatasetRepository(db)
+            repo = DatasetRepository(db, read_session=read_db)
             program = InteractiveAnalysisProgram(repo)
             return program.run(payload)
 
@@ -549,8 +666,9 @@ class RestAPIInterface(BaseInterface):
         async def create_experiment(  # type: ignore[misc]
             payload: ExperimentCreateRequest,
             db: db_dep,
+            read_db: read_db_dep,
         ) -> ExperimentCreateResponse:
-            repo = DatasetRepository(db)
+            repo = DatasetRepository(db, read_session=read_db)
             metas = [
                 repo.get_dataset_metadata(dataset_id)
                 for dataset_id in payload.dataset_ids
@@ -674,6 +792,46 @@ class RestAPIInterface(BaseInterface):
             db.refresh(candidate)
             return to_candidate_model(candidate)
 
+    def _setup_admin_routes(self) -> None:
+        dependencies = [Depends(authenticate_admin)]
+
+        @self.app.get(
+            "/admin/profile",
+            response_class=Response,
+            dependencies=dependencies,
+        )
+        async def capture_profile(  # type: ignore[misc]
+            seconds: Annotated[float, Query(gt=0, le=MAX_PROFILE_SECONDS)] = 10,
+            profile_format: Annotated[ProfileFormat, Query(alias="format")] = (
+                "collapsed"
+            ),
+            interval_ms: Annotated[float, Query(ge=1, le=1000)] = 5,
+        ) -> Response:
+            """Sample this process's CPU stacks for ``seconds`` and return them."""
+            profiler = SamplingProfiler(interval_ms / 1000)
+            try:
+                profiler.start()
+            except ProfilerBusyError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=str(exc),
+                ) from exc
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                result = profiler.stop()
+            self.logger.info(
+                "Profile captured",
+                samples=result.samples,
+                duration_s=round(result.duration_s, 3),
+            )
+            filename = f"profile-{os.getpid()}{PROFILE_FILE_SUFFIXES[profile_format]}"
+            return Response(
+                result.render(profile_format),
+                media_type=PROFILE_MEDIA_TYPES[profile_format],
+                headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+            )
+
     def run(self) -> None:
         """Run the REST API interface."""
         self.logger.info("Starting RestAPI server", host="0.0.0.0", port=8000)  # noqa: S104
@@ -3,24 +3,166 @@
 from __future__ import annotations
 
 from datetime import datetime  # noqa: TC003
-from typing import Annotated, Any, TypedDict
-
-from pydantic import BaseModel, Field
+from typing import TYPE_CHECKING, Annotated, Any, Literal, NotRequired, TypedDict, cast
+
+from pydantic import BaseModel, Field, model_validator
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+FilterOperator = Literal[
+    "eq",
+    "gte",
+    "lte",
+    "gt",
+    "lt",
+    "in",
+    "not_in",
+    "between",
+    "is_null",
+    "not_null",
+    "contains",
+    "startswith",
+]
+
+WindowFunction = Literal["lag", "pct_change", "rolling_mean", "rank", "cumsum"]
+
+_LIST_OPERATORS = frozenset({"in", "not_in"})
+_STRING_OPERATORS = frozenset({"contains", "startswith"})
+
+
+def filter_value_error(op: str, value: Any) -> str | None:  # noqa: PLR0911
+    """Return why ``value`` is not a valid operand for ``op``, or None if it is."""
+    if op in _LIST_OPERATORS:
+        if not isinstance(value, list | tuple):
+            return f"'{op}' expects a list of values"
+        return None
+    if op == "between":
+        if (
+            not isinstance(value, list | tuple)
+            or len(cast("Sequence[Any]", value)) != 2  # noqa: PLR2004
+        ):
+            return "'between' expects [low, high]"
+        return None
+    if op in _STRING_OPERATORS:
+        if not isinstance(value, str):
+            return f"'{op}' expects a string"
+        return None
+    if op in {"is_null", "not_null"}:
+        return None
+    if value is None:
+        return f"'{op}' expects a value"
+    if isinstance(value, list | tuple | dict):
+        return f"'{op}' expects a single value"
+    return None
+
+
+def window_error(
+    func: str,
+    *,
+    order_by: str | None,
+    periods: Any,
+    n: Any,
+) -> str | None:
+    """Return why a window's parameters do not fit ``func``, or None if they do."""
+    if func != "rank" and not order_by:
+        return f"'{func}' expects an order_by time column"
+    if func in {"lag", "pct_change"} and (
+        not isinstance(periods, int) or isinstance(periods, bool) or periods == 0
+    ):
+        return f"'{func}' expects a non-zero integer periods"
+    if func == "rolling_mean" and (
+        not isinstance(n, int) or isinstance(n, bool) or n < 1
+    ):
+        return "'rolling_mean' expects a positive integer n"
+    return None
 
 
 class QueryFilter(BaseModel):
-    """Filter condition for a query specification."""
+    """Filter condition for a query specification.
+
+    ``in``/``not_in`` take a list, ``between`` an inclusive ``[low, high]``
+    pair, ``contains``/``startswith`` a string and ``is_null``/``not_null``
+    no value.
+    """
 
     column: str
-    op: str = Field(default="eq")
-    value: Any
+    op: FilterOperator = Field(default="eq")
+    value: Any = None
+
+    @model_validator(mode="after")
+    def validate_value(self) -> QueryFilter:
+        """Ensure the value has the shape the operator expects."""
+        error = filter_value_error(self.op, self.value)
+        if error is not None:
+            raise ValueError(error)
+        return self
 
 
 class QueryMetric(BaseModel):
-    """Aggregation metric description."""
+    """Aggregation metric description.
+
+    ``percentile`` metrics take the percentile ``p`` between 0 and 100.
+    """
 
     agg: str
     column: str | None = None
+    p: float | None = Field(default=None, ge=0, le=100)
+
+    @model_validator(mode="after")
+    def validate_percentile(self) -> QueryMetric:
+        """Ensure ``percentile`` metrics say which percentile."""
+        if self.agg == "percentile" and self.p is None:
+            msg = "'percentile' expects p between 0 and 100"
+            raise ValueError(msg)
+        return self
+
+
+class QueryWindow(BaseModel):
+    """Window metric computed over the aggregated result rows.
+
+    Rows are partitioned by ``partition_by`` (by default the group keys other
+    than ``order_by``) and ordered by the time column ``order_by``, which every
+    function except ``rank`` needs. ``lag`` and ``pct_change`` compare with the
+    row ``periods`` steps earlier, ``rolling_mean`` averages the last ``n``
+    rows and ``rank`` ranks ``column`` within the partition in ``direction``.
+    """
+
+    func: WindowFunction
+    column: str
+    order_by: str | None = None
+    partition_by: list[str] | None = None
+    periods: int = 1
+    n: int | None = None
+    direction: str = Field(default="desc")
+
+    @model_validator(mode="after")
+    def validate_parameters(self) -> QueryWindow:
+        """Ensure the function gets the parameters it needs."""
+        error = window_error(
+            self.func,
+            order_by=self.order_by,
+            periods=self.periods,
+            n=self.n,
+        )
+        if error is not None:
+            raise ValueError(error)
+        return self
+
+
+class QueryJoin(BaseModel):
+    """Join of the queried dataset with a second dataset on equal keys.
+
+    ``on`` must name index columns of the joined dataset and defaults to the
+    index columns both datasets share. ``columns`` limits which columns of
+    the joined dataset are added; names that clash with the queried dataset
+    become ``<slug>.<name>``.
+    """
+
+    dataset_id: int
+    on: list[str] | None = None
+    how: Literal["inner", "left"] = "inner"
+    columns: list[str] | None = None
 
 
 class QueryOrder(BaseModel):
@@ -31,11 +173,14 @@ class QueryOrder(BaseModel):
 
 
 class QueryFilterDict(TypedDict):
-    """Dict representation of a query filter."""
+    """Dict representation of a query filter.
+
+    ``value`` is only omitted by ``is_null``/``not_null`` filters.
+    """
 
     column: str
     op: str
-    value: Any
+    value: NotRequired[Any]
 
 
 class QueryMetricDict(TypedDict):
@@ -43,6 +188,28 @@ class QueryMetricDict(TypedDict):
 
     agg: str
     column: str | None
+    p: NotRequired[float | None]
+
+
+class QueryWindowDict(TypedDict):
+    """Dict representation of a window metric."""
+
+    func: str
+    column: str
+    order_by: NotRequired[str | None]
+    partition_by: NotRequired[list[str] | None]
+    periods: NotRequired[int]
+    n: NotRequired[int | None]
+    direction: NotRequired[str]
+
+
+class QueryJoinDict(TypedDict):
+    """Dict representation of a join section."""
+
+    dataset_id: int
+    on: NotRequired[list[str] | None]
+    how: NotRequired[str]
+    columns: NotRequired[list[str] | None]
 
 
 class QueryOrderDict(TypedDict):
@@ -58,18 +225,30 @@ class QuerySpecDict(TypedDict, total=False):
     filters: list[QueryFilterDict]
     group_by: list[str]
     metrics: list[QueryMetricDict]
+    windows: list[QueryWindowDict]
+    join: QueryJoinDict | None
     order_by: list[QueryOrderDict]
     limit: int | None
+    approximate: bool
 
 
 class QuerySpecModel(BaseModel):
-    """Structured representation of a query spec."""
+    """Structured representation of a query spec.
+
+    ``approximate`` estimates count/sum/avg from the dataset's stratified
+    sample and reports confidence intervals in the summary. ``windows`` are
+    computed over the aggregated rows before ``order_by`` and ``limit``;
+    ``join`` adds the columns of a second dataset before filtering.
+    """
 
     filters: Annotated[list[QueryFilter], Field(default_factory=list)]
     group_by: Annotated[list[str], Field(default_factory=list)]
     metrics: Annotated[list[QueryMetric], Field(default_factory=list)]
+    windows: Annotated[list[QueryWindow], Field(default_factory=list)]
+    join: QueryJoin | None = None
     order_by: Annotated[list[QueryOrder], Field(default_factory=list)]
     limit: int | None = None
+    approximate: bool = False
 
 
 class InteractiveRequest(BaseModel):
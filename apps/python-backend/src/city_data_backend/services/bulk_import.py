@@ -0,0 +1,437 @@
+"""Manifest-driven bulk ingestion of many dataset files.
+
+Parsing and hashing are CPU bound and independent per file, so they run in a
+process pool. Database writes are funnelled through writer threads: a single
+writer for SQLite (which only supports one writer at a time) and one writer per
+dataset for server databases. Parses are started in the order the writers store
+files and only a few files ahead of them, so parsed rows waiting for a writer
+stay bounded however long the manifest is.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
+
+from structlog import get_logger
+
+from city_data_backend.database import get_engine, session_scope
+from city_data_backend.services.datasets import (
+    DatasetRepository,
+    ImportPlan,
+    ParsedDataFile,
+    init_database,
+    parse_csv_file,
+)
+from city_data_backend.utils.file_handler import FileHandler
+from city_data_backend.utils.metrics import INGEST_ROWS_PER_SECOND
+
+if TYPE_CHECKING:  # pragma: no cover - imports for type checking only
+    from collections.abc import Callable
+
+logger = get_logger()
+
+DEFAULT_MAX_WRITERS = 4
+# Parsed files allowed to wait for a writer, per parse worker.
+PENDING_PARSES_PER_WORKER = 2
+
+
+@dataclass
+class ManifestEntry:
+    """A single file to import as described in a bulk manifest."""
+
+    category_slug: str
+    dataset_slug: str
+    path: Path
+    dataset_name: str
+    description: str = ""
+    year: int | None = None
+    index_columns: list[str] | None = None
+    encoding: str | None = None
+
+
+@dataclass
+class FileImportResult:
+    """Outcome of importing a single manifest entry."""
+
+    entry: ManifestEntry
+    rows_parsed: int = 0
+    rows_inserted: int = 0
+    size_bytes: int = 0
+    skipped: bool = False
+    error: str | None = None
+
+
+@dataclass
+class BulkImportReport:
+    """Aggregated throughput figures for a bulk import run."""
+
+    results: list[FileImportResult] = field(
+        default_factory=list[FileImportResult],
+    )
+    elapsed_seconds: float = 0.0
+    parse_workers: int = 1
+    writer_count: int = 1
+
+    @property
+    def files_succeeded(self) -> int:
+        """Number of files imported without error."""
+        return sum(1 for result in self.results if result.error is None)
+
+    @property
+    def files_failed(self) -> int:
+        """Number of files that failed to parse or store."""
+        return len(self.results) - self.files_succeeded
+
+    @property
+    def files_skipped(self) -> int:
+        """Number of files skipped because their fingerprint was unchanged."""
+        return sum(1 for result in self.results if result.skipped)
+
+    @property
+    def rows_parsed(self) -> int:
+        """Total rows read from all files."""
+        return sum(result.rows_parsed for result in self.results)
+
+    @property
+    def rows_inserted(self) -> int:
+        """Total rows newly written to ``dataset_records``."""
+        return sum(result.rows_inserted for result in self.results)
+
+    @property
+    def bytes_read(self) -> int:
+        """Total size of the successfully parsed files."""
+        return sum(result.size_bytes for result in self.results)
+
+    def format_summary(self) -> str:
+        """Return a human-readable throughput summary."""
+        elapsed = self.elapsed_seconds or 1e-9
+        rows_per_sec = self.rows_parsed / elapsed
+        mb_per_sec = self.bytes_read / (1024 * 1024) / elapsed
+        lines = [
+            f"Imported {self.files_succeeded}/{len(self.results)} files "
+            f"in {self.elapsed_seconds:.2f}s "
+            f"({self.parse_workers} parse workers, {self.writer_count} writers, "
+            f"{self.files_skipped} unchanged)",
+            f"Rows parsed: {self.rows_parsed} ({rows_per_sec:,.0f} rows/s, "
+            f"{mb_per_sec:.2f} MB/s)",
+            f"Rows inserted: {self.rows_inserted} "
+            f"(skipped duplicates: {self.rows_parsed - self.rows_inserted})",
+        ]
+        lines.extend(
+            f"FAILED {result.entry.path}: {result.error}"
+            for result in self.results
+            if result.error is not None
+        )
+        return "\n".join(lines)
+
+
+def load_manifest(manifest_path: Path) -> list[ManifestEntry]:
+    """Read a YAML or JSON manifest describing the files to import.
+
+    The manifest is either a list of entries or a mapping with a ``datasets``
+    key. Relative file paths are resolved against the manifest's directory.
+    """
+    handler = FileHandler()
+    if manifest_path.suffix.lower() in {".yaml", ".yml"}:
+        payload: Any = handler.read_yaml(manifest_path)
+    else:
+        payload = handler.read_json(manifest_path)
+
+    raw_entries: object = (
+        cast("dict[str, object]", payload).get("datasets", [])
+        if isinstance(payload, dict)
+        else payload
+    )
+    if not isinstance(raw_entries, list):
+        msg = f"Manifest {manifest_path} must contain a list of datasets"
+        raise TypeError(msg)
+
+    base_dir = manifest_path.parent
+    entries: list[ManifestEntry] = []
+    for item in cast("list[object]", raw_entries):
+        if not isinstance(item, dict):
+            msg = f"Manifest entry must be a mapping: {item}"
+            raise TypeError(msg)
+        raw = cast("dict[str, Any]", item)
+        try:
+            path = Path(raw["path"])
+            index: list[str] | None = raw.get("index")
+            entries.append(
+                ManifestEntry(
+                    category_slug=raw["category"],
+                    dataset_slug=raw["slug"],
+                    path=path if path.is_absolute() else base_dir / path,
+                    dataset_name=raw.get("name", raw["slug"]),
+                    description=raw.get("description", ""),
+                    year=raw.get("year"),
+                    index_columns=list(index) if index is not None else None,
+                    encoding=raw.get("encoding"),
+                ),
+            )
+        except KeyError as exc:
+            msg = f"Manifest entry is missing required key {exc}: {raw}"
+            raise ValueError(msg) from exc
+    return entries
+
+
+def _resolve_writer_count(max_writers: int, dataset_count: int) -> int:
+    """SQLite allows one writer at a time; server databases get one per dataset."""
+    if get_engine().dialect.name == "sqlite":
+        return 1
+    return max(1, min(max_writers, dataset_count))
+
+
+class BulkImporter:
+    """Import many files in parallel using a parse pool and writer threads."""
+
+    def __init__(
+        self,
+        parse_workers: int = 1,
+        max_writers: int = DEFAULT_MAX_WRITERS,
+        parser: Callable[..., ParsedDataFile] = parse_csv_file,
+        max_pending: int | None = None,
+    ) -> None:
+        """Configure worker counts and the per-file parse function.
+
+        ``parser`` is called as ``parser(path, index_columns, start_offset,
+        columns, hash_scheme, encoding=encoding, fingerprint=fingerprint)`` and
+        must be picklable when ``parse_workers`` is above one. At most
+        ``max_pending`` files (by default ``PENDING_PARSES_PER_WORKER`` per
+        parse worker) are parsing or parsed but not yet stored.
+        """
+        self.parse_workers = max(1, parse_workers)
+        self.max_writers = max_writers
+        self.parser = parser
+        self.max_pending = max(
+            1,
+            max_pending or self.parse_workers * PENDING_PARSES_PER_WORKER,
+        )
+
+    def run(self, entries: list[ManifestEntry]) -> BulkImportReport:
+        """Parse all entries and write them to the database."""
+        started = time.perf_counter()
+        plans: dict[int, ImportPlan] = {}
+        with session_scope() as session:
+            init_database(session)
+            repo = DatasetRepository(session)
+            for entry in entries:
+                dataset = repo.ensure_dataset(
+                    entry.category_slug,
+                    entry.dataset_slug,
+                    entry.dataset_name,
+                    entry.description,
+                    entry.year,
+                )
+                try:
+                    plans[id(entry)] = repo.plan_file_import(dataset, entry.path)
+                except OSError:
+                    # Let the parse stage surface the error for this entry.
+                    plans[id(entry)] = ImportPlan(mode="full")
+
+        by_dataset: dict[str, list[ManifestEntry]] = defaultdict(list)
+        for entry in entries:
+            by_dataset[entry.dataset_slug].append(entry)
+        writer_count = _resolve_writer_count(self.max_writers, len(by_dataset))
+
+        parse_pool: Executor = (
+            ProcessPoolExecutor(max_workers=self.parse_workers)
+            if self.parse_workers > 1
+            else ThreadPoolExecutor(max_workers=1)
+        )
+        results: dict[int, FileImportResult] = {}
+        # Writers remove a file's future from this mapping once it is stored,
+        # so its parsed rows are freed instead of living until the run ends.
+        parsed_futures: dict[int, Future[ParsedDataFile] | None] = {
+            id(entry): None if plans[id(entry)].mode == "skip" else Future()
+            for entry in entries
+        }
+        pending = threading.BoundedSemaphore(self.max_pending)
+        with parse_pool, ThreadPoolExecutor(max_workers=writer_count) as writers:
+            write_futures = [
+                writers.submit(
+                    self._write_dataset,
+                    dataset_entries,
+                    [plans[id(entry)] for entry in dataset_entries],
+                    parsed_futures,
+                    pending,
+                )
+                for dataset_entries in by_dataset.values()
+            ]
+            self._submit_parses(
+                parse_pool,
+                [entry for group in by_dataset.values() for entry in group],
+                plans,
+                parsed_futures,
+                pending,
+            )
+            for future in write_futures:
+                for result in future.result():
+                    results[id(result.entry)] = result
+
+        report = BulkImportReport(
+            results=[results[id(entry)] for entry in entries],
+            elapsed_seconds=time.perf_counter() - started,
+            parse_workers=self.parse_workers,
+            writer_count=writer_count,
+        )
+        if report.elapsed_seconds > 0:
+            INGEST_ROWS_PER_SECOND.set(
+                report.rows_parsed / report.elapsed_seconds,
+                source="bulk",
+            )
+        logger.info(
+            "Bulk import finished",
+            files=len(entries),
+            failed=report.files_failed,
+            skipped=report.files_skipped,
+            rows_parsed=report.rows_parsed,
+            rows_inserted=report.rows_inserted,
+            elapsed_seconds=round(report.elapsed_seconds, 3),
+        )
+        return report
+
+    def _submit_parses(
+        self,
+        parse_pool: Executor,
+        entries: list[ManifestEntry],
+        plans: dict[int, ImportPlan],
+        parsed_futures: dict[int, Future[ParsedDataFile] | None],
+        pending: threading.BoundedSemaphore,
+    ) -> None:
+        """Start parses in the order the writers store them.
+
+        Every parse takes a slot of ``pending``, which the writer gives back
+        once the file is stored, so submission waits while ``max_pending``
+        files are unconsumed. Results are relayed to the futures the writers
+        wait on.
+        """
+        for entry in entries:
+            target = parsed_futures.get(id(entry))
+            if target is None:
+                continue
+            plan = plans[id(entry)]
+            pending.acquire()
+            try:
+                source = parse_pool.submit(
+                    self.parser,
+                    entry.path,
+                    entry.index_columns,
+                    plan.start_offset,
+                    plan.columns,
+                    plan.hash_scheme,
+                    encoding=entry.encoding,
+                    fingerprint=plan.fingerprint,
+                )
+            except RuntimeError as exc:
+                # A broken pool fails the entry; its writer frees the slot.
+                target.set_exception(exc)
+                continue
+            source.add_done_callback(partial(_relay_result, target))
+
+    def _write_dataset(
+        self,
+        entries: list[ManifestEntry],
+        plans: list[ImportPlan],
+        parsed_futures: dict[int, Future[ParsedDataFile] | None],
+        pending: threading.BoundedSemaphore,
+    ) -> list[FileImportResult]:
+        """Store all files of one dataset sequentially within one session.
+
+        The ``pending`` slot of every parsed file is released once the file
+        has been handled, or when the writer stops early.
+        """
+        try:
+            return self._store_dataset(entries, plans, parsed_futures, pending)
+        finally:
+            for entry in entries:
+                _release_parse(entry, parsed_futures, pending)
+
+    def _store_dataset(
+        self,
+        entries: list[ManifestEntry],
+        plans: list[ImportPlan],
+        parsed_futures: dict[int, Future[ParsedDataFile] | None],
+        pending: threading.BoundedSemaphore,
+    ) -> list[FileImportResult]:
+        results: list[FileImportResult] = []
+        with session_scope() as session:
+            repo = DatasetRepository(session)
+            for entry, plan in zip(entries, plans, strict=True):
+                future = parsed_futures.get(id(entry))
+                result = FileImportResult(entry=entry)
+                try:
+                    dataset = repo.ensure_dataset(
+                        entry.category_slug,
+                        entry.dataset_slug,
+                        entry.dataset_name,
+                        entry.description,
+                        entry.year,
+                    )
+                    if future is None:
+                        result.skipped = True
+                        if plan.fingerprint is not None:
+                            repo.add_file(
+                                dataset,
+                                str(entry.path),
+                                fingerprint=plan.fingerprint,
+                            )
+                        results.append(result)
+                        continue
+                    parsed = future.result()
+                    result.rows_parsed = len(parsed.rows)
+                    result.size_bytes = parsed.size_bytes
+                    result.rows_inserted = repo.store_parsed_file(dataset, parsed)
+                except Exception as exc:
+                    session.rollback()
+                    result.error = f"{type(exc).__name__}: {exc}"
+                    logger.warning(
+                        "Bulk import entry failed",
+                        path=str(entry.path),
+                        error=result.error,
+                    )
+                finally:
+                    _release_parse(entry, parsed_futures, pending)
+                results.append(result)
+        return results
+
+
+def _release_parse(
+    entry: ManifestEntry,
+    parsed_futures: dict[int, Future[ParsedDataFile] | None],
+    pending: threading.BoundedSemaphore,
+) -> None:
+    """Forget a handled entry's parse and free its ``pending`` slot once.
+
+    The slot is taken when the parse is submitted, so an entry that failed
+    before its parse was needed waits for it here instead of freeing a slot
+    that was never taken.
+    """
+    future = parsed_futures.pop(id(entry), None)
+    if future is not None:
+        wait([future])
+        pending.release()
+
+
+def _relay_result(
+    target: Future[ParsedDataFile],
+    source: Future[ParsedDataFile],
+) -> None:
+    """Copy the outcome of a finished parse to the future a writer waits on."""
+    error = source.exception()
+    if error is not None:
+        target.set_exception(error)
+    else:
+        target.set_result(source.result())
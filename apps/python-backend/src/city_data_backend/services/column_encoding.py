@@ -0,0 +1,156 @@
+"""Compact in-memory representation of dataset records.
+
+``pd.DataFrame(records)`` keeps text as Python ``object`` arrays and every
+number as 64-bit. :func:`compact_frame` uses the stored ``DatasetColumn``
+types to dictionary-encode repetitive text columns as ordered categoricals
+(one small integer code per row plus the sorted distinct values) and to
+downcast integer columns to the smallest integer dtype that holds them.
+Filters on categoricals are evaluated once per distinct value, and group-bys
+run on the integer codes.
+
+Encoding costs more than building the plain frame, so :class:`FrameCache`
+keeps the compacted frames of recently queried datasets between queries.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+
+    from city_data_backend.services.datasets import ColumnMetadata
+
+DataFrame = Any
+Series = Any
+
+# Text columns are encoded when at most this share of their values is distinct.
+CATEGORICAL_MAX_DISTINCT_RATIO = 0.5
+# Smallest first: integer columns take the first dtype holding their range.
+_INTEGER_DTYPES = (np.int8, np.int16, np.int32)
+_WIDE_INTEGER_DTYPES = frozenset(map(np.dtype, (np.int16, np.int32, np.int64)))
+
+
+def _encode_text(values: Series) -> Series:
+    if isinstance(values.dtype, pd.CategoricalDtype) or values.dtype.kind not in "OT":
+        return values
+    distinct = values.dropna().unique()
+    if not len(distinct) or not all(isinstance(value, str) for value in distinct):
+        return values
+    if len(distinct) > CATEGORICAL_MAX_DISTINCT_RATIO * len(values):
+        return values
+    # Ordered by value, so min/max and sorting behave as on the plain strings.
+    dtype = pd.CategoricalDtype(sorted(distinct), ordered=True)
+    return values.astype(dtype)
+
+
+def _downcast_number(values: Series) -> Series:
+    # Floats stay 64-bit: float32 sums and means would change query results.
+    # Nullable extension integers keep their dtype.
+    if values.dtype not in _WIDE_INTEGER_DTYPES:
+        return values
+    low, high = (int(values.min()), int(values.max())) if len(values) else (0, 0)
+    for dtype in _INTEGER_DTYPES:
+        limits = np.iinfo(dtype)
+        if limits.min <= low and high <= limits.max:
+            return values.astype(dtype)
+    return values
+
+
+def compact_frame(
+    frame: DataFrame,
+    columns: list[ColumnMetadata],
+) -> DataFrame:
+    """Return ``frame`` with text columns encoded and numbers downcast.
+
+    Args:
+        frame: Frame built from dataset records
+        columns: Stored column metadata of the dataset
+
+    Returns:
+        A frame with the same values in smaller dtypes; columns whose values
+        do not match their ``data_type`` are left unchanged
+
+    """
+    converted: dict[str, Series] = {}
+    for column in columns:
+        name = column["name"]
+        if name not in frame.columns:
+            continue
+        values = frame[name]
+        if column["data_type"] == "number":
+            compact = _downcast_number(values)
+        else:
+            compact = _encode_text(values)
+        if compact is not values:
+            converted[name] = compact
+    if not converted:
+        return frame
+    return frame.assign(**converted)
+
+
+def frame_memory_bytes(frame: DataFrame) -> int:
+    """Return the bytes held by ``frame``, including the Python strings."""
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+class FrameCache:
+    """Thread-safe LRU cache of dataset frames, bounded by their total bytes.
+
+    Every entry carries the version of the records it was built from; a
+    lookup with another version is a miss and drops the stale frame. Cached
+    frames are shared between queries and must not be modified in place.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """Initialize an empty cache holding at most ``max_bytes`` (0 disables)."""
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[Hashable, DataFrame, int]] = (
+            OrderedDict()
+        )
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: Hashable) -> DataFrame | None:
+        """Return the frame cached for ``key`` at ``version``, if any."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != version:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, version: Hashable, frame: DataFrame) -> int:
+        """Cache ``frame`` for ``key`` at ``version`` and return its bytes.
+
+        Frames larger than the whole cache are not kept; least recently used
+        frames are evicted until the new one fits.
+        """
+        size = frame_memory_bytes(frame)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return size
+            while self._entries and self._bytes + size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+            self._entries[key] = (version, frame, size)
+            self._bytes += size
+        return size
+
+    def clear(self) -> None:
+        """Drop every cached frame."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, key: Hashable) -> None:
+        self._bytes -= self._entries.pop(key)[2]
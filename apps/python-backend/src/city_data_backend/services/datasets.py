@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
+import codecs
 import csv
 import hashlib
-import json
+import heapq
+import io
 import re
-from collections import Counter
-from typing import TYPE_CHECKING, Any, TypedDict
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Literal, TypedDict, cast
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.exc import IntegrityError
 
 from city_data_backend.database import init_db
@@ -19,8 +24,31 @@ from city_data_backend.db_models import (
     DatasetColumn,
     DatasetFile,
     DatasetRecord,
+    DatasetSampleRecord,
+    DatasetSampleStratum,
     OpenDataCategory,
 )
+from city_data_backend.services.row_hash import (
+    ROW_HASH_LEGACY,
+    RowHasher,
+    default_row_hash_scheme,
+    detect_row_hash_scheme,
+    legacy_row_hash,
+)
+from city_data_backend.services.sampling import (
+    MAX_SAMPLE_STRATA,
+    OTHER_STRATUM,
+    sample_priority,
+    sample_stratum_size,
+    stratum_of,
+)
+from city_data_backend.utils.metrics import (
+    INGEST_DURATION,
+    INGEST_ROWS,
+    INGEST_ROWS_INSERTED,
+    INGEST_ROWS_PER_SECOND,
+    record_cache_access,
+)
 
 
 class ColumnMetadata(TypedDict):
@@ -44,11 +72,84 @@ class DatasetMetadata(TypedDict):
 
 
 if TYPE_CHECKING:  # pragma: no cover - imports for type checking only
-    from collections.abc import Iterable
+    from collections.abc import Collection, Iterable, Iterator, Sequence
     from pathlib import Path
 
+    from sqlalchemy.engine import CursorResult
+
     from sqlalchemy.orm import Session
 
+
+FINGERPRINT_CHUNK_SIZE = 1024 * 1024
+EXCEL_SUFFIXES = frozenset({".xlsx", ".xlsm"})
+ENCODING_SAMPLE_SIZE = 64 * 1024
+# Row hashes looked up per query when resolving sampled record ids.
+SAMPLE_LOOKUP_CHUNK_SIZE = 500
+# CP932 is Microsoft's superset of Shift_JIS used by Japanese government CSVs.
+CSV_FALLBACK_ENCODINGS = ("cp932",)
+
+
+@dataclass(frozen=True)
+class FileFingerprint:
+    """Size, modification time, and chunked content hash of a source file."""
+
+    size_bytes: int
+    mtime: float
+    content_hash: str
+
+
+@dataclass
+class ImportPlan:
+    """How a file should be (re-)imported given its stored fingerprint.
+
+    ``skip`` leaves records untouched, ``append`` parses only the bytes after
+    ``start_offset`` using the stored ``columns``, and ``full`` parses the file.
+    ``hash_scheme`` is the row hash scheme already used by the dataset and
+    ``fingerprint`` the file's fingerprint when planning already hashed it.
+    """
+
+    mode: Literal["full", "append", "skip"]
+    start_offset: int = 0
+    columns: list[dict[str, Any]] | None = None
+    fingerprint: FileFingerprint | None = None
+    hash_scheme: str | None = None
+
+
+@dataclass
+class ParsedDataFile:
+    """Rows, hashes, and inferred metadata parsed from a single source file.
+
+    Instances are produced without a database session so that parsing and
+    hashing can run in worker processes while writes stay in the caller.
+    """
+
+    path: Path
+    size_bytes: int
+    rows: list[dict[str, object]]
+    columns: list[dict[str, Any]]
+    index_values: list[dict[str, object]]
+    row_hashes: list[str]
+    fingerprint: FileFingerprint | None = None
+
+
+@dataclass
+class DatasetSample:
+    """Records of a dataset's reservoir sample and the size of every stratum.
+
+    ``strata`` holds the stratum of each entry of ``records``; ``population``
+    is the number of dataset rows per stratum.
+    """
+
+    records: list[dict[str, Any]]
+    strata: list[str]
+    population: dict[str, int]
+
+    @property
+    def population_rows(self) -> int:
+        """Total number of dataset rows the sample represents."""
+        return sum(self.population.values())
+
+
 DEFAULT_OPEN_DATA_CATEGORIES: list[tuple[str, str]] = [
     ("population", "人口・世帯"),
     ("economy", "経済・雇用"),
@@ -68,9 +169,14 @@ DEFAULT_OPEN_DATA_CATEGORIES: list[tuple[str, str]] = [
 class DatasetRepository:
     """Repository to manage datasets and records."""
 
-    def __init__(self, session: Session) -> None:
-        """Store the SQLAlchemy session used by repository methods."""
+    def __init__(self, session: Session, read_session: Session | None = None) -> None:
+        """Store the SQLAlchemy sessions used by repository methods.
+
+        ``read_session`` serves metadata and record lookups (typically a read
+        replica); writes always go through ``session``.
+        """
         self.session = session
+        self.read_session = read_session or session
 
     def seed_categories(self) -> None:
         """Ensure the default 12 categories are present."""
@@ -127,7 +233,12 @@ class DatasetRepository:
 
     def upsert_columns(self, dataset: Dataset, columns: list[dict[str, Any]]) -> None:
         """Insert column metadata if missing."""
-        existing = {col.name: col for col in dataset.columns}
+        existing = {
+            col.name: col
+            for col in self.session.scalars(
+                select(DatasetColumn).where(DatasetColumn.dataset_id == dataset.id),
+            )
+        }
         for column in columns:
             if column["name"] in existing:
                 col = existing[column["name"]]
@@ -151,35 +262,340 @@ class DatasetRepository:
         dataset: Dataset,
         row_json: dict[str, Any],
         index_cols: dict[str, Any],
-    ) -> None:
-        """Insert a record if it does not already exist (idempotent)."""
-        row_hash = hashlib.sha256(
-            json.dumps(row_json, sort_keys=True, ensure_ascii=False).encode("utf-8"),
-        ).hexdigest()
+        row_hash: str | None = None,
+    ) -> bool:
+        """Insert a record if it does not already exist (idempotent).
+
+        Without an explicit ``row_hash`` the legacy SHA-256-over-JSON scheme is
+        used. Returns whether the record was inserted.
+        """
         record = DatasetRecord(
             dataset_id=dataset.id,
             row_json=row_json,
             index_cols=index_cols,
-            row_hash=row_hash,
+            row_hash=row_hash or legacy_row_hash(row_json),
         )
         self.session.add(record)
         try:
             self.session.commit()
         except IntegrityError:
             self.session.rollback()
+            return False
+        return True
+
+    def add_records(
+        self,
+        dataset: Dataset,
+        rows: Sequence[dict[str, object]],
+        index_values: Sequence[dict[str, object]],
+        row_hashes: Sequence[str],
+    ) -> int:
+        """Bulk insert records whose hashes are not yet stored for the dataset.
+
+        Returns the number of inserted rows. The records and the reservoir
+        sample update are committed together. Falls back to per-row inserts
+        when a concurrent writer stored some of the same rows first.
+        """
+        seen = set(
+            self.session.scalars(
+                select(DatasetRecord.row_hash).where(
+                    DatasetRecord.dataset_id == dataset.id,
+                ),
+            ),
+        )
+        pending: list[dict[str, Any]] = []
+        for row, index_cols, row_hash in zip(
+            rows,
+            index_values,
+            row_hashes,
+            strict=True,
+        ):
+            if row_hash in seen:
+                continue
+            seen.add(row_hash)
+            pending.append(
+                {
+                    "dataset_id": dataset.id,
+                    "row_json": row,
+                    "index_cols": index_cols,
+                    "row_hash": row_hash,
+                },
+            )
+        if not pending:
+            return 0
+        try:
+            self.session.execute(insert(DatasetRecord), pending)
+        except IntegrityError:
+            self.session.rollback()
+            pending = [values for values in pending if self._insert_record(values)]
+        self._add_to_sample(
+            dataset.id,
+            [(values["row_hash"], values["index_cols"]) for values in pending],
+        )
+        self.session.commit()
+        return len(pending)
+
+    def _insert_record(self, values: dict[str, Any]) -> bool:
+        """Insert one record in a savepoint; False if its hash is stored."""
+        try:
+            with self.session.begin_nested():
+                self.session.execute(insert(DatasetRecord), [values])
+        except IntegrityError:
+            return False
+        return True
+
+    def rebuild_sample(self, dataset_id: int) -> None:
+        """Recompute the reservoir sample of a dataset from all its records."""
+        self.session.execute(
+            delete(DatasetSampleRecord).where(
+                DatasetSampleRecord.dataset_id == dataset_id,
+            ),
+        )
+        self.session.execute(
+            delete(DatasetSampleStratum).where(
+                DatasetSampleStratum.dataset_id == dataset_id,
+            ),
+        )
+        records = self.session.execute(
+            select(DatasetRecord.id, DatasetRecord.row_hash, DatasetRecord.index_cols)
+            .where(DatasetRecord.dataset_id == dataset_id)
+            .execution_options(yield_per=50_000),
+        )
+        for partition in records.partitions():
+            self._add_to_sample(
+                dataset_id,
+                [(row_hash, index_cols) for _, row_hash, index_cols in partition],
+                {row_hash: record_id for record_id, row_hash, _ in partition},
+            )
+        self.session.commit()
+
+    def _add_to_sample(
+        self,
+        dataset_id: int,
+        rows: Sequence[tuple[str, dict[str, Any]]],
+        record_ids: dict[str, int] | None = None,
+    ) -> None:
+        """Fold newly stored ``(row_hash, index_cols)`` rows into the sample.
+
+        Stratum row counts grow by every row; a row enters the sample only if
+        its stratum is not full yet or its priority beats the largest kept one,
+        and each touched stratum is then trimmed back to the reservoir size.
+        The caller commits.
+        """
+        size = sample_stratum_size()
+        strata = set(
+            self.session.scalars(
+                select(DatasetSampleStratum.stratum).where(
+                    DatasetSampleStratum.dataset_id == dataset_id,
+                ),
+            ),
+        )
+        kept = {
+            stratum: (count, highest)
+            for stratum, count, highest in self.session.execute(
+                select(
+                    DatasetSampleRecord.stratum,
+                    func.count(),
+                    func.max(DatasetSampleRecord.priority),
+                )
+                .where(DatasetSampleRecord.dataset_id == dataset_id)
+                .group_by(DatasetSampleRecord.stratum),
+            )
+        }
+        added: Counter[str] = Counter()
+        candidates: dict[str, list[tuple[float, str]]] = defaultdict(list)
+        for row_hash, index_cols in rows:
+            stratum = stratum_of(index_cols)
+            if (
+                stratum not in strata
+                and stratum not in added
+                and len(strata | added.keys()) >= MAX_SAMPLE_STRATA - 1
+            ):
+                stratum = OTHER_STRATUM
+            added[stratum] += 1
+            priority = sample_priority(row_hash)
+            count, highest = kept.get(stratum, (0, None))
+            if count < size or highest is None or priority < highest:
+                candidates[stratum].append((priority, row_hash))
+
+        for stratum, count in added.items():
+            self._count_stratum_rows(dataset_id, stratum, count)
+        entries = [
+            (stratum, priority, row_hash)
+            for stratum, pending in candidates.items()
+            for priority, row_hash in heapq.nsmallest(size, pending)
+        ]
+        if not entries:
+            return
+        if record_ids is None:
+            record_ids = self._record_ids(
+                dataset_id,
+                [row_hash for _, _, row_hash in entries],
+            )
+        self.session.execute(
+            insert(DatasetSampleRecord),
+            [
+                {
+                    "dataset_id": dataset_id,
+                    "record_id": record_ids[row_hash],
+                    "stratum": stratum,
+                    "priority": priority,
+                }
+                for stratum, priority, row_hash in entries
+                if row_hash in record_ids
+            ],
+        )
+        for stratum in candidates:
+            cutoff = self.session.scalar(
+                select(DatasetSampleRecord.priority)
+                .where(
+                    DatasetSampleRecord.dataset_id == dataset_id,
+                    DatasetSampleRecord.stratum == stratum,
+                )
+                .order_by(DatasetSampleRecord.priority)
+                .offset(size)
+                .limit(1),
+            )
+            if cutoff is not None:
+                self.session.execute(
+                    delete(DatasetSampleRecord).where(
+                        DatasetSampleRecord.dataset_id == dataset_id,
+                        DatasetSampleRecord.stratum == stratum,
+                        DatasetSampleRecord.priority >= cutoff,
+                    ),
+                )
+
+    def _count_stratum_rows(self, dataset_id: int, stratum: str, count: int) -> None:
+        """Add ``count`` rows to a stratum's total with an atomic increment."""
+        increment = (
+            update(DatasetSampleStratum)
+            .where(
+                DatasetSampleStratum.dataset_id == dataset_id,
+                DatasetSampleStratum.stratum == stratum,
+            )
+            .values(row_count=DatasetSampleStratum.row_count + count)
+        )
+        if cast("CursorResult[Any]", self.session.execute(increment)).rowcount:
+            return
+        try:
+            with self.session.begin_nested():
+                self.session.add(
+                    DatasetSampleStratum(
+                        dataset_id=dataset_id,
+                        stratum=stratum,
+                        row_count=count,
+                    ),
+                )
+        except IntegrityError:
+            # A concurrent import created the stratum first.
+            self.session.execute(increment)
+
+    def _record_ids(self, dataset_id: int, row_hashes: list[str]) -> dict[str, int]:
+        record_ids: dict[str, int] = {}
+        for start in range(0, len(row_hashes), SAMPLE_LOOKUP_CHUNK_SIZE):
+            chunk = row_hashes[start : start + SAMPLE_LOOKUP_CHUNK_SIZE]
+            record_ids.update(
+                self.session.execute(
+                    select(DatasetRecord.row_hash, DatasetRecord.id).where(
+                        DatasetRecord.dataset_id == dataset_id,
+                        DatasetRecord.row_hash.in_(chunk),
+                    ),
+                ).all(),
+            )
+        return record_ids
+
+    def get_row_hash_scheme(self, dataset: Dataset) -> str:
+        """Return the row hash scheme of stored records, or the default scheme."""
+        stored_hash = self.session.scalars(
+            select(DatasetRecord.row_hash)
+            .where(DatasetRecord.dataset_id == dataset.id)
+            .limit(1),
+        ).first()
+        if stored_hash is None:
+            return default_row_hash_scheme()
+        return detect_row_hash_scheme(stored_hash)
 
     def add_file(
         self,
         dataset: Dataset,
         path: str,
         file_type: str = "csv",
+        fingerprint: FileFingerprint | None = None,
     ) -> DatasetFile:
-        """Record an imported file."""
-        file_entry = DatasetFile(dataset_id=dataset.id, path=path, file_type=file_type)
-        self.session.add(file_entry)
+        """Record an imported file, refreshing its fingerprint if already known."""
+        file_entry = self.get_file(dataset, path)
+        if file_entry is None:
+            file_entry = DatasetFile(
+                dataset_id=dataset.id,
+                path=path,
+                file_type=file_type,
+            )
+            self.session.add(file_entry)
+        else:
+            file_entry.updated_at = datetime.now(UTC)
+        if fingerprint is not None:
+            file_entry.size_bytes = fingerprint.size_bytes
+            file_entry.mtime = fingerprint.mtime
+            file_entry.content_hash = fingerprint.content_hash
         self.session.commit()
         return file_entry
 
+    def get_file(self, dataset: Dataset, path: str) -> DatasetFile | None:
+        """Return the most recent file entry recorded for a dataset and path."""
+        return self.session.scalars(
+            select(DatasetFile)
+            .where(DatasetFile.dataset_id == dataset.id, DatasetFile.path == path)
+            .order_by(DatasetFile.id.desc())
+            .limit(1),
+        ).first()
+
+    def plan_file_import(self, dataset: Dataset, path: Path) -> ImportPlan:
+        """Compare a file against its stored fingerprint to pick an import mode.
+
+        Unchanged size and mtime skip without reading the file. Otherwise the
+        content is hashed; identical content is skipped and a file whose stored
+        content is an unchanged, line-terminated prefix is imported as an append.
+        """
+        plan = self._plan_file_import(dataset, path)
+        record_cache_access("file_fingerprint", hit=plan.mode == "skip")
+        return plan
+
+    def _plan_file_import(self, dataset: Dataset, path: Path) -> ImportPlan:
+        entry = self.get_file(dataset, str(path))
+        if entry is None or entry.content_hash is None or entry.size_bytes is None:
+            return ImportPlan(
+                mode="full",
+                hash_scheme=self.get_row_hash_scheme(dataset),
+            )
+
+        stat = path.stat()
+        if stat.st_size == entry.size_bytes and stat.st_mtime == entry.mtime:
+            return ImportPlan(mode="skip")
+
+        fingerprint, prefix_hash = fingerprint_file(path, entry.size_bytes)
+        if fingerprint.content_hash == entry.content_hash:
+            return ImportPlan(mode="skip", fingerprint=fingerprint)
+        if (
+            fingerprint.size_bytes > entry.size_bytes
+            and prefix_hash == entry.content_hash
+            and _ends_with_newline(path, entry.size_bytes)
+        ):
+            return ImportPlan(
+                mode="append",
+                start_offset=entry.size_bytes,
+                columns=[
+                    dict(column)
+                    for column in self.get_dataset_metadata(dataset.id)["columns"]
+                ],
+                fingerprint=fingerprint,
+                hash_scheme=self.get_row_hash_scheme(dataset),
+            )
+        return ImportPlan(
+            mode="full",
+            fingerprint=fingerprint,
+            hash_scheme=self.get_row_hash_scheme(dataset),
+        )
+
     def import_csv(
         self,
         category_slug: str,
@@ -189,8 +605,17 @@ class DatasetRepository:
         description: str,
         year: int | None,
         index_columns: list[str] | None = None,
+        hash_workers: int = 1,
+        encoding: str | None = None,
     ) -> Dataset:
-        """Load a CSV file and store dataset metadata and records."""
+        """Load a CSV file and store dataset metadata and records.
+
+        Files already imported unchanged are skipped, and files that only grew
+        by appended rows have just the new rows parsed and inserted.
+        ``hash_workers`` threads compute row hashes in chunks. The encoding is
+        detected from a sample unless ``encoding`` is given.
+        """
+        started = perf_counter()
         dataset = self.ensure_dataset(
             category_slug,
             dataset_slug,
@@ -198,32 +623,142 @@ class DatasetRepository:
             description,
             year,
         )
-        raw_rows = self._read_csv_rows(csv_path)
-        inferred_columns = infer_columns(raw_rows, index_columns)
-        self.upsert_columns(dataset, inferred_columns)
-
-        for row in raw_rows:
-            self.add_record(
-                dataset,
-                row_json=row,
-                index_cols=extract_index_cols(row, inferred_columns),
-            )
+        plan = self.plan_file_import(dataset, csv_path)
+        if plan.mode == "skip":
+            if plan.fingerprint is not None:
+                self.add_file(dataset, str(csv_path), fingerprint=plan.fingerprint)
+            return dataset
 
-        self.add_file(dataset, str(csv_path))
+        parsed = parse_csv_file(
+            csv_path,
+            index_columns,
+            start_offset=plan.start_offset,
+            columns=plan.columns,
+            hash_scheme=plan.hash_scheme,
+            hash_workers=hash_workers,
+            encoding=encoding,
+            fingerprint=plan.fingerprint,
+        )
+        self.store_parsed_file(dataset, parsed)
+        elapsed = perf_counter() - started
+        INGEST_DURATION.observe(elapsed, file_type="csv")
+        if elapsed > 0:
+            INGEST_ROWS_PER_SECOND.set(len(parsed.rows) / elapsed, source="import_csv")
         return dataset
 
-    def _read_csv_rows(self, csv_path: Path) -> list[dict[str, object]]:
-        with csv_path.open("r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            rows: list[dict[str, object]] = []
-            for row in reader:
-                parsed_row = {key: parse_value(value) for key, value in row.items()}
-                rows.append(parsed_row)
-            return rows
+    def import_excel(
+        self,
+        category_slug: str,
+        dataset_slug: str,
+        excel_path: Path,
+        dataset_name: str,
+        description: str,
+        year: int | None,
+        index_columns: list[str] | None = None,
+        sheet_names: list[str] | None = None,
+        hash_workers: int = 1,
+    ) -> list[Dataset]:
+        """Load worksheets of an ``.xlsx`` workbook without a CSV round trip.
+
+        Every selected sheet (all sheets by default) becomes its own dataset.
+        A workbook with a single sheet uses ``dataset_slug`` as-is; otherwise
+        the slug gets a suffix derived from the sheet title (see
+        ``sheet_slug``) and the name the sheet title, so a sheet maps to the
+        same dataset whichever sheets are selected. Rows are streamed one sheet
+        at a time and keep their native cell types.
+        """
+        titles = list_excel_sheets(excel_path)
+        selected = [
+            title for title in titles if sheet_names is None or title in sheet_names
+        ]
+        missing = set(sheet_names or []) - set(titles)
+        if missing:
+            msg = f"Worksheets not found in {excel_path}: {sorted(missing)}"
+            raise ValueError(msg)
+
+        suffixes = {title: sheet_slug(title) for title in titles}
+        if len(set(suffixes.values())) < len(titles):
+            msg = f"Worksheet titles of {excel_path} map to the same dataset slug"
+            raise ValueError(msg)
+
+        datasets: dict[str, Dataset] = {}
+        plans: dict[str, ImportPlan] = {}
+        for title in selected:
+            if len(titles) == 1:
+                slug, name = dataset_slug, dataset_name
+            else:
+                slug = f"{dataset_slug}_{suffixes[title]}"
+                name = f"{dataset_name} ({title})"
+            dataset = self.ensure_dataset(
+                category_slug,
+                slug,
+                name,
+                description,
+                year,
+            )
+            datasets[title] = dataset
+            plan = self.plan_file_import(dataset, excel_path)
+            if plan.mode == "append":
+                # Workbooks are zip archives; a grown file is never a pure append.
+                plan = ImportPlan(
+                    mode="full",
+                    fingerprint=plan.fingerprint,
+                    hash_scheme=plan.hash_scheme,
+                )
+            elif plan.mode == "skip" and plan.fingerprint is not None:
+                self.add_file(dataset, str(excel_path), "xlsx", plan.fingerprint)
+            plans[title] = plan
+
+        pending = {title for title, plan in plans.items() if plan.mode != "skip"}
+        if pending:
+            fingerprint = next(
+                (plan.fingerprint for plan in plans.values() if plan.fingerprint),
+                None,
+            )
+            if fingerprint is None:
+                fingerprint, _ = fingerprint_file(excel_path)
+            for table in read_excel_tables(excel_path, pending):
+                parsed = parse_excel_table(
+                    excel_path,
+                    table,
+                    fingerprint,
+                    index_columns,
+                    hash_scheme=plans[table.title].hash_scheme,
+                    hash_workers=hash_workers,
+                )
+                self.store_parsed_file(datasets[table.title], parsed, "xlsx")
+        return [datasets[title] for title in selected]
+
+    def store_parsed_file(
+        self,
+        dataset: Dataset,
+        parsed: ParsedDataFile,
+        file_type: str = "csv",
+    ) -> int:
+        """Persist columns, records, and file entry for a parsed file.
+
+        Returns the number of newly inserted rows.
+        """
+        self.upsert_columns(dataset, parsed.columns)
+        inserted = self.add_records(
+            dataset,
+            parsed.rows,
+            parsed.index_values,
+            parsed.row_hashes,
+        )
+        self.add_file(
+            dataset,
+            str(parsed.path),
+            file_type=file_type,
+            fingerprint=parsed.fingerprint,
+        )
+        INGEST_ROWS.inc(len(parsed.rows), file_type=file_type)
+        INGEST_ROWS_INSERTED.inc(inserted, file_type=file_type)
+        return inserted
 
     def get_dataset_metadata(self, dataset_id: int) -> DatasetMetadata:
         """Return metadata (slug/name/description/year/columns) for a dataset."""
-        dataset = self.session.get(Dataset, dataset_id)
+        dataset = self.read_session.get(Dataset, dataset_id)
         if not dataset:
             msg = f"Dataset {dataset_id} not found"
             raise ValueError(msg)
@@ -235,7 +770,7 @@ class DatasetRepository:
                 "description": col.description,
                 "is_index": col.is_index,
             }
-            for col in self.session.execute(
+            for col in self.read_session.execute(
                 select(DatasetColumn).where(DatasetColumn.dataset_id == dataset_id),
             ).scalars()
         ]
@@ -250,7 +785,7 @@ class DatasetRepository:
 
     def list_datasets(self) -> list[DatasetMetadata]:
         """List datasets with their column metadata."""
-        datasets = self.session.execute(select(Dataset)).scalars().all()
+        datasets = self.read_session.execute(select(Dataset)).scalars().all()
         return [self.get_dataset_metadata(dataset.id) for dataset in datasets]
 
     def get_datasets_metadata(self, datasets: list[Dataset]) -> list[DatasetMetadata]:
@@ -261,13 +796,81 @@ class DatasetRepository:
         """Fetch all stored records for a dataset as dictionaries."""
         return [
             row_json
-            for (row_json,) in self.session.execute(
+            for (row_json,) in self.read_session.execute(
                 select(DatasetRecord.row_json).where(
                     DatasetRecord.dataset_id == dataset_id,
                 ),
             )
         ]
 
+    def count_records(self, dataset_id: int) -> int:
+        """Return how many records a dataset has."""
+        count = self.read_session.scalar(
+            select(func.count())
+            .select_from(DatasetRecord)
+            .where(DatasetRecord.dataset_id == dataset_id),
+        )
+        return int(count or 0)
+
+    def records_version(self, dataset_id: int) -> tuple[object, ...]:
+        """Return a token that changes whenever records are added to a dataset.
+
+        Records are only ever inserted, so their count, highest id and newest
+        creation time identify the stored rows.
+        """
+        count, last_id, last_created = self.read_session.execute(
+            select(
+                func.count(),
+                func.max(DatasetRecord.id),
+                func.max(DatasetRecord.created_at),
+            ).where(DatasetRecord.dataset_id == dataset_id),
+        ).one()
+        return (count, last_id, last_created)
+
+    def iter_record_batches(
+        self,
+        dataset_id: int,
+        batch_size: int,
+    ) -> Iterator[list[dict[str, Any]]]:
+        """Yield a dataset's records in batches of at most ``batch_size`` rows.
+
+        Rows are fetched with ``yield_per``, which uses a server-side cursor on
+        databases that support one, so only one batch is held in memory.
+        """
+        result = self.read_session.execute(
+            select(DatasetRecord.row_json)
+            .where(DatasetRecord.dataset_id == dataset_id)
+            .execution_options(yield_per=batch_size),
+        )
+        try:
+            for partition in result.partitions():
+                yield [row_json for (row_json,) in partition]
+        finally:
+            result.close()
+
+    def get_sample(self, dataset_id: int) -> DatasetSample | None:
+        """Return the reservoir sample of a dataset, or None if it has none."""
+        population = dict(
+            self.read_session.execute(
+                select(
+                    DatasetSampleStratum.stratum,
+                    DatasetSampleStratum.row_count,
+                ).where(DatasetSampleStratum.dataset_id == dataset_id),
+            ).all(),
+        )
+        if not population:
+            return None
+        rows = self.read_session.execute(
+            select(DatasetRecord.row_json, DatasetSampleRecord.stratum)
+            .join(DatasetRecord, DatasetRecord.id == DatasetSampleRecord.record_id)
+            .where(DatasetSampleRecord.dataset_id == dataset_id),
+        ).all()
+        return DatasetSample(
+            records=[row_json for row_json, _ in rows],
+            strata=[stratum for _, stratum in rows],
+            population=population,
+        )
+
     def record_analysis(
         self,
         dataset_id: int,
@@ -293,6 +896,298 @@ class DatasetRepository:
         return analysis
 
 
+def fingerprint_file(
+    path: Path,
+    prefix_length: int | None = None,
+    chunk_size: int = FINGERPRINT_CHUNK_SIZE,
+) -> tuple[FileFingerprint, str | None]:
+    """Hash a file in chunks, optionally capturing the hash of its first bytes.
+
+    Returns the fingerprint and, when ``prefix_length`` is within the file, the
+    SHA-256 of the first ``prefix_length`` bytes computed in the same pass.
+    """
+    stat = path.stat()
+    digest = hashlib.sha256()
+    prefix_hash: str | None = None
+    consumed = 0
+    with path.open("rb") as f:
+        while chunk := f.read(chunk_size):
+            if (
+                prefix_length is not None
+                and prefix_hash is None
+                and consumed + len(chunk) >= prefix_length
+            ):
+                split = prefix_length - consumed
+                digest.update(chunk[:split])
+                prefix_hash = digest.hexdigest()
+                digest.update(chunk[split:])
+            else:
+                digest.update(chunk)
+            consumed += len(chunk)
+    fingerprint = FileFingerprint(
+        size_bytes=consumed,
+        mtime=stat.st_mtime,
+        content_hash=digest.hexdigest(),
+    )
+    return fingerprint, prefix_hash
+
+
+def _ends_with_newline(path: Path, length: int) -> bool:
+    """Return True when the first ``length`` bytes end on a line break."""
+    with path.open("rb") as f:
+        f.seek(length - 1)
+        return f.read(1) == b"\n"
+
+
+def detect_csv_encoding(
+    csv_path: Path,
+    sample_size: int = ENCODING_SAMPLE_SIZE,
+) -> str:
+    """Guess the text encoding of a CSV file from its BOM and a leading sample.
+
+    A UTF-8 BOM selects ``utf-8-sig`` so the BOM does not leak into the first
+    header. Otherwise the sample is decoded incrementally (a multi-byte
+    character cut off at the sample boundary is not an error) as UTF-8 and then
+    as each of ``CSV_FALLBACK_ENCODINGS``. Undecodable samples fall back to
+    UTF-8 so that the reader reports the offending bytes.
+    """
+    with csv_path.open("rb") as f:
+        sample = f.read(sample_size)
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    for encoding in ("utf-8", *CSV_FALLBACK_ENCODINGS):
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+        except UnicodeDecodeError:
+            continue
+        return encoding
+    return "utf-8"
+
+
+def read_csv_table(
+    csv_path: Path,
+    start_offset: int = 0,
+    encoding: str | None = None,
+) -> tuple[list[str], list[list[str]]]:
+    """Read a CSV file into its header and raw (untyped) field lists.
+
+    The encoding is detected with ``detect_csv_encoding`` unless given, and
+    bytes are decoded incrementally while streaming, so CP932 files need no
+    separate transcoding pass. When ``start_offset`` is set, the header is
+    still taken from the first line but only rows starting at that byte offset
+    are read. Blank lines are skipped.
+    """
+    encoding = encoding or detect_csv_encoding(csv_path)
+    with csv_path.open("r", encoding=encoding, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None) or []
+        if not start_offset:
+            return header, [fields for fields in reader if fields]
+
+    with csv_path.open("rb") as raw:
+        raw.seek(start_offset)
+        tail = io.TextIOWrapper(raw, encoding=encoding, newline="")
+        return header, [fields for fields in csv.reader(tail) if fields]
+
+
+def type_rows(
+    header: list[str],
+    raw_rows: list[list[str]],
+) -> list[dict[str, object]]:
+    """Convert raw field lists into dictionaries of typed values.
+
+    Short rows are padded with ``None`` and surplus fields are dropped.
+    """
+    width = len(header)
+    typed: list[dict[str, object]] = []
+    for fields in raw_rows:
+        values: Sequence[str | None] = fields
+        if len(fields) != width:
+            values = [*fields[:width], *([None] * (width - len(fields)))]
+        typed.append(dict(zip(header, map(parse_value, values), strict=True)))
+    return typed
+
+
+def read_csv_rows(
+    csv_path: Path,
+    start_offset: int = 0,
+    encoding: str | None = None,
+) -> list[dict[str, object]]:
+    """Read a CSV file into rows of typed values."""
+    header, raw_rows = read_csv_table(csv_path, start_offset, encoding)
+    return type_rows(header, raw_rows)
+
+
+def hash_raw_rows(
+    header: list[str],
+    raw_rows: Sequence[Sequence[str | None]],
+    typed_rows: list[dict[str, object]],
+    scheme: str | None = None,
+    workers: int = 1,
+) -> list[str]:
+    """Compute ``row_hash`` values for parsed rows under the given scheme.
+
+    Field-based schemes hash the raw CSV fields directly; the legacy scheme
+    needs the typed rows because it hashes their JSON serialization.
+    """
+    scheme = scheme or default_row_hash_scheme()
+    if scheme == ROW_HASH_LEGACY:
+        return [legacy_row_hash(row) for row in typed_rows]
+    return RowHasher(header, scheme).hash_rows(raw_rows, workers=workers)
+
+
+def parse_csv_file(
+    csv_path: Path,
+    index_columns: list[str] | None = None,
+    start_offset: int = 0,
+    columns: list[dict[str, Any]] | None = None,
+    hash_scheme: str | None = None,
+    hash_workers: int = 1,
+    encoding: str | None = None,
+    fingerprint: FileFingerprint | None = None,
+) -> ParsedDataFile:
+    """Parse, type, and hash a CSV file without touching the database.
+
+    ``columns`` overrides inference, which appends use so that a handful of new
+    rows cannot change the stored column types. ``hash_scheme`` defaults to
+    the fastest available field-based scheme and ``encoding`` to the one
+    detected from the file. ``fingerprint`` is hashed from the file unless the
+    import plan already computed it.
+    """
+    if fingerprint is None:
+        fingerprint, _ = fingerprint_file(csv_path)
+    header, raw_rows = read_csv_table(csv_path, start_offset, encoding)
+    rows = type_rows(header, raw_rows)
+    if columns is None:
+        columns = infer_columns(rows, index_columns)
+    return ParsedDataFile(
+        path=csv_path,
+        size_bytes=fingerprint.size_bytes - start_offset,
+        rows=rows,
+        columns=columns,
+        index_values=[extract_index_cols(row, columns) for row in rows],
+        row_hashes=hash_raw_rows(
+            header,
+            raw_rows,
+            rows,
+            scheme=hash_scheme,
+            workers=hash_workers,
+        ),
+        fingerprint=fingerprint,
+    )
+
+
+@dataclass
+class WorksheetTable:
+    """Header and natively typed rows streamed from one worksheet."""
+
+    title: str
+    header: list[str]
+    rows: list[list[object]]
+
+
+def list_excel_sheets(excel_path: Path) -> list[str]:
+    """Return worksheet titles without reading any cell data."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def normalize_cell(value: object) -> object:
+    """Convert an openpyxl cell value into a JSON-friendly native value."""
+    if isinstance(value, str):
+        stripped = value.strip()
+        return stripped or None
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def sheet_slug(title: str) -> str:
+    """Return the dataset slug suffix of a worksheet title.
+
+    Runs of non-word characters become ``_`` and letters are lower-cased, so
+    Japanese titles stay readable; titles without any word character fall
+    back to a short hash of the title.
+    """
+    slug = re.sub(r"\W+", "_", title).strip("_").casefold()
+    return slug or f"sheet_{hashlib.sha256(title.encode()).hexdigest()[:8]}"
+
+
+def read_excel_tables(
+    excel_path: Path,
+    sheet_names: Collection[str] | None = None,
+) -> Iterator[WorksheetTable]:
+    """Stream the selected worksheets of a workbook in a single pass.
+
+    Sheets are yielded one at a time, so only one sheet's rows are held in
+    memory. The first non-empty row of each sheet is the header and fully
+    empty rows are skipped. Cell values keep their native types (see
+    ``normalize_cell``).
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            if sheet_names is not None and worksheet.title not in sheet_names:
+                continue
+            header: list[str] | None = None
+            rows: list[list[object]] = []
+            for values in worksheet.iter_rows(values_only=True):
+                cells = [normalize_cell(value) for value in values]
+                if all(cell is None for cell in cells):
+                    continue
+                if header is None:
+                    header = [
+                        str(cell) if cell is not None else f"column_{position}"
+                        for position, cell in enumerate(cells, start=1)
+                    ]
+                    continue
+                width = len(header)
+                rows.append([*cells[:width], *([None] * (width - len(cells)))])
+            yield WorksheetTable(title=worksheet.title, header=header or [], rows=rows)
+    finally:
+        workbook.close()
+
+
+def parse_excel_table(
+    excel_path: Path,
+    table: WorksheetTable,
+    fingerprint: FileFingerprint | None = None,
+    index_columns: list[str] | None = None,
+    hash_scheme: str | None = None,
+    hash_workers: int = 1,
+) -> ParsedDataFile:
+    """Build a ParsedDataFile from a worksheet without re-parsing strings."""
+    rows: list[dict[str, object]] = [
+        dict(zip(table.header, cells, strict=True)) for cells in table.rows
+    ]
+    columns = infer_columns(rows, index_columns)
+    fields = [
+        [None if cell is None else str(cell) for cell in cells] for cells in table.rows
+    ]
+    return ParsedDataFile(
+        path=excel_path,
+        size_bytes=fingerprint.size_bytes if fingerprint else 0,
+        rows=rows,
+        columns=columns,
+        index_values=[extract_index_cols(row, columns) for row in rows],
+        row_hashes=hash_raw_rows(
+            table.header,
+            fields,
+            rows,
+            scheme=hash_scheme,
+            workers=hash_workers,
+        ),
+        fingerprint=fingerprint,
+    )
+
+
 def parse_value(value: str | None) -> Any:
     """Convert CSV cell strings to typed Python values."""
     if value is None:
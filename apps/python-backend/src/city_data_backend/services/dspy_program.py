@@ -22,6 +22,8 @@ from city_data_backend.models.dspy import (
 )
 from city_data_backend.services.query_runner import QueryRunner
 from city_data_backend.services.query_spec import RuleBasedQueryGenerator
+from city_data_backend.utils.metrics import record_cache_access
+from city_data_backend.utils.timing import stage
 
 if TYPE_CHECKING:  # pragma: no cover - type checking imports
     from sqlalchemy.orm import Session
@@ -293,41 +295,63 @@ class InteractiveAnalysisProgram:
         """Initialize the program with a repository and optional runner."""
         self.repo = repo
         self.generator = RuleBasedQueryGenerator()
-        self.runner = runner or QueryRunner(repo.session)
-        self.compiled_program = compiled_program or load_compiled_program()
+        self.runner = runner or QueryRunner(repo.read_session)
+        if compiled_program is None:
+            with stage("load_program") as attrs:
+                compiled_program = load_compiled_program()
+                attrs["found"] = compiled_program is not None
+        self.compiled_program = compiled_program
         self.program_version = (
             self.compiled_program.version if self.compiled_program else "rule-based-v1"
         )
 
     def run(self, request: InteractiveRequest) -> InteractiveResponse:
-        """Execute NL question to query to result pipeline."""
-        dataset_meta = self.repo.get_dataset_metadata(request.dataset_id)
+        """Execute NL question to query to result pipeline.
+
+        Every stage is timed with :func:`stage` so that slow requests can be
+        attributed to a stage in the logs and the ``Server-Timing`` header.
+        """
+        with stage("metadata") as attrs:
+            dataset_meta = self.repo.get_dataset_metadata(request.dataset_id)
+            attrs["columns"] = len(dataset_meta["columns"])
         query_spec_model = None
         used_version = self.program_version
         if self.compiled_program:
-            query_spec_model = self.compiled_program.predict(
-                request.question,
-                dataset_meta,
-            )
+            with stage("predict") as attrs:
+                query_spec_model = self.compiled_program.predict(
+                    request.question,
+                    dataset_meta,
+                )
+                attrs["hit"] = query_spec_model is not None
+                record_cache_access("compiled_program", hit=attrs["hit"])
         if query_spec_model is None:
-            query_spec_model = self.generator.generate(request.question, dataset_meta)
+            with stage("fallback"):
+                query_spec_model = self.generator.generate(
+                    request.question,
+                    dataset_meta,
+                )
             used_version = "rule-based-v1"
 
         query_spec_dict = cast(
             "QuerySpecDict",
             query_spec_model.model_dump(),
         )
-        result = self.runner.run(request.dataset_id, query_spec_dict)
-        insight = self._summarize(request.question, result)
-        analysis = self.repo.record_analysis(
-            dataset_id=request.dataset_id,
-            question=request.question,
-            query_spec=dict(query_spec_dict),
-            result_summary=result["summary"],
-            provider=request.provider,
-            model=request.model,
-            program_version=used_version,
-        )
+        with stage("query") as attrs:
+            result = self.runner.run(request.dataset_id, query_spec_dict)
+            attrs["rows_in"] = result["summary"].get("requested_rows")
+            attrs["rows_out"] = result["summary"].get("returned_rows")
+        with stage("summarize"):
+            insight = self._summarize(request.question, result)
+        with stage("record"):
+            analysis = self.repo.record_analysis(
+                dataset_id=request.dataset_id,
+                question=request.question,
+                query_spec=dict(query_spec_dict),
+                result_summary=result["summary"],
+                provider=request.provider,
+                model=request.model,
+                program_version=used_version,
+            )
         query_spec_payload: dict[str, Any] = dict(query_spec_dict)
 
         return InteractiveResponse(
@@ -38,6 +38,7 @@ class PlanExperiments:
                 filters=[],
                 group_by=group_by,
                 metrics=metrics,
+                windows=[],
                 order_by=[QueryOrder(column=group_by[0], direction="asc")]
                 if group_by
                 else [],
@@ -59,6 +60,7 @@ class PlanExperiments:
                     filters=[],
                     group_by=group_by,
                     metrics=[QueryMetric(agg="max", column=numeric_columns[0])],
+                    windows=[],
                     order_by=[QueryOrder(column=numeric_columns[0], direction="desc")],
                     limit=10,
                 )
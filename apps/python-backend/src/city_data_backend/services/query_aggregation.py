@@ -0,0 +1,252 @@
+"""Mergeable partial aggregates for QuerySpec metrics.
+
+Every metric is reduced to statistics that merge associatively: ``count``,
+``sum``, ``min`` and ``max``, with ``avg`` kept as ``sum`` plus ``count``;
+``count_distinct``, ``median`` and ``percentile`` keep the mergeable sketches
+of :mod:`city_data_backend.services.sketches` instead. A partial aggregate is
+a frame indexed by the group keys whose columns are ``(column, statistic)``
+pairs plus the group size. Partials computed over
+separate batches or chunks of rows merge into the partial of their union, and
+:func:`finalize_partial` turns the merged partial into the same result frame
+``QueryRunner`` builds from a single ``groupby``.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+
+from city_data_backend.services.sketches import (
+    DistinctSketch,
+    QuantileSketch,
+    merge_sketches,
+)
+
+if TYPE_CHECKING:
+    from city_data_backend.models.dspy import QueryMetricDict
+
+DataFrame = Any
+Series = Any
+
+ROWS_KEY = ("", "rows")
+SINGLE_GROUP = "__all__"
+
+# QuerySpec aggregator -> pandas aggregation used in result column names.
+AGG_NAMES = {
+    "avg": "mean",
+    "sum": "sum",
+    "max": "max",
+    "min": "min",
+    "count": "count",
+    "count_distinct": "count_distinct",
+    "median": "median",
+}
+# Statistics each aggregation needs, and how partial statistics merge.
+_REQUIRED_STATS = {
+    "mean": ("sum", "count"),
+    "sum": ("sum",),
+    "max": ("max",),
+    "min": ("min",),
+    "count": ("count",),
+    "count_distinct": ("distinct",),
+    "median": ("quantiles",),
+}
+_MERGE = {
+    "sum": "sum",
+    "count": "sum",
+    "min": "min",
+    "max": "max",
+    "rows": "sum",
+    "distinct": merge_sketches,
+    "quantiles": merge_sketches,
+}
+_SKETCHES = {
+    "distinct": DistinctSketch.from_values,
+    "quantiles": QuantileSketch.from_values,
+}
+
+
+def metric_agg(metric: QueryMetricDict) -> str:
+    """Return the aggregation named in result columns, e.g. ``mean`` or ``p90``.
+
+    ``percentile`` metrics are named after their ``p`` (0-100).
+    """
+    agg = metric.get("agg", "count")
+    percent = metric.get("p")
+    if agg == "percentile" and percent is not None:
+        return f"p{percent:g}"
+    return AGG_NAMES.get(agg, agg)
+
+
+def percentile_of(agg: str) -> float | None:
+    """Return the quantile (0-1) a ``median``/``p<percent>`` aggregation asks for."""
+    if agg == "median":
+        return 0.5
+    if agg.startswith("p"):
+        try:
+            return float(agg[1:]) / 100
+        except ValueError:
+            return None
+    return None
+
+
+def _stats_of(agg: str) -> tuple[str, ...] | None:
+    if agg in _REQUIRED_STATS:
+        return _REQUIRED_STATS[agg]
+    if percentile_of(agg) is not None:
+        return ("quantiles",)
+    return None
+
+
+def required_stats(metrics: list[QueryMetricDict]) -> list[tuple[str, str]]:
+    """Return the ``(column, statistic)`` pairs the metrics are computed from."""
+    stats: dict[tuple[str, str], None] = {}
+    for metric in metrics:
+        column = metric.get("column")
+        stat_names = _stats_of(metric_agg(metric))
+        if column is None or stat_names is None:
+            continue
+        for stat in stat_names:
+            stats[(column, stat)] = None
+    return list(stats)
+
+
+def result_column(metric: QueryMetricDict, *, grouped: bool) -> str | None:
+    """Return the result column :func:`finalize_partial` creates for ``metric``."""
+    agg = metric_agg(metric)
+    column = metric.get("column")
+    if agg == "count" and (column is None or not grouped):
+        return "count"
+    if not column or _stats_of(agg) is None:
+        return None
+    if grouped:
+        return f"{column}_{agg}"
+    return f"{'avg' if agg == 'mean' else agg}_{column}"
+
+
+def partial_aggregate(
+    frame: DataFrame,
+    group_by: list[str],
+    metrics: list[QueryMetricDict],
+) -> DataFrame:
+    """Aggregate ``frame`` into a mergeable partial.
+
+    Args:
+        frame: Rows of one batch or chunk, already filtered
+        group_by: Group key columns; empty for a single overall group
+        metrics: Metrics of the QuerySpec
+
+    Returns:
+        Partial aggregate indexed by the group keys
+
+    """
+    stats = required_stats(metrics)
+    if group_by:
+        grouped = frame.groupby(group_by, dropna=False, observed=True)
+        columns = {
+            key: (
+                grouped[key[0]].apply(_SKETCHES[key[1]])
+                if key[1] in _SKETCHES
+                else grouped[key[0]].agg(key[1])
+            )
+            for key in stats
+        }
+        columns[ROWS_KEY] = grouped.size()
+        partial = pd.DataFrame(columns)
+    else:
+        values = {
+            key: [
+                _SKETCHES[key[1]](frame[key[0]])
+                if key[1] in _SKETCHES
+                else frame[key[0]].agg(key[1]),
+            ]
+            for key in stats
+        }
+        values[ROWS_KEY] = [len(frame)]
+        partial = pd.DataFrame(values, index=pd.Index([SINGLE_GROUP]))
+    partial.columns = pd.MultiIndex.from_tuples(list(partial.columns))
+    return partial
+
+
+def merge_partials(partials: list[DataFrame]) -> DataFrame:
+    """Merge partial aggregates over disjoint rows into one partial."""
+    non_empty = [partial for partial in partials if not partial.empty]
+    if not non_empty:
+        return partials[0]
+    if len(non_empty) == 1:
+        return non_empty[0]
+    combined: DataFrame = pd.concat(non_empty)
+    levels = list(range(combined.index.nlevels))
+    merged = combined.groupby(level=levels, dropna=False, observed=True).agg(
+        {key: _MERGE[key[1]] for key in combined.columns},
+    )
+    merged.index.names = combined.index.names
+    return merged
+
+
+def _statistic(partial: DataFrame, column: str, agg: str) -> Series:
+    if agg == "mean":
+        return partial[(column, "sum")] / partial[(column, "count")]
+    if agg == "count_distinct":
+        return partial[(column, "distinct")].map(DistinctSketch.estimate)
+    quantile = percentile_of(agg)
+    if quantile is not None:
+        # Series.map only forwards keyword arguments from pandas 3 on.
+        def at_quantile(sketch: QuantileSketch) -> float | None:
+            return sketch.quantile(quantile)
+
+        return partial[(column, "quantiles")].map(at_quantile)
+    return partial[(column, agg)]
+
+
+def _finalize_single_group(
+    partial: DataFrame,
+    metrics: list[QueryMetricDict],
+) -> DataFrame:
+    row: dict[str, object] = {}
+    for metric in metrics:
+        agg = metric_agg(metric)
+        column = metric.get("column")
+        if agg == "count":
+            row["count"] = int(partial[ROWS_KEY].sum())
+        elif column and _stats_of(agg) is not None:
+            prefix = "avg" if agg == "mean" else agg
+            value = _statistic(partial, column, agg)
+            row[f"{prefix}_{column}"] = value.iloc[0] if len(value) else None
+    return pd.DataFrame([row])
+
+
+def finalize_partial(
+    partial: DataFrame,
+    group_by: list[str],
+    metrics: list[QueryMetricDict],
+) -> DataFrame:
+    """Turn a merged partial into the QueryRunner result frame.
+
+    Grouped results have the group keys followed by ``<column>_<agg>`` columns
+    and ``count`` when a row count was requested; ungrouped results are one row
+    with ``count``/``avg_<column>``/``sum_<column>``/... as before.
+    """
+    if not group_by:
+        return _finalize_single_group(partial, metrics)
+
+    result = pd.DataFrame(index=partial.index)
+    count_requested = False
+    per_column: dict[str, list[str]] = {}
+    for metric in metrics:
+        agg = metric_agg(metric)
+        column = metric.get("column")
+        if agg == "count" and column is None:
+            count_requested = True
+        elif column:
+            per_column.setdefault(column, []).append(agg)
+    for column, aggs in per_column.items():
+        for agg in aggs:
+            result[f"{column}_{agg}"] = _statistic(partial, column, agg)
+    if not per_column:
+        result["count"] = partial[ROWS_KEY]
+    result = result.reset_index()
+    if count_requested:
+        result["count"] = partial[ROWS_KEY].to_numpy()
+    return result
@@ -0,0 +1,239 @@
+"""Approximate QuerySpec aggregation over a stratified reservoir sample.
+
+Each sampled row of stratum ``h`` stands for ``N_h / n_h`` dataset rows
+(``N_h`` rows in the dataset, ``n_h`` in the sample). Counts and sums are
+estimated by weighting the sampled rows, averages as the ratio of the two
+estimates, medians and percentiles as weighted quantiles of the sampled values,
+and ``min``/``max`` are those of the sample. Confidence intervals
+use the stratified-sampling variance with finite population correction,
+linearized for averages, and a normal approximation.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, cast
+
+import numpy as np
+import pandas as pd
+
+from city_data_backend.services.sketches import QuantileSketch
+from city_data_backend.services.query_aggregation import (
+    AGG_NAMES,
+    ROWS_KEY,
+    finalize_partial,
+    required_stats,
+    result_column,
+)
+
+if TYPE_CHECKING:
+    from city_data_backend.models.dspy import QueryMetricDict
+
+STRATUM_COLUMN = "__stratum__"
+CONFIDENCE_LEVEL = 0.95
+# Two-sided standard normal quantile for CONFIDENCE_LEVEL.
+_Z_SCORE = 1.959963984540054
+_LOW_PREFIX = "__ci_low__"
+_HIGH_PREFIX = "__ci_high__"
+
+DataFrame = Any
+Series = Any
+
+
+def stratum_weights(population: dict[str, int], sampled: dict[str, int]) -> Series:
+    """Return how many dataset rows one sampled row stands for, per stratum."""
+    sample_sizes: Series = pd.Series(sampled, dtype="float64")
+    sizes: Series = pd.Series(population, dtype="float64")
+    return sizes.reindex(sample_sizes.index) / sample_sizes
+
+
+def _weighted_sketch(rows: DataFrame) -> QuantileSketch:
+    return QuantileSketch.from_values(rows["value"], rows["weight"])
+
+
+def _keys(frame: DataFrame, group_by: list[str]) -> list[Any]:
+    if group_by:
+        return [frame[key] for key in group_by]
+    return [np.zeros(len(frame), dtype=np.int8)]
+
+
+def weighted_partial(
+    frame: DataFrame,
+    group_by: list[str],
+    metrics: list[QueryMetricDict],
+    weight: Series,
+) -> DataFrame:
+    """Aggregate sampled rows into a partial of estimated counts and sums."""
+    keys = _keys(frame, group_by)
+    columns: dict[tuple[str, str], Series] = {}
+    for column, stat in required_stats(metrics):
+        values = frame[column]
+        if stat in {"min", "max"}:
+            grouped = values.groupby(keys, dropna=False, observed=True)
+            columns[(column, stat)] = grouped.agg(stat)
+            continue
+        if stat == "quantiles":
+            weighted_values: DataFrame = pd.DataFrame(
+                {"value": values, "weight": weight},
+            )
+            columns[(column, stat)] = weighted_values.groupby(
+                keys,
+                dropna=False,
+                observed=True,
+            ).apply(_weighted_sketch)
+            continue
+        if stat == "sum":
+            weighted = values.astype("float64") * weight
+        else:
+            weighted = values.notna() * weight
+        columns[(column, stat)] = weighted.groupby(
+            keys,
+            dropna=False,
+            observed=True,
+        ).sum()
+    columns[ROWS_KEY] = weight.groupby(keys, dropna=False, observed=True).sum()
+    partial: DataFrame = pd.DataFrame(columns)
+    partial.columns = pd.MultiIndex.from_tuples(list(partial.columns))
+    return partial
+
+
+def _linearized(
+    frame: DataFrame,
+    metric: QueryMetricDict,
+    keys: list[Any],
+    weight: Series,
+    *,
+    grouped: bool,
+) -> tuple[Series, Series | None] | None:
+    """Return per-row values whose estimated total has the metric's variance.
+
+    The second item is, for averages, the estimated non-null count per row's
+    group, by whose square the variance of the total is divided.
+    """
+    agg = AGG_NAMES.get(metric.get("agg", "count"))
+    column = metric.get("column")
+    if agg == "count":
+        if column is None or not grouped:
+            return pd.Series(1.0, index=frame.index), None
+        return frame[column].notna().astype("float64"), None
+    if column is None:
+        return None
+    if agg == "sum":
+        return frame[column].astype("float64").fillna(0.0), None
+    if agg == "mean":
+        values = frame[column].astype("float64")
+        present = values.notna()
+        counts = (present * weight).groupby(keys, dropna=False, observed=True)
+        totals = (values * weight).groupby(keys, dropna=False, observed=True)
+        ratio = totals.transform("sum") / counts.transform("sum")
+        return (values - ratio).where(present, 0.0), counts.sum()
+    return None
+
+
+def _total_variance(
+    values: Series,
+    keys: list[Any],
+    strata: Series,
+    factors: Series,
+    sample_sizes: Series,
+) -> Series:
+    """Variance of the estimated total of ``values`` in every group."""
+    squares: DataFrame = pd.DataFrame({"sum": values, "squares": values * values})
+    sums = squares.groupby([*keys, strata], dropna=False, observed=True).sum()
+    stratum = sums.index.get_level_values(-1)
+    sizes = sample_sizes.reindex(stratum).to_numpy()
+    factor = factors.reindex(stratum).to_numpy()
+    terms = factor * (sums["squares"] - sums["sum"] ** 2 / sizes)
+    levels = list(range(sums.index.nlevels - 1))
+    return terms.groupby(level=levels, dropna=False).sum()
+
+
+def approximate_aggregate(
+    frame: DataFrame,
+    group_by: list[str],
+    metrics: list[QueryMetricDict],
+    population: dict[str, int],
+    sampled: dict[str, int],
+) -> tuple[DataFrame, list[str]]:
+    """Estimate the QuerySpec metrics from filtered sample rows.
+
+    Args:
+        frame: Sampled rows left after filtering, with ``STRATUM_COLUMN``
+        group_by: Group key columns
+        metrics: Metrics of the QuerySpec
+        population: Dataset rows per stratum
+        sampled: Sampled rows per stratum before filtering
+
+    Returns:
+        The estimated result frame, named like the exact one, with interval
+        bound columns for every count/sum/avg result column, and the names of
+        those result columns (see :func:`pop_intervals`)
+
+    """
+    grouped = bool(group_by)
+    strata = frame[STRATUM_COLUMN]
+    sample_sizes: Series = pd.Series(sampled, dtype="float64")
+    sizes = cast("Series", pd.Series(population, dtype="float64")).reindex(
+        sample_sizes.index,
+    )
+    weight = strata.map(stratum_weights(population, sampled)).astype("float64")
+    # Stratified variance of a total: N_h^2 (1 - n_h/N_h) s_h^2 / n_h, where
+    # s_h^2 divides by n_h - 1; single-row strata contribute nothing.
+    factors = (
+        sizes**2 * (1 - sample_sizes / sizes) / (sample_sizes * (sample_sizes - 1))
+    ).where(sample_sizes > 1, 0.0)
+
+    keys = _keys(frame, group_by)
+    result: DataFrame = finalize_partial(
+        weighted_partial(frame, group_by, metrics, weight),
+        group_by,
+        metrics,
+    )
+    intervals: list[str] = []
+    for metric in metrics:
+        name = result_column(metric, grouped=grouped)
+        if name is None or name in intervals or name not in result.columns:
+            continue
+        linearized = _linearized(frame, metric, keys, weight, grouped=grouped)
+        if linearized is None:
+            continue
+        values, counts = linearized
+        variance = _total_variance(values, keys, strata, factors, sample_sizes)
+        if counts is not None:
+            variance = variance / counts.to_numpy() ** 2
+        margin = np.full(len(result), np.nan)
+        if len(variance) == len(result):
+            margin = _Z_SCORE * np.sqrt(variance.to_numpy(dtype="float64"))
+        estimate = result[name].to_numpy(dtype="float64", na_value=np.nan)
+        result[f"{_LOW_PREFIX}{name}"] = estimate - margin
+        result[f"{_HIGH_PREFIX}{name}"] = estimate + margin
+        intervals.append(name)
+    return result, intervals
+
+
+def _bound(value: float) -> float | None:
+    return None if np.isnan(value) else float(value)
+
+
+def pop_intervals(
+    result: DataFrame,
+    intervals: list[str],
+) -> tuple[DataFrame, list[dict[str, list[float | None]]]]:
+    """Split the interval bound columns off an (ordered, limited) result.
+
+    Returns:
+        The result without bound columns and, per result row, the
+        ``[low, high]`` bounds of every estimated column
+
+    """
+    lows = [f"{_LOW_PREFIX}{name}" for name in intervals]
+    highs = [f"{_HIGH_PREFIX}{name}" for name in intervals]
+    low_values = result[lows].to_numpy(dtype="float64")
+    high_values = result[highs].to_numpy(dtype="float64")
+    rows = [
+        {
+            name: [_bound(low_row[index]), _bound(high_row[index])]
+            for index, name in enumerate(intervals)
+        }
+        for low_row, high_row in zip(low_values, high_values, strict=True)
+    ]
+    return result.drop(columns=[*lows, *highs]), rows
@@ -0,0 +1,195 @@
+"""Single-pass evaluation of QuerySpec filters.
+
+All filters of a spec are compiled into predicates that yield NumPy boolean
+masks. The predicates run most selective first, each one only on the row
+positions the previous ones kept, and the frame is materialized once at the
+end. Chained ``frame[frame[col] == value]`` selections copied the whole frame
+once per filter instead.
+"""
+
+from __future__ import annotations
+
+import operator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+from city_data_backend.models.dspy import filter_value_error
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from city_data_backend.models.dspy import QueryFilterDict
+
+# Rows inspected per predicate when estimating its selectivity.
+SELECTIVITY_SAMPLE_SIZE = 1024
+
+DataFrame = Any
+Series = Any
+
+
+def _as_strings(values: Series) -> Series:
+    if isinstance(values.dtype, pd.StringDtype):
+        return values
+    return values.astype("string")
+
+
+def _contains(values: Series, value: str) -> Series:
+    return _as_strings(values).str.contains(value, regex=False, na=False)
+
+
+def _startswith(values: Series, value: str) -> Series:
+    return _as_strings(values).str.startswith(value, na=False)
+
+
+def _between(values: Series, value: list[Any]) -> Series:
+    low, high = value
+    return values.between(low, high, inclusive="both")
+
+
+FILTER_OPERATORS: dict[str, Callable[[Series, Any], Series]] = {
+    "eq": operator.eq,
+    "gte": operator.ge,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "lt": operator.lt,
+    # Membership is a hash-set lookup per row, however long the list is.
+    "in": lambda values, value: values.isin(value),
+    "not_in": lambda values, value: ~values.isin(value),
+    "between": _between,
+    "is_null": lambda values, _: values.isna(),
+    "not_null": lambda values, _: values.notna(),
+    "contains": _contains,
+    "startswith": _startswith,
+}
+
+
+class QueryValidationError(ValueError):
+    """Raised when a query spec references invalid columns."""
+
+
+@dataclass(frozen=True)
+class FilterPredicate:
+    """One compiled filter clause with its estimated selectivity."""
+
+    column: str
+    op: str
+    value: Any
+    selectivity: float = 1.0
+
+    def mask(self, values: Series) -> np.ndarray:
+        """Return the boolean mask of ``values`` that satisfy the clause."""
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return self._categorical_mask(values)
+        matched = FILTER_OPERATORS[self.op](values, self.value)
+        return np.asarray(matched, dtype=bool)
+
+    def _categorical_mask(self, values: Series) -> np.ndarray:
+        # Evaluate the clause once per distinct value (plus null, which has
+        # code -1 and therefore picks the last entry) and gather by code.
+        categories = values.cat.categories
+        dictionary: Series = pd.Series([*categories, None], dtype=categories.dtype)
+        matched = np.asarray(
+            FILTER_OPERATORS[self.op](dictionary, self.value),
+            dtype=bool,
+        )
+        return matched[values.cat.codes.to_numpy()]
+
+
+def _estimate_selectivity(predicate: FilterPredicate, values: Series) -> float:
+    step = max(1, len(values) // SELECTIVITY_SAMPLE_SIZE)
+    sample = values.iloc[::step]
+    if sample.empty:
+        return 1.0
+    return float(predicate.mask(sample).mean())
+
+
+def validate_filter(filter_item: QueryFilterDict) -> None:
+    """Check that a filter uses a known operator with a well-formed value.
+
+    Raises:
+        QueryValidationError: The operator is unknown or the value does not fit
+
+    """
+    op = filter_item.get("op", "eq")
+    if op not in FILTER_OPERATORS:
+        msg = f"Unsupported operator: {op}"
+        raise QueryValidationError(msg)
+    error = filter_value_error(op, filter_item.get("value"))
+    if error is not None:
+        msg = f"Invalid value for filter on {filter_item.get('column')}: {error}"
+        raise QueryValidationError(msg)
+
+
+def compile_filters(
+    frame: DataFrame,
+    filters: list[QueryFilterDict],
+) -> list[FilterPredicate]:
+    """Validate ``filters`` against ``frame`` and order them by selectivity.
+
+    Args:
+        frame: Frame the filters will run on
+        filters: Filter clauses from a QuerySpec
+
+    Returns:
+        Predicates sorted so the one expected to keep the fewest rows runs first
+
+    Raises:
+        QueryValidationError: A filter names a missing column or unknown operator
+
+    """
+    predicates: list[FilterPredicate] = []
+    for filter_item in filters:
+        column = filter_item.get("column")
+        op = filter_item.get("op", "eq")
+        if column not in frame.columns:
+            msg = f"Unknown filter column: {column}"
+            raise QueryValidationError(msg)
+        validate_filter(filter_item)
+        predicates.append(FilterPredicate(column, op, filter_item.get("value")))
+    if len(predicates) < 2:  # noqa: PLR2004 - ordering needs two predicates
+        return predicates
+    estimated = [
+        FilterPredicate(
+            predicate.column,
+            predicate.op,
+            predicate.value,
+            _estimate_selectivity(predicate, frame[predicate.column]),
+        )
+        for predicate in predicates
+    ]
+    return sorted(estimated, key=lambda predicate: predicate.selectivity)
+
+
+def filter_positions(
+    frame: DataFrame,
+    predicates: list[FilterPredicate],
+) -> np.ndarray:
+    """Return the row positions of ``frame`` that satisfy every predicate."""
+    positions = np.arange(len(frame))
+    for index, predicate in enumerate(predicates):
+        if positions.size == 0:
+            break
+        column = frame[predicate.column]
+        values = column if index == 0 else column.iloc[positions]
+        positions = positions[predicate.mask(values)]
+    return positions
+
+
+def apply_filters(
+    frame: DataFrame,
+    filters: list[QueryFilterDict],
+) -> DataFrame:
+    """Return the rows of ``frame`` matching all ``filters`` in one selection.
+
+    The frame is returned as is when no row is filtered out.
+    """
+    predicates = compile_filters(frame, filters)
+    if not predicates:
+        return frame
+    positions = filter_positions(frame, predicates)
+    if positions.size == len(frame):
+        return frame
+    return frame.take(positions)
@@ -0,0 +1,221 @@
+"""Equi-joins of a QuerySpec's dataset with a second dataset.
+
+A ``join`` section names another ``dataset_id`` and the key columns, which
+must be index columns (``is_index``) of the joined dataset and default to the
+index columns both datasets share, e.g. ``ward``/``year``. :func:`hash_join`
+builds a hash table over the keys of the smaller side, which is typically a
+per-ward or per-year table, and probes it with the other side's keys
+(``Index.get_indexer``), so each side is scanned once; duplicate keys on the
+build side fall back to ``DataFrame.merge``. Streaming queries broadcast the
+joined dataset: its frame is loaded once and every batch of records probes it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+from city_data_backend.services.query_filters import QueryValidationError
+
+if TYPE_CHECKING:
+    from city_data_backend.models.dspy import QueryJoinDict
+    from city_data_backend.services.datasets import ColumnMetadata, DatasetMetadata
+
+JOIN_TYPES = frozenset({"inner", "left"})
+
+DataFrame = Any
+Series = Any
+
+
+@dataclass(frozen=True)
+class JoinPlan:
+    """Validated join: keys, join type and the joined dataset's columns.
+
+    ``renames`` maps joined-dataset columns whose names clash with the
+    queried dataset to ``<slug>.<name>``; ``columns`` is their metadata under
+    the names they get in the joined frame.
+    """
+
+    dataset_id: int
+    on: list[str]
+    how: str
+    renames: dict[str, str]
+    columns: list[ColumnMetadata]
+
+
+def _join_keys(
+    join: QueryJoinDict,
+    left_names: set[str],
+    right_meta: DatasetMetadata,
+) -> list[str]:
+    right_index = [
+        column["name"] for column in right_meta["columns"] if column["is_index"]
+    ]
+    on = join.get("on") or [name for name in right_index if name in left_names]
+    if not on:
+        msg = f"Dataset {right_meta['id']} shares no index column to join on"
+        raise QueryValidationError(msg)
+    for key in on:
+        if key not in left_names:
+            msg = f"Unknown join key: {key}"
+            raise QueryValidationError(msg)
+        if key not in right_index:
+            msg = f"Join key {key} is not an index column of dataset {right_meta['id']}"
+            raise QueryValidationError(msg)
+    return list(on)
+
+
+def plan_join(
+    join: QueryJoinDict,
+    left_columns: list[ColumnMetadata],
+    right_meta: DatasetMetadata,
+) -> JoinPlan:
+    """Validate a join section against both datasets' column metadata.
+
+    Raises:
+        QueryValidationError: The join type is unknown, no keys are given or
+            shared, or a key or requested column does not exist
+
+    """
+    how = join.get("how", "inner")
+    if how not in JOIN_TYPES:
+        msg = f"Unsupported join type: {how}"
+        raise QueryValidationError(msg)
+    left_names = {column["name"] for column in left_columns}
+    on = _join_keys(join, left_names, right_meta)
+    right_columns = right_meta["columns"]
+    requested = join.get("columns")
+    right_names = {column["name"] for column in right_columns}
+    for name in requested or []:
+        if name not in right_names:
+            msg = f"Unknown join column: {name}"
+            raise QueryValidationError(msg)
+    renames: dict[str, str] = {}
+    columns: list[ColumnMetadata] = []
+    for column in right_columns:
+        name = column["name"]
+        if name in on or (requested is not None and name not in requested):
+            continue
+        if name in left_names:
+            renames[name] = f"{right_meta['slug']}.{name}"
+        columns.append({**column, "name": renames.get(name, name)})
+    return JoinPlan(right_meta["id"], on, how, renames, columns)
+
+
+def _key_values(values: Series) -> Series:
+    # Keys compare by value whatever their (compacted) dtype on each side.
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.astype(object)
+    if values.dtype.kind in "iuf":
+        return values.astype("float64")
+    return values
+
+
+def _key_index(frame: DataFrame, on: list[str]) -> Any:
+    if len(on) == 1:
+        return pd.Index(_key_values(frame[on[0]]))
+    keys: DataFrame = pd.DataFrame({key: _key_values(frame[key]) for key in on})
+    return pd.MultiIndex.from_frame(keys)
+
+
+def _probe(table: Any, frame: DataFrame, on: list[str]) -> np.ndarray:
+    """Return the table position of every row's key; -1 without a match."""
+    positions: np.ndarray = table.get_indexer(_key_index(frame, on))
+    # As in SQL, null keys never match.
+    positions[frame[on].isna().any(axis=1).to_numpy()] = -1
+    return positions
+
+
+def _merge_indexer(
+    left: DataFrame,
+    right: DataFrame,
+    on: list[str],
+    how: str,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Match rows with ``DataFrame.merge``, which expands duplicate keys."""
+    present = np.flatnonzero(~right[on].isna().any(axis=1).to_numpy())
+    left_keys: DataFrame = pd.DataFrame({key: _key_values(left[key]) for key in on})
+    right_keys: DataFrame = pd.DataFrame(
+        {key: _key_values(right[key]).iloc[present] for key in on},
+    )
+    pairs = left_keys.assign(__left__=np.arange(len(left))).merge(
+        right_keys.assign(__right__=present),
+        on=on,
+        how=how,
+        sort=False,
+    )
+    left_positions: np.ndarray = pairs["__left__"].to_numpy(dtype=np.intp)
+    right_positions: np.ndarray = (
+        pairs["__right__"]
+        .fillna(-1)
+        .to_numpy(
+            dtype=np.intp,
+        )
+    )
+    order = np.argsort(left_positions, kind="stable")
+    return left_positions[order], right_positions[order]
+
+
+def _join_indexer(
+    left: DataFrame,
+    right: DataFrame,
+    on: list[str],
+    how: str,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return matching left/right row positions (-1: no right row)."""
+    if len(right) <= len(left):
+        table = _key_index(right, on)
+        if not table.is_unique:
+            return _merge_indexer(left, right, on, how)
+        right_positions = _probe(table, left, on)
+        left_positions = np.arange(len(left))
+        if how == "inner":
+            matched = right_positions >= 0
+            return left_positions[matched], right_positions[matched]
+        return left_positions, right_positions
+
+    table = _key_index(left, on)
+    if not table.is_unique:
+        return _merge_indexer(left, right, on, how)
+    probed = _probe(table, right, on)
+    right_positions = np.flatnonzero(probed >= 0)
+    left_positions = probed[right_positions]
+    if how == "left":
+        unmatched = np.setdiff1d(np.arange(len(left)), left_positions)
+        left_positions = np.concatenate([left_positions, unmatched])
+        right_positions = np.concatenate(
+            [right_positions, np.full(len(unmatched), -1, dtype=np.intp)],
+        )
+    # Keep the order of the queried dataset's rows.
+    order = np.argsort(left_positions, kind="stable")
+    return left_positions[order], right_positions[order]
+
+
+def hash_join(
+    left: DataFrame,
+    right: DataFrame,
+    on: list[str],
+    how: str = "inner",
+) -> DataFrame:
+    """Join ``right``'s non-key columns onto ``left`` rows with equal keys.
+
+    Args:
+        left: Rows of the queried dataset
+        right: Rows of the joined dataset, already renamed by its plan
+        on: Key columns present in both frames
+        how: ``inner`` keeps matched rows, ``left`` every ``left`` row
+
+    Returns:
+        The joined frame, in ``left``'s row order, with a fresh index
+
+    """
+    values: list[str] = [column for column in right.columns if column not in on]
+    left_positions, right_positions = _join_indexer(left, right, on, how)
+    joined: DataFrame = left.take(left_positions).reset_index(drop=True)
+    for column in values:
+        # -1 positions (unmatched left rows) become the column's null value.
+        joined[column] = right[column].array.take(right_positions, allow_fill=True)
+    return joined
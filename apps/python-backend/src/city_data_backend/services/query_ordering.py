@@ -0,0 +1,112 @@
+"""Ordering and limiting of QuerySpec results.
+
+With a ``limit`` only the first ``k`` rows of the ordering are needed. Instead
+of sorting every row, :func:`sort_and_limit` partitions the leading sort key
+(``numpy.partition``, linear time) to find the ``k``-th value, keeps the rows
+that can still rank within the first ``k`` and stable-sorts only those. The
+candidates keep their original order, so ties break exactly as in a stable
+sort of the whole frame.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+DataFrame = Any
+Series = Any
+
+# Integer, unsigned and float kinds, including pandas' nullable dtypes.
+_NUMERIC_KINDS = frozenset("iuf")
+
+
+def _leading_key(values: Series) -> np.ndarray | None:
+    if values.dtype.kind not in _NUMERIC_KINDS:
+        return None
+    return values.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def top_k_candidates(
+    frame: DataFrame,
+    column: str,
+    *,
+    ascending: bool,
+    k: int,
+) -> np.ndarray | None:
+    """Return a mask of rows that can rank in the first ``k`` on ``column``.
+
+    Args:
+        frame: Frame being ordered
+        column: Leading sort key
+        ascending: Direction of the leading key
+        k: Number of rows that will be kept
+
+    Returns:
+        Boolean mask, or None when the key is not numeric or has fewer than
+        ``k`` non-null values (nulls sort last, so they would be needed)
+
+    """
+    keys = _leading_key(frame[column])
+    if keys is None:
+        return None
+    present = keys[~np.isnan(keys)]
+    if present.size < k:
+        return None
+    if ascending:
+        threshold = np.partition(present, k - 1)[k - 1]
+        return keys <= threshold
+    threshold = -np.partition(-present, k - 1)[k - 1]
+    return keys >= threshold
+
+
+def resolve_result_column(frame: DataFrame, target: str) -> str | None:
+    """Return the result column ``target`` names, or None if there is none.
+
+    A metric column name also matches its aggregated result columns, e.g.
+    ``population`` matches ``population_sum`` or ``avg_population``.
+    """
+    columns: list[str] = frame.columns.tolist()
+    if target in columns:
+        return target
+    return next(
+        (
+            column
+            for column in columns
+            if column.endswith(f"_{target}") or column.startswith(f"{target}_")
+        ),
+        None,
+    )
+
+
+def sort_and_limit(
+    frame: DataFrame,
+    columns: list[str],
+    ascending: list[bool],
+    limit: int | None,
+) -> DataFrame:
+    """Stable-sort ``frame`` by ``columns`` and keep the first ``limit`` rows.
+
+    Args:
+        frame: Frame to order
+        columns: Sort keys, most significant first
+        ascending: Direction of each key
+        limit: Number of rows to keep, or None for all of them
+
+    Returns:
+        The ordered (and limited) frame
+
+    """
+    if not columns:
+        return frame if limit is None else frame.head(limit)
+    if limit is not None and limit < len(frame):
+        candidates = top_k_candidates(
+            frame,
+            columns[0],
+            ascending=ascending[0],
+            k=limit,
+        )
+        if candidates is not None:
+            frame = frame[candidates]
+    ordered = frame.sort_values(by=columns, ascending=ascending, kind="stable")
+    return ordered if limit is None else ordered.head(limit)
@@ -0,0 +1,251 @@
+"""Multi-core partitioned aggregation of QuerySpec metrics.
+
+The frame is split into contiguous row chunks that a process pool aggregates
+with :func:`~city_data_backend.services.query_aggregation.partial_aggregate`;
+the per-chunk partials are merged and finalized like streamed batches. Columns
+are copied once into ``SharedMemory`` blocks, so workers read their chunk in
+place instead of receiving pickled rows: group keys are factorized into integer
+codes (decoded again after the merge) and metric columns must have a NumPy
+numeric dtype. Frames that cannot be encoded this way are not parallelized.
+
+Chunks run on one long-lived pool shared by all queries of the process. Its
+workers are started by a ``forkserver`` (``spawn`` where that is missing), so
+they are never forked from the threads of a running server.
+"""
+
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import pairwise
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+from city_data_backend.services.query_aggregation import (
+    merge_partials,
+    partial_aggregate,
+    required_stats,
+)
+
+if TYPE_CHECKING:
+    from city_data_backend.models.dspy import QueryMetricDict
+
+DataFrame = Any
+Index = Any
+
+# Chunks per worker, so a slow chunk does not leave the other workers idle.
+CHUNKS_PER_WORKER = 2
+
+# Metric columns copied into shared memory: NumPy integers and floats.
+_SHAREABLE_DTYPES = frozenset(
+    map(np.dtype, np.typecodes["AllInteger"] + np.typecodes["Float"]),
+)
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class SharedColumn:
+    """Location of one encoded column in shared memory."""
+
+    name: str
+    block: str
+    dtype: str
+    length: int
+
+
+def _start_method() -> str:
+    methods = multiprocessing.get_all_start_methods()
+    return "forkserver" if "forkserver" in methods else "spawn"
+
+
+def worker_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the process-wide pool, (re)started with ``workers`` processes.
+
+    The pool outlives single queries, so only the first parallel query after
+    start-up (or after a change of ``workers``) pays for starting processes.
+    A replaced pool finishes the chunks already submitted to it.
+    """
+    global _pool, _pool_workers  # noqa: PLW0603
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            context = multiprocessing.get_context(_start_method())
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the worker processes of the shared pool, if it was started."""
+    global _pool, _pool_workers  # noqa: PLW0603
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+
+def _forget_pool() -> None:
+    # A forked child must start its own pool instead of using the parent's.
+    global _pool, _pool_workers, _pool_lock  # noqa: PLW0603
+    _pool = None
+    _pool_workers = 0
+    _pool_lock = threading.Lock()
+
+
+atexit.register(shutdown_pool)
+os.register_at_fork(after_in_child=_forget_pool)
+
+
+def encode_columns(
+    frame: DataFrame,
+    group_by: list[str],
+    metrics: list[QueryMetricDict],
+) -> tuple[dict[str, np.ndarray], dict[str, Index]] | None:
+    """Encode the columns a partial aggregate needs as flat NumPy arrays.
+
+    Args:
+        frame: Filtered rows to aggregate
+        group_by: Group key columns
+        metrics: Metrics of the QuerySpec
+
+    Returns:
+        The arrays by column name and the distinct values of each group key
+        (indexed by code), or None when a metric column is not a NumPy
+        numeric column or is also a group key
+
+    """
+    arrays: dict[str, np.ndarray] = {}
+    uniques: dict[str, Index] = {}
+    for key in group_by:
+        # Nulls get a code of their own, like ``groupby(dropna=False)``;
+        # categorical keys reuse their codes instead of hashing the values.
+        codes, values = frame[key].factorize(use_na_sentinel=False)
+        arrays[key] = codes.astype(np.int64, copy=False)
+        uniques[key] = pd.Index(values)
+    for column, _ in required_stats(metrics):
+        if column in uniques:
+            return None
+        if column in arrays:
+            continue
+        values = frame[column]
+        if values.dtype not in _SHAREABLE_DTYPES:
+            return None
+        arrays[column] = values.to_numpy()
+    return arrays, uniques
+
+
+def _aggregate_chunk(
+    columns: list[SharedColumn],
+    start: int,
+    stop: int,
+    group_by: list[str],
+    metrics: list[QueryMetricDict],
+) -> DataFrame:
+    blocks = [
+        shared_memory.SharedMemory(name=column.block, track=False) for column in columns
+    ]
+    try:
+        chunk: DataFrame = pd.DataFrame(
+            {
+                column.name: np.ndarray(
+                    (column.length,),
+                    dtype=column.dtype,
+                    buffer=block.buf,
+                )[start:stop]
+                for column, block in zip(columns, blocks, strict=True)
+            },
+            copy=False,
+        )
+        partial = partial_aggregate(chunk, group_by, metrics)
+        # The views must be gone before the blocks can be closed.
+        del chunk
+    finally:
+        for block in blocks:
+            block.close()
+    return partial
+
+
+def _chunk_bounds(rows: int, chunks: int) -> list[tuple[int, int]]:
+    edges = np.linspace(0, rows, chunks + 1, dtype=np.int64)
+    return [(int(start), int(stop)) for start, stop in pairwise(edges) if stop > start]
+
+
+def _decode_index(partial: DataFrame, uniques: dict[str, Index]) -> None:
+    keys = list(uniques)
+    if len(keys) == 1:
+        partial.index = uniques[keys[0]].take(partial.index.to_numpy())
+        partial.index.name = keys[0]
+        return
+    decoded: DataFrame = pd.DataFrame(
+        {
+            key: uniques[key].take(partial.index.get_level_values(key).to_numpy())
+            for key in keys
+        },
+    )
+    partial.index = pd.MultiIndex.from_frame(decoded)
+
+
+def parallel_partial_aggregate(
+    frame: DataFrame,
+    group_by: list[str],
+    metrics: list[QueryMetricDict],
+    workers: int,
+) -> DataFrame | None:
+    """Aggregate ``frame`` into a partial across ``workers`` processes.
+
+    Args:
+        frame: Filtered rows to aggregate
+        group_by: Group key columns; empty for a single overall group
+        metrics: Metrics of the QuerySpec
+        workers: Number of worker processes
+
+    Returns:
+        The merged partial, indexed and sorted by the group keys like a single
+        ``groupby``, or None when the columns cannot be shared (see
+        :func:`encode_columns`)
+
+    """
+    encoded = encode_columns(frame, group_by, metrics)
+    if encoded is None:
+        return None
+    arrays, uniques = encoded
+    blocks: list[shared_memory.SharedMemory] = []
+    columns: list[SharedColumn] = []
+    try:
+        for name, values in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+            columns.append(
+                SharedColumn(name, block.name, values.dtype.str, len(values)),
+            )
+        bounds = _chunk_bounds(len(frame), workers * CHUNKS_PER_WORKER)
+        pool = worker_pool(workers)
+        futures = [
+            pool.submit(_aggregate_chunk, columns, start, stop, group_by, metrics)
+            for start, stop in bounds
+        ]
+        partials = [future.result() for future in futures]
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    if not partials:
+        return partial_aggregate(frame, group_by, metrics)
+    partial = merge_partials(partials)
+    if group_by:
+        _decode_index(partial, uniques)
+        partial = partial.sort_index()
+    return partial
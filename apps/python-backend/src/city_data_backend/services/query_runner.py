@@ -2,11 +2,49 @@
 
 from __future__ import annotations
 
+import os
+from collections import Counter
 from typing import TYPE_CHECKING, Any, cast
 
 import pandas as pd
 
+from city_data_backend.services.column_encoding import FrameCache, compact_frame
 from city_data_backend.services.datasets import DatasetRepository
+from city_data_backend.services.query_aggregation import (
+    finalize_partial,
+    merge_partials,
+    metric_agg,
+    partial_aggregate,
+    percentile_of,
+    required_stats,
+)
+from city_data_backend.services.query_filters import (
+    QueryValidationError,
+    apply_filters,
+    validate_filter,
+)
+from city_data_backend.services.query_approximate import (
+    CONFIDENCE_LEVEL,
+    STRATUM_COLUMN,
+    approximate_aggregate,
+    pop_intervals,
+    stratum_weights,
+)
+from city_data_backend.services.query_join import JoinPlan, hash_join, plan_join
+from city_data_backend.services.query_ordering import (
+    resolve_result_column,
+    sort_and_limit,
+)
+from city_data_backend.services.query_parallel import parallel_partial_aggregate
+from city_data_backend.services.query_windows import apply_windows, validate_window
+from city_data_backend.utils.logger import get_logger, log_performance
+from city_data_backend.utils.metrics import (
+    DATASET_FRAME_BYTES,
+    QUERY_ROWS_RETURNED,
+    QUERY_ROWS_SCANNED,
+    QUERY_RUNS,
+    record_cache_access,
+)
 
 if TYPE_CHECKING:  # pragma: no cover - type checking imports
     from collections.abc import Mapping
@@ -15,49 +53,376 @@ if TYPE_CHECKING:  # pragma: no cover - type checking imports
 
     from city_data_backend.models.dspy import (
         QueryFilterDict,
+        QueryJoinDict,
         QueryMetricDict,
         QuerySpecDict,
     )
+    from city_data_backend.services.datasets import ColumnMetadata
 
 
-class QueryValidationError(ValueError):
-    """Raised when a query spec references invalid columns."""
+DataFrame = Any
 
+DEFAULT_STREAMING_THRESHOLD_ROWS = 1_000_000
+DEFAULT_BATCH_SIZE = 50_000
+DEFAULT_PARALLEL_THRESHOLD_ROWS = 500_000
+# Default cap on aggregation processes, which stay up between queries.
+MAX_DEFAULT_PARALLEL_WORKERS = 4
+DEFAULT_FRAME_CACHE_BYTES = 512 * 1024 * 1024
+# Aggregators answered from mergeable sketches in streaming/parallel mode.
+SKETCH_AGGS = frozenset({"count_distinct", "median", "percentile"})
 
-DataFrame = Any
+logger = get_logger(__name__)
 
+# Compacted dataset frames shared by all runners of the process.
+FRAME_CACHE = FrameCache(
+    int(os.getenv("QUERY_FRAME_CACHE_BYTES", str(DEFAULT_FRAME_CACHE_BYTES))),
+)
 
-class QueryRunner:
-    """Run QuerySpecs on stored dataset records."""
 
-    def __init__(self, session: Session) -> None:
-        """Initialize the runner with a dataset repository."""
+class QueryRunner:
+    """Run QuerySpecs on stored dataset records.
+
+    Datasets with more than ``streaming_threshold_rows`` records are
+    aggregated in streaming mode: records are read in batches of
+    ``batch_size`` through a server-side cursor, filtered per batch and folded
+    into mergeable partial aggregates, so memory is bounded by one batch plus
+    the number of groups instead of the dataset size.
+
+    In-memory aggregations over at least ``parallel_threshold_rows`` filtered
+    rows are split into row chunks and aggregated over shared memory by a
+    process-wide pool of ``parallel_workers`` processes; below it, copying the
+    columns costs more than the single-core ``groupby``.
+
+    ``count_distinct``, ``median`` and ``percentile`` (with ``p`` from 0 to
+    100) are exact in memory; streaming and parallel runs merge HyperLogLog
+    and t-digest sketches (see :mod:`city_data_backend.services.sketches`),
+    which stay exact for small groups.
+
+    Specs with ``approximate: true`` are answered from the dataset's stratified
+    reservoir sample (see :mod:`city_data_backend.services.sampling`) when it
+    covers every stored record, with confidence intervals in the summary;
+    otherwise they run exactly.
+
+    ``windows`` (``lag``, ``pct_change``, ``rolling_mean``, ``rank``,
+    ``cumsum``) are computed on the aggregated rows by grouped pandas
+    operations, partitioned by group keys and ordered by a time key (see
+    :mod:`city_data_backend.services.query_windows`).
+
+    A ``join`` section hash-joins a second dataset on index key columns before
+    filtering (see :mod:`city_data_backend.services.query_join`); streaming
+    runs broadcast the joined dataset to every batch, and approximate specs
+    with a join run exactly.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        *,
+        streaming_threshold_rows: int | None = None,
+        batch_size: int | None = None,
+        parallel_threshold_rows: int | None = None,
+        parallel_workers: int | None = None,
+    ) -> None:
+        """Initialize the runner with a dataset repository.
+
+        The limits default to ``QUERY_STREAMING_THRESHOLD_ROWS``,
+        ``QUERY_STREAMING_BATCH_SIZE``, ``QUERY_PARALLEL_THRESHOLD_ROWS`` and
+        ``QUERY_PARALLEL_WORKERS`` (the CPU count, at most
+        ``MAX_DEFAULT_PARALLEL_WORKERS``); a threshold of 0 or a single worker
+        disables the corresponding mode.
+        """
         self.repo = DatasetRepository(session)
+        if streaming_threshold_rows is None:
+            streaming_threshold_rows = int(
+                os.getenv(
+                    "QUERY_STREAMING_THRESHOLD_ROWS",
+                    str(DEFAULT_STREAMING_THRESHOLD_ROWS),
+                ),
+            )
+        if batch_size is None:
+            batch_size = int(
+                os.getenv("QUERY_STREAMING_BATCH_SIZE", str(DEFAULT_BATCH_SIZE)),
+            )
+        self.streaming_threshold_rows = streaming_threshold_rows
+        self.batch_size = max(1, batch_size)
+        if parallel_threshold_rows is None:
+            parallel_threshold_rows = int(
+                os.getenv(
+                    "QUERY_PARALLEL_THRESHOLD_ROWS",
+                    str(DEFAULT_PARALLEL_THRESHOLD_ROWS),
+                ),
+            )
+        if parallel_workers is None:
+            default_workers = min(os.cpu_count() or 1, MAX_DEFAULT_PARALLEL_WORKERS)
+            parallel_workers = int(
+                os.getenv("QUERY_PARALLEL_WORKERS", str(default_workers)),
+            )
+        self.parallel_threshold_rows = parallel_threshold_rows
+        self.parallel_workers = max(1, parallel_workers)
 
-    def run(self, dataset_id: int, query_spec: Mapping[str, Any]) -> dict[str, Any]:
-        """Execute the provided query spec and return data, summary, and schema."""
+    @log_performance(logger, aggregate=True)
+    def run(
+        self,
+        dataset_id: int,
+        query_spec: Mapping[str, Any],
+        *,
+        streaming: bool | None = None,
+    ) -> dict[str, Any]:
+        """Execute the provided query spec and return data, summary, and schema.
+
+        ``streaming`` forces or prevents streaming mode; by default it is used
+        when the dataset exceeds ``streaming_threshold_rows``. Approximate specs
+        answered from the sample never stream.
+        """
         spec_dict = cast("QuerySpecDict", dict(query_spec))
         dataset_meta = self.repo.get_dataset_metadata(dataset_id)
-        valid_columns = {col["name"] for col in dataset_meta["columns"]}
+        columns = dataset_meta["columns"]
+        join_spec = spec_dict.get("join")
+        join_plan = self._plan_join(join_spec, columns) if join_spec else None
+        if join_plan is not None:
+            columns = [*columns, *join_plan.columns]
+        valid_columns = {col["name"] for col in columns}
         self._validate(spec_dict, valid_columns)
-
-        records = self.repo.get_records(dataset_id)
-        frame: DataFrame = pd.DataFrame(records)
-        frame = self._apply_filters(frame, spec_dict.get("filters", []))
-        frame = self._ensure_columns(frame, valid_columns)
-
-        result_frame = self._apply_group_and_metrics(frame, spec_dict)
+        join = (
+            (join_plan, self._load_joined(join_plan)) if join_plan is not None else None
+        )
+
+        approximate = (
+            self._run_approximate(dataset_id, spec_dict, dataset_meta["columns"])
+            if spec_dict.get("approximate") and join is None
+            else None
+        )
+        if streaming is None and approximate is None:
+            streaming = (
+                self.streaming_threshold_rows > 0
+                and self.repo.count_records(dataset_id) > self.streaming_threshold_rows
+            )
+        estimation: dict[str, Any] | None = None
+        if approximate is not None:
+            result_frame, scanned, matched, estimation = approximate
+        elif streaming:
+            result_frame, scanned, matched = self._run_streaming(
+                dataset_id,
+                spec_dict,
+                join,
+            )
+        else:
+            frame = self._dataset_frame(dataset_id, dataset_meta["columns"])
+            scanned = len(frame)
+            if join is not None:
+                plan, joined = join
+                frame = hash_join(frame, joined, plan.on, plan.how)
+                scanned += len(joined)
+            frame = self._apply_filters(frame, spec_dict.get("filters", []))
+            frame = self._ensure_columns(frame, valid_columns)
+            result_frame = self._aggregate(frame, spec_dict)
+            matched = len(frame)
+
+        result_frame = apply_windows(
+            result_frame,
+            spec_dict.get("windows") or [],
+            spec_dict.get("group_by") or [],
+        )
         result_frame = self._apply_order_and_limit(result_frame, spec_dict)
 
-        summary = self._build_summary(frame, result_frame, spec_dict)
+        summary = self._build_summary(matched, result_frame, spec_dict)
+        if spec_dict.get("approximate"):
+            summary["approximate"] = approximate is not None
+        if estimation is not None:
+            result_frame, intervals = pop_intervals(
+                result_frame,
+                estimation.pop("interval_columns"),
+            )
+            summary.update(estimation, confidence_intervals=intervals)
+        QUERY_RUNS.inc()
+        QUERY_ROWS_SCANNED.inc(scanned)
+        QUERY_ROWS_RETURNED.inc(len(result_frame))
         return {
             "data": cast(
                 "list[dict[str, Any]]",
                 result_frame.to_dict(orient="records"),
             ),
             "summary": summary,
-            "schema": dataset_meta["columns"],
+            "schema": columns,
+        }
+
+    def _plan_join(
+        self,
+        join: QueryJoinDict,
+        columns: list[ColumnMetadata],
+    ) -> JoinPlan:
+        dataset_id = cast("object", join.get("dataset_id"))
+        if not isinstance(dataset_id, int):
+            msg = "Join requires the dataset_id to join with"
+            raise QueryValidationError(msg)
+        try:
+            joined_meta = self.repo.get_dataset_metadata(dataset_id)
+        except ValueError as exc:
+            msg = f"Unknown join dataset: {dataset_id}"
+            raise QueryValidationError(msg) from exc
+        return plan_join(join, columns, joined_meta)
+
+    def _load_joined(self, plan: JoinPlan) -> DataFrame:
+        """Load the keys and joined columns of the joined dataset."""
+        joined_meta = self.repo.get_dataset_metadata(plan.dataset_id)
+        frame = self._dataset_frame(plan.dataset_id, joined_meta["columns"])
+        return frame.rename(columns=plan.renames).reindex(
+            columns=[*plan.on, *(column["name"] for column in plan.columns)],
+        )
+
+    def _dataset_frame(
+        self,
+        dataset_id: int,
+        columns: list[ColumnMetadata],
+    ) -> DataFrame:
+        """Return the compacted frame of a dataset's records, cached per version.
+
+        The cached frame is shared with other queries; callers derive new
+        frames from it instead of modifying it.
+        """
+        bind = self.repo.read_session.get_bind()
+        key = (bind.engine.url.render_as_string(), dataset_id)
+        version = (
+            self.repo.records_version(dataset_id),
+            tuple((column["name"], column["data_type"]) for column in columns),
+        )
+        frame: DataFrame | None = FRAME_CACHE.get(key, version)
+        record_cache_access("dataset_frame", hit=frame is not None)
+        if frame is None:
+            frame = compact_frame(
+                pd.DataFrame(self.repo.get_records(dataset_id)),
+                columns,
+            )
+            DATASET_FRAME_BYTES.set(
+                FRAME_CACHE.put(key, version, frame),
+                dataset=str(dataset_id),
+            )
+        return frame
+
+    def _run_approximate(
+        self,
+        dataset_id: int,
+        query_spec: QuerySpecDict,
+        columns: list[ColumnMetadata],
+    ) -> tuple[DataFrame, int, int, dict[str, Any]] | None:
+        """Estimate the result from the sample; None when it is missing or stale.
+
+        Returns the result frame (with interval bound columns), the sampled
+        and the estimated matching rows, and the estimation summary.
+        """
+        if any(
+            metric.get("agg") == "count_distinct"
+            for metric in query_spec.get("metrics") or []
+        ):
+            # Distinct counts do not scale from a sample to the dataset.
+            logger.info(
+                "Distinct counts cannot be estimated, running the query exactly",
+                dataset_id=dataset_id,
+            )
+            return None
+        sample = self.repo.get_sample(dataset_id)
+        if sample is None or sample.population_rows != self.repo.count_records(
+            dataset_id,
+        ):
+            logger.info(
+                "No up-to-date sample, running the query exactly",
+                dataset_id=dataset_id,
+            )
+            return None
+        sampled = dict(Counter(sample.strata))
+        frame: DataFrame = compact_frame(pd.DataFrame(sample.records), columns)
+        frame[STRATUM_COLUMN] = sample.strata
+        frame = self._apply_filters(frame, query_spec.get("filters", []))
+        frame = self._ensure_columns(
+            frame,
+            {column["name"] for column in columns} | {STRATUM_COLUMN},
+        )
+        result_frame, intervals = approximate_aggregate(
+            frame,
+            query_spec.get("group_by") or [],
+            query_spec.get("metrics") or [],
+            sample.population,
+            sampled,
+        )
+        weights = stratum_weights(sample.population, sampled)
+        matched = round(float(frame[STRATUM_COLUMN].map(weights).sum()))
+        estimation = {
+            "sample_rows": len(sample.records),
+            "population_rows": sample.population_rows,
+            "confidence_level": CONFIDENCE_LEVEL,
+            "interval_columns": intervals,
         }
+        return result_frame, len(sample.records), matched, estimation
+
+    def _run_streaming(
+        self,
+        dataset_id: int,
+        query_spec: QuerySpecDict,
+        join: tuple[JoinPlan, DataFrame] | None = None,
+    ) -> tuple[DataFrame, int, int]:
+        """Aggregate batch by batch; return the result, scanned and matched rows.
+
+        A joined dataset is broadcast: every batch is joined with its frame.
+        """
+        group_by = query_spec.get("group_by") or []
+        metrics = query_spec.get("metrics") or []
+        filters = query_spec.get("filters") or []
+        needed = list(
+            dict.fromkeys(
+                [
+                    *group_by,
+                    *(filter_item["column"] for filter_item in filters),
+                    *(column for column, _ in required_stats(metrics)),
+                ],
+            ),
+        )
+        batch_columns = needed
+        if join is not None:
+            joined_names = {column["name"] for column in join[0].columns}
+            batch_columns = list(
+                dict.fromkeys(
+                    [
+                        *join[0].on,
+                        *(column for column in needed if column not in joined_names),
+                    ],
+                ),
+            )
+        partial: DataFrame | None = None
+        scanned = matched = batches = 0
+        if join is not None:
+            scanned = len(join[1])
+        for records in self.repo.iter_record_batches(dataset_id, self.batch_size):
+            # Only the referenced columns are materialized for each batch.
+            batch = pd.DataFrame(records, columns=pd.Index(batch_columns))
+            if join is not None:
+                batch = hash_join(batch, join[1], join[0].on, join[0].how)
+            batch = apply_filters(batch, filters)
+            scanned += len(records)
+            matched += len(batch)
+            batches += 1
+            batch_partial = partial_aggregate(batch, group_by, metrics)
+            partial = (
+                batch_partial
+                if partial is None
+                else merge_partials([partial, batch_partial])
+            )
+        merged: DataFrame = (
+            partial
+            if partial is not None
+            else partial_aggregate(
+                pd.DataFrame(columns=pd.Index(needed)),
+                group_by,
+                metrics,
+            )
+        )
+        logger.debug(
+            "Streaming query completed",
+            dataset_id=dataset_id,
+            batches=batches,
+            rows_scanned=scanned,
+            groups=len(merged),
+        )
+        return finalize_partial(merged, group_by, metrics), scanned, matched
 
     def _validate(self, query_spec: QuerySpecDict, valid_columns: set[str]) -> None:
         for filter_item in query_spec.get("filters", []) or []:
@@ -65,22 +430,18 @@ class QueryRunner:
             if column and column not in valid_columns:
                 msg = f"Unknown filter column: {column}"
                 raise QueryValidationError(msg)
+            validate_filter(filter_item)
 
         for group in query_spec.get("group_by", []) or []:
             if group not in valid_columns:
                 msg = f"Unknown group_by column: {group}"
                 raise QueryValidationError(msg)
 
-        allowed_aggs = {"count", "avg", "sum", "max", "min"}
         for metric in query_spec.get("metrics", []) or []:
-            agg = metric.get("agg", "count")
-            column = metric.get("column")
-            if agg not in allowed_aggs:
-                msg = f"Unsupported aggregator: {agg}"
-                raise QueryValidationError(msg)
-            if column and column not in valid_columns:
-                msg = f"Unknown metric column: {column}"
-                raise QueryValidationError(msg)
+            self._validate_metric(metric, valid_columns)
+
+        for window in query_spec.get("windows", []) or []:
+            validate_window(window, query_spec.get("group_by") or [])
 
         for order in query_spec.get("order_by", []) or []:
             column = order.get("column")
@@ -88,6 +449,30 @@ class QueryRunner:
                 msg = f"Unknown order_by column: {column}"
                 raise QueryValidationError(msg)
 
+    def _validate_metric(
+        self,
+        metric: QueryMetricDict,
+        valid_columns: set[str],
+    ) -> None:
+        allowed_aggs = {"count", "avg", "sum", "max", "min", *SKETCH_AGGS}
+        agg = metric.get("agg", "count")
+        column = metric.get("column")
+        if agg not in allowed_aggs:
+            msg = f"Unsupported aggregator: {agg}"
+            raise QueryValidationError(msg)
+        if agg in SKETCH_AGGS and not column:
+            msg = f"Aggregator {agg} requires a column"
+            raise QueryValidationError(msg)
+        percent = metric.get("p")
+        if agg == "percentile" and not (
+            isinstance(percent, int | float) and 0 <= percent <= 100  # noqa: PLR2004
+        ):
+            msg = "Aggregator percentile requires p between 0 and 100"
+            raise QueryValidationError(msg)
+        if column and column not in valid_columns:
+            msg = f"Unknown metric column: {column}"
+            raise QueryValidationError(msg)
+
     def _ensure_columns(
         self,
         frame: DataFrame,
@@ -105,28 +490,21 @@ class QueryRunner:
         frame: DataFrame,
         filters: list[QueryFilterDict],
     ) -> DataFrame:
-        filtered: DataFrame = frame.copy()
-        for filter_item in filters:
-            column = filter_item.get("column")
-            op = filter_item.get("op", "eq")
-            value = filter_item.get("value")
-            if column not in filtered.columns:
-                msg = f"Unknown filter column: {column}"
-                raise QueryValidationError(msg)
-            if op == "eq":
-                filtered = filtered[filtered[column] == value]
-            elif op == "gte":
-                filtered = filtered[filtered[column] >= value]
-            elif op == "lte":
-                filtered = filtered[filtered[column] <= value]
-            elif op == "gt":
-                filtered = filtered[filtered[column] > value]
-            elif op == "lt":
-                filtered = filtered[filtered[column] < value]
-            else:
-                msg = f"Unsupported operator: {op}"
-                raise QueryValidationError(msg)
-        return filtered
+        return apply_filters(frame, filters)
+
+    def _aggregate(self, frame: DataFrame, query_spec: QuerySpecDict) -> DataFrame:
+        if self.parallel_workers > 1 and 0 < self.parallel_threshold_rows <= len(frame):
+            group_by = query_spec.get("group_by") or []
+            metrics = query_spec.get("metrics") or []
+            partial = parallel_partial_aggregate(
+                frame,
+                group_by,
+                metrics,
+                self.parallel_workers,
+            )
+            if partial is not None:
+                return finalize_partial(partial, group_by, metrics)
+        return self._apply_group_and_metrics(frame, query_spec)
 
     def _apply_group_and_metrics(
         self,
@@ -136,31 +514,17 @@ class QueryRunner:
         group_by = query_spec.get("group_by") or []
         metrics = query_spec.get("metrics") or []
 
-        agg_map = {
-            "avg": "mean",
-            "sum": "sum",
-            "max": "max",
-            "min": "min",
-            "count": "count",
-        }
-
         if not group_by:
             return self._apply_metrics(frame, metrics)
 
-        grouped = frame.groupby(group_by, dropna=False)
-        agg_mapping: dict[str, list[str]] = {}
-        count_requested = False
-        for metric in metrics:
-            agg = metric.get("agg", "count")
-            column = metric.get("column")
-            if agg == "count" and column is None:
-                count_requested = True
-                continue
-            if column:
-                agg_mapping.setdefault(column, []).append(agg_map.get(agg, agg))
+        # Categorical keys are grouped by their integer codes.
+        grouped = frame.groupby(group_by, dropna=False, observed=True)
+        agg_mapping, percentiles, count_requested = self._plan_group_metrics(metrics)
 
         if agg_mapping:
             aggregated = grouped.agg(agg_mapping)
+        elif percentiles:
+            aggregated = pd.DataFrame(index=grouped.size().index)
         else:
             aggregated = grouped.size().to_frame("count")
 
@@ -182,6 +546,17 @@ class QueryRunner:
                     parts = [str(cols)]
                 flattened.append("_".join(parts))
             aggregated.columns = flattened
+            aggregated = aggregated.rename(
+                columns={
+                    f"{column}_nunique": f"{column}_count_distinct"
+                    for column in agg_mapping
+                },
+            )
+        # Exact in memory; streaming and parallel runs use quantile sketches.
+        for column, agg in percentiles:
+            aggregated[f"{column}_{agg}"] = grouped[column].quantile(
+                percentile_of(agg),
+            )
 
         aggregated = aggregated.reset_index()
 
@@ -189,21 +564,37 @@ class QueryRunner:
             aggregated["count"] = grouped.size().to_numpy()
         return aggregated
 
+    def _plan_group_metrics(
+        self,
+        metrics: list[QueryMetricDict],
+    ) -> tuple[dict[str, list[str]], list[tuple[str, str]], bool]:
+        """Split metrics into pandas aggregations, percentiles and a row count."""
+        agg_mapping: dict[str, list[str]] = {}
+        percentiles: list[tuple[str, str]] = []
+        count_requested = False
+        for metric in metrics:
+            agg = metric_agg(metric)
+            column = metric.get("column")
+            if agg == "count" and column is None:
+                count_requested = True
+            elif not column:
+                continue
+            elif agg == "count_distinct":
+                agg_mapping.setdefault(column, []).append("nunique")
+            elif agg != "median" and percentile_of(agg) is not None:
+                percentiles.append((column, agg))
+            else:
+                agg_mapping.setdefault(column, []).append(agg)
+        return agg_mapping, percentiles, count_requested
+
     def _apply_metrics(
         self,
         frame: DataFrame,
         metrics: list[QueryMetricDict],
     ) -> DataFrame:
         result: dict[str, Any] = {}
-        agg_map = {
-            "avg": "mean",
-            "sum": "sum",
-            "max": "max",
-            "min": "min",
-            "count": "count",
-        }
         for metric in metrics:
-            agg = agg_map.get(metric.get("agg", "count"), metric.get("agg", "count"))
+            agg = metric_agg(metric)
             column = metric.get("column")
             if agg == "count":
                 result["count"] = len(frame)
@@ -215,6 +606,10 @@ class QueryRunner:
                 result[f"max_{column}"] = frame[column].max()
             elif column and agg == "min":
                 result[f"min_{column}"] = frame[column].min()
+            elif column and agg == "count_distinct":
+                result[f"count_distinct_{column}"] = frame[column].nunique()
+            elif column and (quantile := percentile_of(agg)) is not None:
+                result[f"{agg}_{column}"] = frame[column].quantile(quantile)
         return pd.DataFrame([result])
 
     def _apply_order_and_limit(
@@ -222,43 +617,37 @@ class QueryRunner:
         frame: DataFrame,
         query_spec: QuerySpecDict,
     ) -> DataFrame:
-        order_by = query_spec.get("order_by") or []
-        if order_by:
-            resolved_columns: list[str] = []
-            ascending: list[bool] = []
-            for item in order_by:
-                target = item.get("column")
-                candidate = target
-                if target not in frame.columns:
-                    candidate = next(
-                        (
-                            col
-                            for col in frame.columns
-                            if col.endswith(f"_{target}")
-                            or col.startswith(f"{target}_")
-                        ),
-                        None,
-                    )
-                if candidate and candidate in frame.columns:
-                    resolved_columns.append(candidate)
-                    ascending.append(item.get("direction", "asc") != "desc")
-            if resolved_columns:
-                frame = frame.sort_values(by=resolved_columns, ascending=ascending)
+        resolved_columns: list[str] = []
+        ascending: list[bool] = []
+        for item in query_spec.get("order_by") or []:
+            target = item.get("column")
+            candidate = resolve_result_column(frame, target) if target else None
+            if candidate:
+                resolved_columns.append(candidate)
+                ascending.append(item.get("direction", "asc") != "desc")
         limit = query_spec.get("limit")
-        if isinstance(limit, int) and limit > 0:
-            frame = frame.head(limit)
-        return frame
+        return sort_and_limit(
+            frame,
+            resolved_columns,
+            ascending,
+            limit if isinstance(limit, int) and limit > 0 else None,
+        )
 
     def _build_summary(
         self,
-        source_frame: DataFrame,
+        requested_rows: int,
         result_frame: DataFrame,
         query_spec: QuerySpecDict,
     ) -> dict[str, Any]:
-        return {
-            "requested_rows": len(source_frame),
+        summary: dict[str, Any] = {
+            "requested_rows": requested_rows,
             "returned_rows": len(result_frame),
             "group_by": query_spec.get("group_by") or [],
             "metrics": query_spec.get("metrics") or [],
             "filters": query_spec.get("filters") or [],
         }
+        if query_spec.get("windows"):
+            summary["windows"] = query_spec.get("windows")
+        if query_spec.get("join"):
+            summary["join"] = query_spec.get("join")
+        return summary
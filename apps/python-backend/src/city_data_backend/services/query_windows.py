@@ -0,0 +1,162 @@
+"""Window metrics over aggregated QuerySpec results.
+
+Windows run on the result rows (one row per group) after aggregation, the
+way SQL window functions run after ``GROUP BY``: for a ``ward``/``year``
+grouping, ``pct_change`` of ``population_sum`` partitioned by ``ward`` and
+ordered by ``year`` is the year-over-year change of every ward. Each window
+is one grouped pandas operation (``shift``, ``cumsum``, ``rolling``,
+``rank``) over the rows sorted by the time column; the values are aligned
+back to the result rows by index, so the result order is unchanged.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, cast
+
+import numpy as np
+
+from city_data_backend.models.dspy import window_error
+from city_data_backend.services.query_filters import QueryValidationError
+from city_data_backend.services.query_ordering import resolve_result_column
+
+if TYPE_CHECKING:
+    from city_data_backend.models.dspy import QueryWindowDict
+
+WINDOW_FUNCTIONS = frozenset({"lag", "pct_change", "rolling_mean", "rank", "cumsum"})
+# Functions that only shift or order values and so accept any column.
+_ANY_DTYPE_FUNCTIONS = frozenset({"lag", "rank"})
+
+DataFrame = Any
+Series = Any
+
+
+def validate_window(window: QueryWindowDict, group_by: list[str]) -> None:
+    """Check a window's function, parameters and key columns.
+
+    Raises:
+        QueryValidationError: The function is unknown, a parameter does not
+            fit it, or the order/partition columns are not group keys
+
+    """
+    func = window.get("func")
+    if func not in WINDOW_FUNCTIONS:
+        msg = f"Unsupported window function: {func}"
+        raise QueryValidationError(msg)
+    order_by = window.get("order_by")
+    error = window_error(
+        func,
+        order_by=order_by,
+        periods=window.get("periods", 1),
+        n=window.get("n"),
+    )
+    if error is not None:
+        msg = f"Invalid window on {window.get('column')}: {error}"
+        raise QueryValidationError(msg)
+    for key in [order_by, *(window.get("partition_by") or [])]:
+        if key is not None and key not in group_by:
+            msg = f"Window column {key} must be a group_by column"
+            raise QueryValidationError(msg)
+
+
+def window_column(window: QueryWindowDict, column: str) -> str:
+    """Return the result column a window over ``column`` is written to."""
+    func = window["func"]
+    if func == "rolling_mean":
+        return f"{column}_rolling_mean{window.get('n')}"
+    periods = window.get("periods", 1)
+    if func in {"lag", "pct_change"} and periods != 1:
+        return f"{column}_{func}{periods}"
+    return f"{column}_{func}"
+
+
+def _partition(
+    values: Series,
+    frame: DataFrame,
+    partition_by: list[str],
+) -> Any:
+    if not partition_by:
+        return None
+    return values.groupby(
+        [frame[key] for key in partition_by],
+        dropna=False,
+        observed=True,
+        sort=False,
+    )
+
+
+def _window_values(
+    frame: DataFrame,
+    window: QueryWindowDict,
+    column: str,
+    partition_by: list[str],
+) -> Series:
+    func = window["func"]
+    if func == "rank":
+        ascending = window.get("direction", "desc") != "desc"
+        grouped = _partition(frame[column], frame, partition_by)
+        ranked = grouped if grouped is not None else frame[column]
+        return ranked.rank(method="min", ascending=ascending)
+
+    # Validation guarantees a time column for every function but rank.
+    ordered: DataFrame = frame.sort_values(
+        cast("str", window.get("order_by")),
+        kind="stable",
+        na_position="last",
+    )
+    values = ordered[column]
+    grouped = _partition(values, ordered, partition_by)
+    target = grouped if grouped is not None else values
+    if func == "cumsum":
+        return target.cumsum()
+    if func == "rolling_mean":
+        size = int(window.get("n") or 1)
+        if grouped is None:
+            return values.rolling(size).mean()
+        rolled = grouped.rolling(size).mean()
+        return rolled.droplevel(list(range(len(partition_by))))
+    previous = target.shift(window.get("periods", 1))
+    if func == "lag":
+        return previous
+    change = values.astype("float64") / previous.astype("float64") - 1
+    # A change from zero has no finite ratio.
+    return change.replace([np.inf, -np.inf], np.nan)
+
+
+def apply_windows(
+    frame: DataFrame,
+    windows: list[QueryWindowDict],
+    group_by: list[str],
+) -> DataFrame:
+    """Add a column for every window to an aggregated result frame.
+
+    Args:
+        frame: Aggregated result with the group keys as columns
+        windows: Window metrics of the QuerySpec
+        group_by: Group key columns
+
+    Returns:
+        ``frame`` with one ``<column>_<func>`` column per window
+
+    Raises:
+        QueryValidationError: A window names no column of the result, or a
+            non-numeric one for a function other than ``lag``/``rank``
+
+    """
+    if not windows:
+        return frame
+    frame = frame.copy()
+    for window in windows:
+        column = resolve_result_column(frame, window["column"])
+        if column is None:
+            msg = f"Unknown window column: {window['column']}"
+            raise QueryValidationError(msg)
+        func = window["func"]
+        if func not in _ANY_DTYPE_FUNCTIONS and frame[column].dtype.kind not in "iuf":
+            msg = f"Window {func} needs a numeric column: {column}"
+            raise QueryValidationError(msg)
+        partition_by = window.get("partition_by")
+        if partition_by is None:
+            partition_by = [key for key in group_by if key != window.get("order_by")]
+        values = _window_values(frame, window, column, partition_by)
+        frame[window_column(window, column)] = values
+    return frame
@@ -0,0 +1,135 @@
+"""Versioned row hashing used to deduplicate ``DatasetRecord`` rows.
+
+The original scheme hashed ``json.dumps(row, sort_keys=True)`` with SHA-256 and
+stored the bare hex digest. Newer schemes hash a canonical byte encoding built
+directly from the raw CSV fields and store ``"<scheme>:<hex>"`` so that every
+stored ``row_hash`` identifies how it was produced. A dataset keeps using the
+scheme of its existing rows, which keeps its hashes comparable across imports.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Protocol
+
+if TYPE_CHECKING:  # pragma: no cover - imports for type checking only
+    from collections.abc import Sequence
+
+try:  # Optional dependency providing a faster non-cryptographic 128-bit hash
+    import xxhash  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - exercised when xxhash is missing
+    xxhash = None
+
+ROW_HASH_LEGACY = "sha256-json"
+ROW_HASH_BLAKE2B = "blake2b128"
+ROW_HASH_XXH128 = "xxh128"
+ROW_HASH_SCHEMES = (ROW_HASH_LEGACY, ROW_HASH_BLAKE2B, ROW_HASH_XXH128)
+
+DEFAULT_HASH_CHUNK_SIZE = 10_000
+
+_FIELD_SEPARATOR = "\x1f"
+# Domain bytes keep the fast separator encoding and the length-prefixed
+# fallback (used when a value contains the separator) from colliding.
+_JOINED_DOMAIN = b"\x00"
+_LENGTH_PREFIXED_DOMAIN = b"\x01"
+
+
+class _Hasher(Protocol):
+    def update(self, data: bytes, /) -> None: ...
+
+    def copy(self) -> _Hasher: ...
+
+    def hexdigest(self) -> str: ...
+
+
+def default_row_hash_scheme() -> str:
+    """Return the fastest scheme available in this environment."""
+    return ROW_HASH_XXH128 if xxhash is not None else ROW_HASH_BLAKE2B
+
+
+def detect_row_hash_scheme(row_hash: str) -> str:
+    """Return the scheme that produced a stored ``row_hash`` value."""
+    scheme, separator, _ = row_hash.partition(":")
+    return scheme if separator else ROW_HASH_LEGACY
+
+
+def legacy_row_hash(row: dict[str, Any]) -> str:
+    """Hash a typed row with the original SHA-256-over-JSON scheme."""
+    return hashlib.sha256(
+        json.dumps(row, sort_keys=True, ensure_ascii=False).encode("utf-8"),
+    ).hexdigest()
+
+
+def _new_hasher(scheme: str) -> _Hasher:
+    if scheme == ROW_HASH_BLAKE2B:
+        return hashlib.blake2b(digest_size=16)
+    if scheme == ROW_HASH_XXH128:
+        if xxhash is None:
+            msg = "Row hash scheme 'xxh128' requires the optional 'xxhash' package"
+            raise RuntimeError(msg)
+        return xxhash.xxh3_128()  # type: ignore[no-any-return]
+    msg = f"Unsupported row hash scheme: {scheme}"
+    raise ValueError(msg)
+
+
+class RowHasher:
+    """Hash raw CSV field lists for a fixed header with a field-based scheme.
+
+    Fields are visited in sorted header order so that column order does not
+    affect the hash, and the sorted header is mixed into the initial state once
+    so that rows from files with different columns never compare equal.
+    """
+
+    def __init__(self, header: Sequence[str], scheme: str) -> None:
+        """Precompute the field order and the header-seeded hash state."""
+        if scheme == ROW_HASH_LEGACY:
+            msg = "The legacy scheme hashes typed rows; use legacy_row_hash"
+            raise ValueError(msg)
+        self.scheme = scheme
+        self._width = len(header)
+        self._order = sorted(range(self._width), key=lambda i: header[i])
+        self._prefix = f"{scheme}:"
+        self._base = _new_hasher(scheme)
+        self._base.update(
+            _FIELD_SEPARATOR.join(header[i] for i in self._order).encode("utf-8"),
+        )
+
+    def hash_fields(self, fields: Sequence[str | None]) -> str:
+        """Return the stored ``row_hash`` value for one raw CSV row."""
+        if len(fields) < self._width:
+            fields = [*fields, *([None] * (self._width - len(fields)))]
+        values = [(fields[i] or "").strip() for i in self._order]
+        joined = _FIELD_SEPARATOR.join(values)
+        hasher = self._base.copy()
+        if joined.count(_FIELD_SEPARATOR) == max(self._width - 1, 0):
+            hasher.update(_JOINED_DOMAIN)
+            hasher.update(joined.encode("utf-8"))
+        else:
+            hasher.update(_LENGTH_PREFIXED_DOMAIN)
+            hasher.update(
+                "".join(f"{len(value)}:{value}" for value in values).encode("utf-8"),
+            )
+        return self._prefix + hasher.hexdigest()
+
+    def hash_rows(
+        self,
+        rows: Sequence[Sequence[str | None]],
+        workers: int = 1,
+        chunk_size: int = DEFAULT_HASH_CHUNK_SIZE,
+    ) -> list[str]:
+        """Hash many rows, splitting them into chunks across threads.
+
+        Threads only help where the interpreter runs them in parallel (for
+        example free-threaded builds); the default is a single thread.
+        """
+        if workers <= 1 or len(rows) <= chunk_size:
+            return [self.hash_fields(fields) for fields in rows]
+        chunks = [rows[i : i + chunk_size] for i in range(0, len(rows), chunk_size)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            hashed = pool.map(self._hash_chunk, chunks)
+            return [row_hash for chunk_hashes in hashed for row_hash in chunk_hashes]
+
+    def _hash_chunk(self, rows: Sequence[Sequence[str | None]]) -> list[str]:
+        return [self.hash_fields(fields) for fields in rows]
@@ -0,0 +1,45 @@
+"""Stratified reservoir sample of dataset records, maintained at ingestion.
+
+Every record gets a pseudo-random priority in ``[0, 1)`` derived from its
+``row_hash`` and belongs to the stratum named by the value of its first index
+column. The sample of a stratum is the ``SAMPLE_STRATUM_SIZE`` records with the
+smallest priorities, which is a uniform sample without replacement of that
+stratum (priority reservoir sampling): appending rows only ever adds records
+whose priority beats the current largest one, so the sample is updated
+incrementally and never needs a rescan. Each stratum also stores its total row
+count, from which approximate queries weight the sampled rows.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Any
+
+DEFAULT_SAMPLE_STRATUM_SIZE = 2_000
+# Values of the stratum column beyond this many share one stratum.
+MAX_SAMPLE_STRATA = 256
+OTHER_STRATUM = "__other__"
+
+_PRIORITY_SCALE = float(2**64)
+
+
+def sample_stratum_size() -> int:
+    """Return the number of records kept per stratum (``SAMPLE_STRATUM_SIZE``)."""
+    return max(
+        2,
+        int(os.getenv("SAMPLE_STRATUM_SIZE", str(DEFAULT_SAMPLE_STRATUM_SIZE))),
+    )
+
+
+def sample_priority(row_hash: str) -> float:
+    """Return the deterministic sampling priority of a record in ``[0, 1)``."""
+    digest = hashlib.blake2b(row_hash.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / _PRIORITY_SCALE
+
+
+def stratum_of(index_cols: dict[str, Any]) -> str:
+    """Return the stratum of a record: the value of its first index column."""
+    for value in index_cols.values():
+        return "" if value is None else str(value)[:255]
+    return ""
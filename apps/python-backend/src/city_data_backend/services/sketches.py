@@ -0,0 +1,234 @@
+"""Mergeable sketches for distinct counts and quantiles.
+
+:class:`DistinctSketch` keeps the exact set of 64-bit value hashes while it is
+small and turns into a HyperLogLog (``2**HLL_PRECISION`` registers, about 1.6%
+standard error) once it exceeds ``EXACT_DISTINCT_LIMIT`` values.
+:class:`QuantileSketch` keeps every value while it holds at most
+``EXACT_QUANTILE_LIMIT`` of them and is compressed into a merging t-digest
+beyond. Both are built from a batch of values with vectorized numpy code and
+merge associatively, so they fit the partial aggregates of
+:mod:`city_data_backend.services.query_aggregation`; groups that never
+exceed the limits are answered exactly.
+"""
+
+from __future__ import annotations
+
+from functools import reduce
+from numbers import Real
+from typing import TYPE_CHECKING, Any, cast
+
+import numpy as np
+from pandas.util import hash_array
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from numpy.typing import NDArray
+
+Series = Any
+
+HLL_PRECISION = 12
+EXACT_DISTINCT_LIMIT = 4_096
+TDIGEST_COMPRESSION = 500
+EXACT_QUANTILE_LIMIT = 2_000
+
+_HLL_REGISTERS = 1 << HLL_PRECISION
+_HLL_ALPHA = 0.7213 / (1 + 1.079 / _HLL_REGISTERS)
+_HLL_RANK_BITS = 64 - HLL_PRECISION
+
+# ``pandas.util`` resolves its members lazily, which type checkers cannot follow.
+_hash_array = cast("Callable[[NDArray[Any]], NDArray[np.uint64]]", hash_array)
+
+
+def _hash_class(value: object) -> str:
+    if isinstance(value, (bool, np.bool_)):
+        return "flag"
+    # NumPy registers its integer and floating scalars as ``Real`` numbers.
+    return "number" if isinstance(value, Real) else "text"
+
+
+def _hash_values(values: Series) -> NDArray[np.uint64]:
+    """Hash non-null values so equal values hash alike whatever their dtype.
+
+    Integers and floats of any width hash as the same float64 values, whether
+    or not a batch held nulls, and so do the numbers of object columns: ``1``
+    in an object batch and ``1.0`` in a float batch are one value.
+    """
+    present = values.dropna()
+    if present.dtype.kind in "iuf":
+        return _hash_array(present.to_numpy(dtype="float64"))
+    if present.dtype.kind == "b":
+        return _hash_array(present.to_numpy(dtype=bool))
+    classes: dict[str, list[object]] = {"number": [], "flag": [], "text": []}
+    items: list[object] = present.tolist()
+    for value in items:
+        classes[_hash_class(value)].append(value)
+    texts = [str(text) for text in classes["text"]]
+    return np.concatenate(
+        [
+            _hash_array(np.array(classes["number"], dtype="float64")),
+            _hash_array(np.array(classes["flag"], dtype=bool)),
+            _hash_array(np.array(texts, dtype=object)),
+        ],
+    )
+
+
+def _registers(hashes: NDArray[np.uint64]) -> NDArray[np.uint8]:
+    registers = np.zeros(_HLL_REGISTERS, dtype=np.uint8)
+    if not len(hashes):
+        return registers
+    buckets = (hashes >> np.uint64(_HLL_RANK_BITS)).astype(np.intp)
+    rest = hashes & np.uint64((1 << _HLL_RANK_BITS) - 1)
+    # The remaining bits fit a float64 exactly; frexp gives their bit length.
+    _, bit_length = np.frexp(rest.astype("float64"))
+    ranks = (_HLL_RANK_BITS + 1 - bit_length).astype(np.uint8)
+    np.maximum.at(registers, buckets, ranks)
+    return registers
+
+
+class DistinctSketch:
+    """Distinct count of values: exact hash set, then HyperLogLog registers."""
+
+    __slots__ = ("hashes", "registers")
+
+    def __init__(
+        self,
+        hashes: NDArray[np.uint64] | None = None,
+        registers: NDArray[np.uint8] | None = None,
+    ) -> None:
+        """Wrap sorted unique ``hashes`` or HyperLogLog ``registers``."""
+        self.hashes = hashes
+        self.registers = registers
+
+    @classmethod
+    def _from_hashes(cls, hashes: NDArray[np.uint64]) -> DistinctSketch:
+        if len(hashes) > EXACT_DISTINCT_LIMIT:
+            return cls(registers=_registers(hashes))
+        return cls(hashes=hashes)
+
+    @classmethod
+    def from_values(cls, values: Series) -> DistinctSketch:
+        """Sketch the non-null values of a batch."""
+        return cls._from_hashes(np.unique(_hash_values(values)))
+
+    def merge(self, other: DistinctSketch) -> DistinctSketch:
+        """Return the sketch of the union of both value sets."""
+        if self.hashes is not None and other.hashes is not None:
+            return self._from_hashes(np.union1d(self.hashes, other.hashes))
+        return DistinctSketch(
+            registers=np.maximum(self._as_registers(), other._as_registers()),
+        )
+
+    def _as_registers(self) -> NDArray[np.uint8]:
+        if self.registers is not None:
+            return self.registers
+        return _registers(self.hashes if self.hashes is not None else np.array([]))
+
+    @property
+    def exact(self) -> bool:
+        """Whether :meth:`estimate` is the exact distinct count."""
+        return self.hashes is not None
+
+    def estimate(self) -> int:
+        """Return the (estimated) number of distinct values."""
+        if self.hashes is not None:
+            return len(self.hashes)
+        registers = self._as_registers()
+        estimate = (
+            _HLL_ALPHA * _HLL_REGISTERS**2 / np.exp2(-registers.astype("float64")).sum()
+        )
+        zeros = int(np.count_nonzero(registers == 0))
+        if estimate <= 2.5 * _HLL_REGISTERS and zeros:
+            # Linear counting is more accurate for small cardinalities.
+            estimate = _HLL_REGISTERS * np.log(_HLL_REGISTERS / zeros)
+        return round(float(estimate))
+
+
+def _scale(quantiles: NDArray[np.float64]) -> NDArray[np.float64]:
+    """t-digest k1 scale: centroids are small near the tails, large mid-way."""
+    return TDIGEST_COMPRESSION / (2 * np.pi) * np.arcsin(2 * quantiles - 1)
+
+
+class QuantileSketch:
+    """Quantiles of values: every value while small, then a t-digest.
+
+    ``means`` are sorted centroid means and ``weights`` their weights; in exact
+    mode every centroid is a single value of weight one (or the value's sample
+    weight).
+    """
+
+    __slots__ = ("exact", "means", "weights")
+
+    def __init__(
+        self,
+        means: NDArray[np.float64],
+        weights: NDArray[np.float64],
+        *,
+        exact: bool,
+    ) -> None:
+        """Wrap sorted centroid ``means`` and their ``weights``."""
+        self.means = means
+        self.weights = weights
+        self.exact = exact
+
+    @classmethod
+    def from_values(
+        cls,
+        values: Series,
+        weights: Series | None = None,
+    ) -> QuantileSketch:
+        """Sketch the non-null values of a batch, optionally weighted.
+
+        Weighted sketches (sampled rows standing for several dataset rows)
+        interpolate between weighted values instead of returning the exact
+        quantiles of the values.
+        """
+        present = values.notna().to_numpy()
+        numbers = values.to_numpy(dtype="float64", na_value=np.nan)[present]
+        if weights is None:
+            counts = np.ones(len(numbers))
+        else:
+            counts = weights.to_numpy(dtype="float64")[present]
+        order = np.argsort(numbers, kind="stable")
+        sketch = cls(numbers[order], counts[order], exact=weights is None)
+        return sketch.compressed()
+
+    def merge(self, other: QuantileSketch) -> QuantileSketch:
+        """Return the sketch of both value sets together."""
+        means = np.concatenate([self.means, other.means])
+        order = np.argsort(means, kind="stable")
+        return QuantileSketch(
+            means[order],
+            np.concatenate([self.weights, other.weights])[order],
+            exact=self.exact and other.exact,
+        ).compressed()
+
+    def compressed(self) -> QuantileSketch:
+        """Merge neighbouring centroids once the sketch holds too many."""
+        if len(self.means) <= EXACT_QUANTILE_LIMIT:
+            return self
+        cumulative = np.cumsum(self.weights)
+        total = cumulative[-1]
+        # Centroids whose mid-point falls in the same unit of the scale
+        # function become one centroid.
+        cells = np.floor(_scale((cumulative - self.weights / 2) / total))
+        starts = np.flatnonzero(np.r_[True, np.diff(cells) > 0])
+        weights = np.add.reduceat(self.weights, starts)
+        means = np.add.reduceat(self.means * self.weights, starts) / weights
+        return QuantileSketch(means, weights, exact=False)
+
+    def quantile(self, q: float) -> float | None:
+        """Return the ``q`` quantile (``0 <= q <= 1``); None without values."""
+        if not len(self.means):
+            return None
+        if self.exact:
+            # Same linear interpolation as pandas' ``quantile``.
+            return float(np.quantile(self.means, q))
+        centers = np.cumsum(self.weights) - self.weights / 2
+        rank = q * float(self.weights.sum())
+        return float(np.interp(rank, centers, self.means))
+
+
+def merge_sketches[S: (DistinctSketch, QuantileSketch)](sketches: Iterable[S]) -> S:
+    """Merge the sketches of one group from several partial aggregates."""
+    return reduce(lambda left, right: left.merge(right), sketches)
@@ -9,12 +9,16 @@ import datetime
 import inspect
 import logging
 import logging.handlers
+import math
+import queue
+import random
 import sys
+import threading
 import time
 from collections.abc import Callable
 from functools import wraps
 from pathlib import Path
-from typing import Any, Protocol, TypeVar
+from typing import Any, Literal, Protocol, TypeVar, cast
 
 import structlog
 from structlog.types import EventDict, Processor
@@ -26,6 +30,20 @@ F = TypeVar("F", bound=Callable[..., Any])
 
 # OpenTelemetry exporter integration removed to avoid test freezes.
 
+OverflowPolicy = Literal["drop", "block"]
+
+DEFAULT_LOG_QUEUE_SIZE = 10_000
+DEFAULT_LOG_BATCH_SIZE = 256
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+# Stream handlers whose emit() does more than write and flush (rollover, reopening
+# a moved file); they still receive records one at a time.
+_UNBATCHED_STREAM_HANDLERS: tuple[type[logging.Handler], ...] = (
+    logging.handlers.BaseRotatingHandler,
+    logging.handlers.WatchedFileHandler,
+)
+
 
 class LoggerProtocol(Protocol):
     """Protocol defining the logger interface."""
@@ -169,6 +187,167 @@ def _add_format_processors(processors: list[Processor], log_format: str) -> None
         )
 
 
+class AsyncLogHandler(logging.Handler):
+    """Hand log records to a background thread that writes them in batches.
+
+    The calling thread only renders the message and enqueues the record. A
+    writer thread drains up to ``batch_size`` records at a time and writes each
+    batch to the wrapped handlers with a single flush. When the bounded queue
+    is full, records are dropped (and counted) under the ``"drop"`` policy or
+    the caller waits under ``"block"``.
+    """
+
+    def __init__(
+        self,
+        handlers: list[logging.Handler],
+        queue_size: int = DEFAULT_LOG_QUEUE_SIZE,
+        batch_size: int = DEFAULT_LOG_BATCH_SIZE,
+        overflow: OverflowPolicy = "block",
+    ) -> None:
+        """Start the writer thread.
+
+        Args:
+            handlers: Handlers that perform the actual I/O
+            queue_size: Maximum number of records waiting to be written
+            batch_size: Maximum number of records written per batch
+            overflow: ``"drop"`` or ``"block"`` when the queue is full
+
+        """
+        super().__init__()
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.dropped = 0
+        self._dropped_reported = 0
+        self._dropped_lock = threading.Lock()
+        self._queue: queue.Queue[logging.LogRecord | None] = queue.Queue(queue_size)
+        self._thread = threading.Thread(
+            target=self._run,
+            name="async-log-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Enqueue ``record`` according to the overflow policy."""
+        try:
+            # Render on the caller so the record no longer references args or
+            # live exception objects by the time the writer thread sees it.
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info and not record.exc_text:
+                record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+            if self.overflow == "block":
+                self._queue.put(record)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Wait until every queued record has been written."""
+        if not self._thread.is_alive():
+            return
+        if timeout is None:
+            self._queue.join()
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def close_writer(self) -> None:
+        """Write pending records and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def close(self) -> None:
+        """Stop the writer and close the wrapped handlers."""
+        self.close_writer()
+        for handler in self.handlers:
+            handler.close()
+        super().close()
+
+    def _run(self) -> None:
+        while True:
+            batch: list[logging.LogRecord] = []
+            item = self._queue.get()
+            stop = item is None
+            if item is not None:
+                batch.append(item)
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            dequeued = len(batch) + stop
+            self._write(batch)
+            for _ in range(dequeued):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, batch: list[logging.LogRecord]) -> None:
+        dropped = self.dropped - self._dropped_reported
+        if dropped:
+            self._dropped_reported += dropped
+            batch.append(
+                logging.makeLogRecord(
+                    {
+                        "name": __name__,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": f"Dropped {dropped} log records (queue full)",
+                    },
+                ),
+            )
+        for handler in self.handlers:
+            records = [record for record in batch if record.levelno >= handler.level]
+            if not records:
+                continue
+            if isinstance(handler, logging.StreamHandler) and not isinstance(
+                handler,
+                _UNBATCHED_STREAM_HANDLERS,
+            ):
+                _write_stream_batch(
+                    cast("logging.StreamHandler[Any]", handler),
+                    records,
+                )
+            else:
+                for record in records:
+                    handler.handle(record)
+
+
+def _write_stream_batch(
+    handler: logging.StreamHandler[Any],
+    records: list[logging.LogRecord],
+) -> None:
+    """Write ``records`` to a plain stream handler with one flush."""
+    if handler.stream is None:
+        # A delayed FileHandler opens its file on the first emit().
+        for record in records:
+            handler.handle(record)
+        return
+    handler.acquire()
+    try:
+        handler.stream.write(
+            "".join(handler.format(record) + handler.terminator for record in records),
+        )
+        handler.flush()
+    except Exception:
+        handler.handleError(records[0])
+    finally:
+        handler.release()
+
+
 def configure_logging(
     log_level: str = "INFO",
     log_format: str = "json",
@@ -176,6 +355,9 @@ def configure_logging(
     include_timestamp: bool = True,
     include_caller: bool = False,
     include_otel_context: bool = True,
+    async_sink: bool = False,
+    queue_size: int = DEFAULT_LOG_QUEUE_SIZE,
+    overflow: OverflowPolicy = "block",
 ) -> None:
     """Configure structured logging with the specified options.
 
@@ -186,6 +368,10 @@ def configure_logging(
         include_timestamp: Whether to include timestamps in log entries
         include_caller: Whether to include caller information
         include_otel_context: Whether to include OpenTelemetry trace context if present
+        async_sink: Write records from a background thread via
+            :class:`AsyncLogHandler` instead of on the logging thread
+        queue_size: Bounded queue size of the asynchronous sink
+        overflow: ``"drop"`` or ``"block"`` when the asynchronous queue is full
 
     """
     # Convert log level string to logging constant
@@ -230,6 +416,13 @@ def configure_logging(
         file_handler.setLevel(numeric_level)
         handlers.append(file_handler)
 
+    if async_sink:
+        for handler in handlers:
+            handler.setFormatter(logging.Formatter("%(message)s"))
+        async_handler = AsyncLogHandler(handlers, queue_size, overflow=overflow)
+        async_handler.setLevel(numeric_level)
+        handlers = [async_handler]
+
     # Configure root logger
     logging.basicConfig(
         format="%(message)s",
@@ -253,21 +446,185 @@ def get_logger(name: str) -> LoggerProtocol:
 
 
 def shutdown_logging() -> None:
-    """Shutdown logging and clean up resources."""
-    # No special cleanup required after removing OTEL exporters
-    return
+    """Shutdown logging and clean up resources.
 
+    Aggregated performance summaries are emitted first, then every
+    :class:`AsyncLogHandler` is drained and stopped. Its wrapped handlers stay
+    attached to the root logger, so later records are written synchronously.
+    """
+    flush_performance_stats()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, AsyncLogHandler):
+            root.removeHandler(handler)
+            handler.flush()
+            handler.close_writer()
+            for wrapped in handler.handlers:
+                root.addHandler(wrapped)
+
+
+class DurationHistogram:
+    """Log-scale histogram of call durations in milliseconds.
+
+    Buckets grow geometrically by 5%, so percentiles are accurate to about 5%
+    while memory stays bounded regardless of the number of calls.
+    """
 
-def log_performance(logger: LoggerProtocol) -> Callable[[F], F]:
+    RATIO = 1.05
+    MIN_MS = 0.001
+
+    def __init__(self) -> None:
+        """Create an empty histogram."""
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, duration_ms: float, failed: bool = False) -> None:
+        """Record one call."""
+        scaled = max(duration_ms, self.MIN_MS) / self.MIN_MS
+        index = math.ceil(math.log(scaled, self.RATIO))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.errors += failed
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Return the upper bound of the bucket holding the given percentile.
+
+        Args:
+            fraction: Percentile as a fraction, e.g. ``0.95``
+
+        Returns:
+            Duration in milliseconds, never above the observed maximum
+
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.MIN_MS * self.RATIO**index, self.max_ms)
+        return self.max_ms
+
+
+class PerformanceAggregator:
+    """Per-function duration histograms flushed as periodic summary logs."""
+
+    def __init__(self, flush_interval: float = 60.0) -> None:
+        """Create an aggregator.
+
+        Args:
+            flush_interval: Seconds between summaries; checked when calls are
+                recorded, so idle functions are only flushed on shutdown
+
+        """
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._stats: dict[str, tuple[LoggerProtocol, float, DurationHistogram]] = {}
+        self._window_start = time.monotonic()
+
+    def record(
+        self,
+        name: str,
+        logger: LoggerProtocol,
+        duration_ms: float,
+        failed: bool = False,
+        sample_rate: float = 1.0,
+    ) -> None:
+        """Add one sampled call of ``name`` and flush if the window is over."""
+        with self._lock:
+            entry = self._stats.get(name)
+            if entry is None:
+                entry = (logger, sample_rate, DurationHistogram())
+                self._stats[name] = entry
+            entry[2].add(duration_ms, failed)
+            due = time.monotonic() - self._window_start >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Log one summary per function for the current window and reset it."""
+        with self._lock:
+            stats, self._stats = self._stats, {}
+            window_s = time.monotonic() - self._window_start
+            self._window_start = time.monotonic()
+        for name, (logger, sample_rate, histogram) in stats.items():
+            estimated = histogram.count / sample_rate if sample_rate else 0
+            logger.info(
+                "Function performance summary",
+                function_name=name,
+                sampled_calls=histogram.count,
+                estimated_calls=round(estimated),
+                errors=histogram.errors,
+                sample_rate=sample_rate,
+                window_s=round(window_s, 3),
+                mean_ms=round(histogram.total_ms / histogram.count, 3),
+                p50_ms=round(histogram.percentile(0.50), 3),
+                p95_ms=round(histogram.percentile(0.95), 3),
+                p99_ms=round(histogram.percentile(0.99), 3),
+                max_ms=round(histogram.max_ms, 3),
+            )
+
+
+_aggregator: PerformanceAggregator | None = None
+_aggregator_lock = threading.Lock()
+
+
+def get_performance_aggregator() -> PerformanceAggregator:
+    """Return the process-wide aggregator used by ``log_performance``."""
+    global _aggregator  # noqa: PLW0603
+    if _aggregator is None:
+        with _aggregator_lock:
+            if _aggregator is None:
+                _aggregator = PerformanceAggregator(get_settings().perf_flush_interval)
+    return _aggregator
+
+
+def flush_performance_stats() -> None:
+    """Log pending aggregated performance summaries immediately."""
+    if _aggregator is not None:
+        _aggregator.flush()
+
+
+def log_performance(
+    logger: LoggerProtocol,
+    aggregate: bool = False,
+    sample_rate: float | None = None,
+) -> Callable[[F], F]:
     """Log function performance metrics.
 
+    By default every call is logged. With ``aggregate=True`` durations are
+    collected into per-function histograms instead and summarized (p50, p95,
+    p99, max) every ``PERF_FLUSH_INTERVAL`` seconds, timing only a
+    ``sample_rate`` fraction of calls. When ``PERF_ENABLED`` is false the
+    function is returned unwrapped, so hot paths can stay decorated.
+
+    ``PERF_ENABLED`` and ``PERF_SAMPLE_RATE`` are read when the decorator is
+    applied, which for module-level functions is when their module is
+    imported. They are therefore fixed at startup; changing them later only
+    affects functions decorated afterwards.
+
     Args:
         logger: Logger instance to use for performance logging
+        aggregate: Aggregate into histograms instead of logging every call
+        sample_rate: Fraction of calls to time when aggregating; defaults to
+            ``PERF_SAMPLE_RATE``
 
     Returns:
         Decorator function
 
     """
+    settings = get_settings()
+    if not settings.perf_enabled:
+        return lambda func: func
+    if aggregate:
+        rate = settings.perf_sample_rate if sample_rate is None else sample_rate
+        return _aggregating_decorator(logger, rate)
 
     def decorator(func: F) -> F:
         @wraps(func)
@@ -300,6 +657,42 @@ def log_performance(logger: LoggerProtocol) -> Callable[[F], F]:
     return decorator
 
 
+def _aggregating_decorator(
+    logger: LoggerProtocol,
+    sample_rate: float,
+) -> Callable[[F], F]:
+    """Build a ``log_performance`` decorator that records into histograms."""
+
+    def decorator(func: F) -> F:
+        if sample_rate <= 0:
+            return func
+        name = f"{func.__module__}.{func.__qualname__}"
+        aggregator = get_performance_aggregator()
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if sample_rate < 1 and random.random() >= sample_rate:  # noqa: S311
+                return func(*args, **kwargs)
+            start_time = time.perf_counter()
+            failed = True
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+            finally:
+                aggregator.record(
+                    name,
+                    logger,
+                    (time.perf_counter() - start_time) * 1000,
+                    failed,
+                    sample_rate,
+                )
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
 # Convenience function for common usage patterns
 def setup_application_logging(
     app_name: str,
@@ -0,0 +1,662 @@
+"""In-process metrics registry rendered in the Prometheus text format.
+
+Counters, gauges and histograms live in a module-level registry. Every sample
+value has its own small lock, so concurrent updates to different series never
+contend. When ``METRICS_MULTIPROC_DIR`` is set (for example with several uvicorn
+workers), each process writes its values into a memory-mapped file
+``metrics_<pid>.db`` in that directory and :func:`render_metrics` merges the
+files of all processes: counters and histograms are summed, gauges are summed
+(or maxed) over processes that are still alive.
+"""
+
+import bisect
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Any, Literal
+
+MULTIPROC_DIR_ENV = "METRICS_MULTIPROC_DIR"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+
+MetricType = Literal["counter", "gauge", "histogram"]
+LabelPairs = tuple[tuple[str, str], ...]
+SampleKey = tuple[str, str, str, LabelPairs]
+
+_HEADER = struct.Struct("<Q")
+_KEY_LENGTH = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+_INITIAL_FILE_SIZE = 64 * 1024
+
+
+class _LocalValue:
+    """A float guarded by its own lock."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._value = 0.0
+
+    def inc(self, amount: float) -> None:
+        with self._lock:
+            self._value += amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def get(self) -> float:
+        return self._value
+
+
+class _MmapFile:
+    """Append-only ``key -> float`` store backed by a per-process mmap file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        existing = path.stat().st_size if path.exists() else 0
+        with path.open("ab") as f:
+            if existing < _INITIAL_FILE_SIZE:
+                f.truncate(_INITIAL_FILE_SIZE)
+        self._file = path.open("r+b")
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        self._used = _HEADER.unpack_from(self._mm, 0)[0] or _HEADER.size
+        self.offsets = {
+            key: offset for key, offset, _ in _read_entries(self._mm, self._used)
+        }
+
+    def slot(self, key: str) -> int:
+        """Return the value offset for ``key``, appending a new entry if needed."""
+        with self._lock:
+            if key in self.offsets:
+                return self.offsets[key]
+            encoded = key.encode("utf-8")
+            padded = _padded_key_length(len(encoded))
+            needed = self._used + padded + _VALUE.size
+            if needed > len(self._mm):
+                self._grow(needed)
+            _KEY_LENGTH.pack_into(self._mm, self._used, len(encoded))
+            key_start = self._used + _KEY_LENGTH.size
+            self._mm[key_start : key_start + len(encoded)] = encoded
+            offset = self._used + padded
+            _VALUE.pack_into(self._mm, offset, 0.0)
+            self._used = offset + _VALUE.size
+            _HEADER.pack_into(self._mm, 0, self._used)
+            self.offsets[key] = offset
+            return offset
+
+    def read(self, offset: int) -> float:
+        # ``_grow`` closes and remaps ``_mm``; hold its lock across the access.
+        with self._lock:
+            return _VALUE.unpack_from(self._mm, offset)[0]
+
+    def write(self, offset: int, value: float) -> None:
+        with self._lock:
+            _VALUE.pack_into(self._mm, offset, value)
+
+    def _grow(self, needed: int) -> None:
+        size = len(self._mm)
+        while size < needed:
+            size *= 2
+        self._mm.close()
+        self._file.truncate(size)
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    def close(self) -> None:
+        with self._lock:
+            self._mm.close()
+            self._file.close()
+
+
+class _MmapValue:
+    """A float whose authoritative copy lives in the process's mmap file."""
+
+    def __init__(self, store: _MmapFile, key: str) -> None:
+        self._lock = threading.Lock()
+        self._store = store
+        self._offset = store.slot(key)
+        self._value = store.read(self._offset)
+
+    def inc(self, amount: float) -> None:
+        with self._lock:
+            self._value += amount
+            self._store.write(self._offset, self._value)
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+            self._store.write(self._offset, value)
+
+    def get(self) -> float:
+        return self._value
+
+
+def _padded_key_length(key_length: int) -> int:
+    """Return header plus key size rounded up so values stay 8-byte aligned."""
+    raw = _KEY_LENGTH.size + key_length
+    return raw + (-raw % 8)
+
+
+def _read_entries(buffer: Any, used: int) -> Iterable[tuple[str, int, float]]:
+    position = _HEADER.size
+    while position < used:
+        (key_length,) = _KEY_LENGTH.unpack_from(buffer, position)
+        key_start = position + _KEY_LENGTH.size
+        key = bytes(buffer[key_start : key_start + key_length]).decode("utf-8")
+        offset = position + _padded_key_length(key_length)
+        yield key, offset, _VALUE.unpack_from(buffer, offset)[0]
+        position = offset + _VALUE.size
+
+
+def _encode_key(key: SampleKey) -> str:
+    return json.dumps(key, ensure_ascii=False, separators=(",", ":"))
+
+
+def _decode_key(raw: str) -> SampleKey:
+    kind, name, suffix, labels = json.loads(raw)
+    return kind, name, suffix, tuple((str(k), str(v)) for k, v in labels)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsRegistry:
+    """Registry of metric families and the store their values live in."""
+
+    def __init__(self, multiproc_dir: Path | None = None) -> None:
+        """Create a registry, optionally sharing values through mmap files.
+
+        Args:
+            multiproc_dir: Directory for per-process mmap files; ``None`` keeps
+                values in process memory only
+
+        """
+        self._lock = threading.Lock()
+        self.families: dict[str, _Family] = {}
+        self.multiproc_dir = multiproc_dir
+        self._store: _MmapFile | None = None
+        self._store_pid: int | None = None
+
+    def new_value(self, key: SampleKey) -> _LocalValue | _MmapValue:
+        """Create the value holder for one sample of a family."""
+        if self.multiproc_dir is None:
+            return _LocalValue()
+        return _MmapValue(self._process_store(), _encode_key(key))
+
+    def _process_store(self) -> _MmapFile:
+        pid = os.getpid()
+        with self._lock:
+            if self._store is None or self._store_pid != pid:
+                if self.multiproc_dir is None:  # pragma: no cover - guarded above
+                    msg = "Multiprocess directory is not configured"
+                    raise RuntimeError(msg)
+                self.multiproc_dir.mkdir(parents=True, exist_ok=True)
+                self._store = _MmapFile(self.multiproc_dir / f"metrics_{pid}.db")
+                self._store_pid = pid
+            return self._store
+
+    def register(self, family: "_Family") -> None:
+        """Add a metric family, rejecting duplicate names."""
+        with self._lock:
+            if family.name in self.families:
+                msg = f"Metric {family.name} is already registered"
+                raise ValueError(msg)
+            self.families[family.name] = family
+
+    def collect(self) -> dict[SampleKey, float]:
+        """Return all sample values, merged across processes if configured."""
+        if self.multiproc_dir is None:
+            samples: dict[SampleKey, float] = {}
+            for family in list(self.families.values()):
+                samples.update(family.samples())
+            return samples
+        return self._collect_files()
+
+    def _collect_files(self) -> dict[SampleKey, float]:
+        summed: dict[SampleKey, float] = defaultdict(float)
+        gauges: dict[SampleKey, list[float]] = defaultdict(list)
+        if self.multiproc_dir is None or not self.multiproc_dir.exists():
+            return {}
+        for path in sorted(self.multiproc_dir.glob("metrics_*.db")):
+            try:
+                pid = int(path.stem.removeprefix("metrics_"))
+                data = path.read_bytes()
+            except (OSError, ValueError):
+                continue
+            if len(data) < _HEADER.size:
+                continue
+            used = _HEADER.unpack_from(data, 0)[0]
+            alive = _pid_alive(pid)
+            for raw_key, _, value in _read_entries(data, used):
+                key = _decode_key(raw_key)
+                if key[0] == "gauge":
+                    if alive:
+                        gauges[key].append(value)
+                else:
+                    summed[key] += value
+        for key, values in gauges.items():
+            family = self.families.get(key[1])
+            mode = family.multiprocess_mode if family else "sum"
+            summed[key] = max(values) if mode == "max" else sum(values)
+        return dict(summed)
+
+    def reset(self, multiproc_dir: Path | None = None) -> None:
+        """Drop all recorded values and switch the backing store."""
+        with self._lock:
+            if self._store is not None:
+                self._store.close()
+            self._store = None
+            self._store_pid = None
+            self.multiproc_dir = multiproc_dir
+        for family in self.families.values():
+            family.clear()
+
+
+class _Family(ABC):
+    """Base class for a named metric with a fixed set of label names."""
+
+    kind: MetricType
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: MetricsRegistry | None = None,
+        multiprocess_mode: Literal["sum", "max"] = "sum",
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.multiprocess_mode = multiprocess_mode
+        self.registry = registry or REGISTRY
+        self._lock = threading.Lock()
+        self._children: dict[tuple[str, ...], Any] = {}
+        self.registry.register(self)
+
+    def _child(self, labels: dict[str, Any]) -> Any:
+        values = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child(
+                        tuple(zip(self.labelnames, values, strict=True)),
+                    )
+                    self._children[values] = child
+        return child
+
+    @abstractmethod
+    def _new_child(self, labels: LabelPairs) -> Any:
+        """Create the child holding the values of one label combination."""
+
+    def samples(self) -> dict[SampleKey, float]:
+        """Return the current values of every child of this family."""
+        samples: dict[SampleKey, float] = {}
+        for child in list(self._children.values()):
+            samples.update(child.samples())
+        return samples
+
+    def clear(self) -> None:
+        """Forget all children (used when the registry is reset)."""
+        with self._lock:
+            self._children.clear()
+
+
+class _CounterChild:
+    def __init__(self, family: "Counter", labels: LabelPairs) -> None:
+        self._key: SampleKey = ("counter", family.name, "_total", labels)
+        self._value = family.registry.new_value(self._key)
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            msg = "Counters can only increase"
+            raise ValueError(msg)
+        self._value.inc(amount)
+
+    def samples(self) -> dict[SampleKey, float]:
+        return {self._key: self._value.get()}
+
+
+class Counter(_Family):
+    """Monotonically increasing count, exposed with a ``_total`` suffix."""
+
+    kind: MetricType = "counter"
+
+    def _new_child(self, labels: LabelPairs) -> _CounterChild:
+        return _CounterChild(self, labels)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Increase the series selected by ``labels``."""
+        self._child(labels).inc(amount)
+
+
+class _GaugeChild:
+    def __init__(self, family: "Gauge", labels: LabelPairs) -> None:
+        self._key: SampleKey = ("gauge", family.name, "", labels)
+        self._value = family.registry.new_value(self._key)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._value.inc(amount)
+
+    def set(self, value: float) -> None:
+        self._value.set(value)
+
+    def samples(self) -> dict[SampleKey, float]:
+        return {self._key: self._value.get()}
+
+
+class Gauge(_Family):
+    """Value that can go up and down."""
+
+    kind: MetricType = "gauge"
+
+    def _new_child(self, labels: LabelPairs) -> _GaugeChild:
+        return _GaugeChild(self, labels)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Increase the series selected by ``labels``."""
+        self._child(labels).inc(amount)
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        """Decrease the series selected by ``labels``."""
+        self._child(labels).inc(-amount)
+
+    def set(self, value: float, **labels: Any) -> None:
+        """Set the series selected by ``labels``."""
+        self._child(labels).set(value)
+
+
+class _HistogramChild:
+    def __init__(
+        self,
+        family: "Histogram",
+        labels: LabelPairs,
+    ) -> None:
+        self._upper_bounds = family.buckets
+        registry = family.registry
+        self._bucket_keys: list[SampleKey] = [
+            ("histogram", family.name, "_bucket", (*labels, ("le", _format_le(le))))
+            for le in self._upper_bounds
+        ]
+        self._buckets = [registry.new_value(key) for key in self._bucket_keys]
+        self._sum_key: SampleKey = ("histogram", family.name, "_sum", labels)
+        self._count_key: SampleKey = ("histogram", family.name, "_count", labels)
+        self._sum = registry.new_value(self._sum_key)
+        self._count = registry.new_value(self._count_key)
+
+    def observe(self, value: float) -> None:
+        # Buckets store per-bucket counts; rendering makes them cumulative.
+        index = bisect.bisect_left(self._upper_bounds, value)
+        self._buckets[index].inc(1.0)
+        self._sum.inc(value)
+        self._count.inc(1.0)
+
+    def samples(self) -> dict[SampleKey, float]:
+        samples = {
+            key: bucket.get()
+            for key, bucket in zip(self._bucket_keys, self._buckets, strict=True)
+        }
+        samples[self._sum_key] = self._sum.get()
+        samples[self._count_key] = self._count.get()
+        return samples
+
+
+class Histogram(_Family):
+    """Distribution of observations over fixed buckets."""
+
+    kind: MetricType = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: MetricsRegistry | None = None,
+    ) -> None:
+        """Create a histogram with sorted bucket upper bounds plus ``+Inf``."""
+        bounds = sorted(float(bound) for bound in buckets)
+        if not bounds or bounds[-1] != math.inf:
+            bounds.append(math.inf)
+        self.buckets = tuple(bounds)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self, labels: LabelPairs) -> _HistogramChild:
+        return _HistogramChild(self, labels)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one observation for the series selected by ``labels``."""
+        self._child(labels).observe(value)
+
+
+def _format_le(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[tuple[str, str]]) -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in labels]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _render_family(
+    name: str,
+    kind: str,
+    documentation: str,
+    samples: list[tuple[SampleKey, float]],
+) -> list[str]:
+    exposed = f"{name}_total" if kind == "counter" else name
+    lines = [
+        f"# HELP {exposed} {documentation}",
+        f"# TYPE {exposed} {kind}",
+    ]
+    if kind != "histogram":
+        lines.extend(
+            f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+            for (_, _, suffix, labels), value in sorted(samples)
+        )
+        return lines
+
+    buckets: dict[LabelPairs, list[tuple[float, float]]] = defaultdict(list)
+    totals: dict[LabelPairs, dict[str, float]] = defaultdict(dict)
+    for (_, _, suffix, labels), value in samples:
+        if suffix == "_bucket":
+            le = dict(labels)["le"]
+            series = tuple(pair for pair in labels if pair[0] != "le")
+            buckets[series].append((float(le), value))
+        else:
+            totals[labels][suffix] = value
+    for series in sorted(set(buckets) | set(totals)):
+        cumulative = 0.0
+        for bound, count in sorted(buckets.get(series, [])):
+            cumulative += count
+            labels = _format_labels((*series, ("le", _format_le(bound))))
+            lines.append(f"{name}_bucket{labels} {_format_value(cumulative)}")
+        for suffix in ("_sum", "_count"):
+            value = totals[series].get(suffix, 0.0)
+            lines.append(
+                f"{name}{suffix}{_format_labels(series)} {_format_value(value)}",
+            )
+    return lines
+
+
+def _cache_hit_ratios(samples: dict[SampleKey, float]) -> list[tuple[SampleKey, float]]:
+    """Derive ``cache_hit_ratio`` gauges from the cache request counters."""
+    per_cache: dict[str, dict[str, float]] = defaultdict(dict)
+    for (_, name, _, labels), value in samples.items():
+        if name == CACHE_REQUESTS.name:
+            label_map = dict(labels)
+            per_cache[label_map["cache"]][label_map["result"]] = value
+    ratios: list[tuple[SampleKey, float]] = []
+    for cache, results in per_cache.items():
+        total = results.get("hit", 0.0) + results.get("miss", 0.0)
+        if total:
+            key: SampleKey = ("gauge", "cache_hit_ratio", "", (("cache", cache),))
+            ratios.append((key, results.get("hit", 0.0) / total))
+    return ratios
+
+
+def render_metrics(registry: MetricsRegistry | None = None) -> str:
+    """Render every metric of ``registry`` in the Prometheus text format."""
+    registry = registry or REGISTRY
+    samples = registry.collect()
+    by_family: dict[str, list[tuple[SampleKey, float]]] = defaultdict(list)
+    for key, value in samples.items():
+        by_family[key[1]].append((key, value))
+
+    lines: list[str] = []
+    for name in sorted(set(registry.families) | set(by_family)):
+        family = registry.families.get(name)
+        family_samples = by_family.get(name, [])
+        kind = family.kind if family else family_samples[0][0][0]
+        documentation = family.documentation if family else ""
+        if family_samples:
+            lines.extend(_render_family(name, kind, documentation, family_samples))
+    if registry is REGISTRY:
+        ratios = _cache_hit_ratios(samples)
+        if ratios:
+            lines.extend(
+                _render_family(
+                    "cache_hit_ratio",
+                    "gauge",
+                    "Hit ratio derived from cache_requests_total.",
+                    ratios,
+                ),
+            )
+    return "\n".join(lines) + "\n"
+
+
+def configure_metrics(multiproc_dir: str | Path | None = None) -> None:
+    """Reset the global registry, optionally sharing values via mmap files.
+
+    Args:
+        multiproc_dir: Directory shared by all worker processes; defaults to
+            the ``METRICS_MULTIPROC_DIR`` environment variable
+
+    """
+    directory = multiproc_dir or os.getenv(MULTIPROC_DIR_ENV) or None
+    REGISTRY.reset(Path(directory) if directory else None)
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    """Count a lookup in the cache named ``cache``."""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+REGISTRY = MetricsRegistry(
+    Path(os.environ[MULTIPROC_DIR_ENV]) if os.getenv(MULTIPROC_DIR_ENV) else None,
+)
+# A forked worker must not keep writing into its parent's values or mmap file.
+os.register_at_fork(after_in_child=lambda: REGISTRY.reset(REGISTRY.multiproc_dir))
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+QUERY_RUNS = Counter(
+    "query_runs",
+    "QueryRunner.run executions.",
+)
+QUERY_ROWS_SCANNED = Counter(
+    "query_rows_scanned",
+    "Dataset records loaded by QueryRunner.run.",
+)
+QUERY_ROWS_RETURNED = Counter(
+    "query_rows_returned",
+    "Result rows returned by QueryRunner.run.",
+)
+DATASET_FRAME_BYTES = Gauge(
+    "dataset_frame_bytes",
+    "Memory of the most recently loaded in-memory frame per dataset.",
+    ("dataset",),
+    multiprocess_mode="max",
+)
+INGEST_ROWS = Counter(
+    "ingest_rows",
+    "Rows parsed during ingestion.",
+    ("file_type",),
+)
+INGEST_ROWS_INSERTED = Counter(
+    "ingest_rows_inserted",
+    "New rows written to dataset_records.",
+    ("file_type",),
+)
+INGEST_DURATION = Histogram(
+    "ingest_duration_seconds",
+    "Wall time of single-file imports.",
+    ("file_type",),
+)
+INGEST_ROWS_PER_SECOND = Gauge(
+    "ingest_rows_per_second",
+    "Throughput of the most recent import.",
+    ("source",),
+    multiprocess_mode="max",
+)
+WORKER_QUEUE_DEPTH = Gauge(
+    "worker_queue_depth",
+    "Pending jobs per worker queue.",
+    ("queue",),
+    multiprocess_mode="max",
+)
+WORKER_JOB_DURATION = Histogram(
+    "worker_job_duration_seconds",
+    "Duration of processed worker jobs.",
+    ("job_type", "status"),
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts",
+    "Connections checked out from the SQLAlchemy pool.",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out from the SQLAlchemy pool.",
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests",
+    "Cache lookups by cache name and result.",
+    ("cache", "result"),
+)
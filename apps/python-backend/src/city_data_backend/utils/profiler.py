@@ -0,0 +1,409 @@
+"""On-demand sampling CPU profiler for running API and worker processes.
+
+A background thread snapshots the Python stack of every other thread at a
+fixed interval with :func:`sys._current_frames`. No tracing hooks are
+installed, so the overhead is bounded by the sampling rate and nothing has to
+be restarted. Samples are aggregated into collapsed stacks (the input format of
+``flamegraph.pl`` and speedscope) or rendered as a speedscope JSON document.
+
+Worker processes have no HTTP endpoint; :func:`install_profile_signal_handler`
+lets :func:`request_process_profile` trigger a capture with ``SIGUSR2``. The
+request and the captured profile are exchanged through files in a private
+(``0700``) directory of the user running both processes, never opened through
+symlinks, so other local users can neither plant requests nor redirect where a
+profile is written.
+"""
+
+import json
+import os
+import signal
+import stat
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import FrameType
+from typing import Any, Literal, cast
+
+from city_data_backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ProfileFormat = Literal["collapsed", "speedscope"]
+
+DEFAULT_INTERVAL_S = 0.005
+MAX_PROFILE_SECONDS = 300
+PROFILE_MEDIA_TYPES: dict[str, str] = {
+    "collapsed": "text/plain; charset=utf-8",
+    "speedscope": "application/json",
+}
+PROFILE_FILE_SUFFIXES: dict[str, str] = {
+    "collapsed": ".txt",
+    "speedscope": ".speedscope.json",
+}
+PROFILE_SIGNAL: signal.Signals | None = getattr(signal, "SIGUSR2", None)
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+# Only one capture per process: concurrent samplers would skew each other.
+_active = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def _stack(frame: FrameType | None) -> tuple[str, ...]:
+    labels: list[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return tuple(labels)
+
+
+@dataclass
+class ProfileResult:
+    """Aggregated samples of one capture.
+
+    ``stacks`` maps ``(thread name, outermost frame, ..., innermost frame)`` to
+    the number of samples that observed that stack.
+    """
+
+    interval_s: float
+    duration_s: float = 0.0
+    samples: int = 0
+    stacks: Counter[tuple[str, ...]] = field(
+        default_factory=Counter[tuple[str, ...]],
+    )
+
+    def to_collapsed(self) -> str:
+        """Render ``frame;frame;frame count`` lines, one per unique stack."""
+        lines = [
+            ";".join(label.replace(";", ":") for label in stack) + f" {count}"
+            for stack, count in sorted(self.stacks.items())
+        ]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def to_speedscope(self, name: str = "city-data-backend") -> dict[str, Any]:
+        """Return a speedscope document with one sampled profile per thread."""
+        frames: list[dict[str, Any]] = []
+        frame_index: dict[str, int] = {}
+        per_thread: dict[str, tuple[list[list[int]], list[float]]] = {}
+        for stack, count in sorted(self.stacks.items()):
+            thread, *labels = stack
+            indices: list[int] = []
+            for label in labels:
+                if label not in frame_index:
+                    frame_index[label] = len(frames)
+                    frames.append(_speedscope_frame(label))
+                indices.append(frame_index[label])
+            samples, weights = per_thread.setdefault(thread, ([], []))
+            samples.append(indices)
+            weights.append(count * self.interval_s)
+        profiles = [
+            {
+                "type": "sampled",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+            for thread, (samples, weights) in per_thread.items()
+        ]
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "city-data-backend",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def render(self, profile_format: ProfileFormat) -> str:
+        """Render the result in ``profile_format``."""
+        if profile_format == "speedscope":
+            return json.dumps(self.to_speedscope())
+        return self.to_collapsed()
+
+
+def _speedscope_frame(label: str) -> dict[str, Any]:
+    name, _, location = label.rpartition(" (")
+    path, _, line = location.rstrip(")").rpartition(":")
+    return {"name": name, "file": path, "line": int(line) if line.isdigit() else 0}
+
+
+class SamplingProfiler:
+    """Sample the stacks of all other threads from a daemon thread."""
+
+    def __init__(self, interval_s: float = DEFAULT_INTERVAL_S) -> None:
+        """Create a profiler sampling every ``interval_s`` seconds.
+
+        Args:
+            interval_s: Time between two stack snapshots
+
+        """
+        if interval_s <= 0:
+            msg = "Sampling interval must be positive"
+            raise ValueError(msg)
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._result = ProfileResult(interval_s=interval_s)
+        self._started = 0.0
+
+    def start(self) -> None:
+        """Start sampling; only one profiler may run per process."""
+        if not _active.acquire(blocking=False):
+            msg = "A profile is already being captured in this process"
+            raise ProfilerBusyError(msg)
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="sampling-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> ProfileResult:
+        """Stop sampling and return the aggregated result."""
+        if self._thread is None:
+            msg = "Profiler was not started"
+            raise RuntimeError(msg)
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._result.duration_s = time.perf_counter() - self._started
+        _active.release()
+        return self._result
+
+    def __enter__(self) -> "SamplingProfiler":
+        """Start sampling for the duration of a ``with`` block."""
+        self.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Stop sampling; the samples stay available through :attr:`result`."""
+        if self._thread is not None:
+            self.stop()
+
+    @property
+    def result(self) -> ProfileResult:
+        """Samples aggregated so far."""
+        return self._result
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            # Sampling needs the live frames of every thread.
+            frames = sys._current_frames()  # noqa: SLF001  # pyright: ignore[reportPrivateUsage]
+            for ident, frame in frames.items():
+                if ident == own_ident:
+                    continue
+                thread = names.get(ident, f"thread-{ident}")
+                self._result.stacks[(thread, *_stack(frame))] += 1
+            self._result.samples += 1
+
+
+def capture_profile(
+    seconds: float,
+    interval_s: float = DEFAULT_INTERVAL_S,
+) -> ProfileResult:
+    """Sample the current process for ``seconds`` and return the result."""
+    profiler = SamplingProfiler(interval_s)
+    profiler.start()
+    try:
+        time.sleep(seconds)
+    finally:
+        result = profiler.stop()
+    return result
+
+
+def profile_runtime_dir() -> Path:
+    """Return the private directory for signal-triggered profile files.
+
+    Raises:
+        PermissionError: The directory exists but is a symlink, belongs to
+            another user or is accessible by others
+
+    """
+    uid = os.getuid()
+    path = Path(tempfile.gettempdir()) / f"city-data-backend-profile-{uid}"
+    path.mkdir(mode=0o700, exist_ok=True)
+    info = path.lstat()
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != uid
+        or stat.S_IMODE(info.st_mode) & 0o077
+    ):
+        msg = f"Profile directory {path} is not private to this user"
+        raise PermissionError(msg)
+    return path
+
+
+def profile_request_path(pid: int) -> Path:
+    """Return where a signal-triggered capture of ``pid`` reads its parameters."""
+    return profile_runtime_dir() / f"{pid}.json"
+
+
+def profile_output_path(pid: int, profile_format: ProfileFormat) -> Path:
+    """Return where a signal-triggered capture of ``pid`` writes its profile."""
+    return profile_runtime_dir() / f"{pid}{PROFILE_FILE_SUFFIXES[profile_format]}"
+
+
+def _open_private(path: Path, flags: int) -> int:
+    """Open ``path`` without following symlinks, creating it as ``0600``."""
+    return os.open(path, flags | os.O_NOFOLLOW, 0o600)
+
+
+def _write_private(path: Path, text: str) -> None:
+    fd = _open_private(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _read_request(path: Path) -> dict[str, Any]:
+    fd = _open_private(path, os.O_RDONLY)
+    with os.fdopen(fd, encoding="utf-8") as f:
+        if os.fstat(f.fileno()).st_uid != os.getuid():
+            msg = f"Profile request {path} belongs to another user"
+            raise PermissionError(msg)
+        request = json.load(f)
+    if not isinstance(request, dict):
+        msg = "Profile request must be a JSON object"
+        raise ValueError(msg)  # noqa: TRY004 - handled with the JSON errors
+    return cast("dict[str, Any]", request)
+
+
+def _write_profile(request: dict[str, Any]) -> None:
+    profile_format = request.get("format", "collapsed")
+    if profile_format not in PROFILE_FILE_SUFFIXES:
+        logger.warning("Profile request ignored, unknown format", format=profile_format)
+        return
+    output = profile_output_path(os.getpid(), profile_format)
+    try:
+        result = capture_profile(
+            float(request["seconds"]),
+            float(request.get("interval_s", DEFAULT_INTERVAL_S)),
+        )
+    except ProfilerBusyError:
+        logger.warning("Profile request ignored, capture already running")
+        return
+    partial = output.with_name(output.name + ".partial")
+    _write_private(partial, result.render(profile_format))
+    partial.replace(output)
+    logger.info(
+        "Profile written",
+        output=str(output),
+        samples=result.samples,
+        duration_s=round(result.duration_s, 3),
+    )
+
+
+def _handle_profile_signal(_signum: int, _frame: FrameType | None) -> None:
+    try:
+        path = profile_request_path(os.getpid())
+        request = _read_request(path)
+        path.unlink()
+    except (OSError, ValueError):
+        logger.warning("Profile signal received without a readable request")
+        return
+    threading.Thread(
+        target=_write_profile,
+        args=(request,),
+        name="profile-writer",
+        daemon=True,
+    ).start()
+
+
+def install_profile_signal_handler() -> bool:
+    """Let :func:`request_process_profile` profile this process.
+
+    Returns:
+        False on platforms without ``SIGUSR2``
+
+    """
+    if PROFILE_SIGNAL is None:
+        return False
+    signal.signal(PROFILE_SIGNAL, _handle_profile_signal)
+    return True
+
+
+def request_process_profile(
+    pid: int,
+    seconds: float,
+    profile_format: ProfileFormat = "collapsed",
+    interval_s: float = DEFAULT_INTERVAL_S,
+) -> Path:
+    """Ask process ``pid`` to capture a profile of itself.
+
+    The target must have called :func:`install_profile_signal_handler` and run
+    as the same user.
+
+    Returns:
+        The file in :func:`profile_runtime_dir` the profile appears at once
+        the capture has finished
+
+    """
+    if PROFILE_SIGNAL is None:
+        msg = "Signal-triggered profiling is not supported on this platform"
+        raise RuntimeError(msg)
+    output = profile_output_path(pid, profile_format)
+    output.unlink(missing_ok=True)
+    request = {
+        "seconds": seconds,
+        "format": profile_format,
+        "interval_s": interval_s,
+    }
+    _write_private(profile_request_path(pid), json.dumps(request))
+    os.kill(pid, PROFILE_SIGNAL)
+    return output
+
+
+def wait_for_profile(output: Path, timeout_s: float, poll_s: float = 0.2) -> bool:
+    """Wait until a signal-triggered capture has written ``output``."""
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if output.exists():
+            return True
+        time.sleep(poll_s)
+    return output.exists()
+
+
+def fetch_remote_profile(
+    base_url: str,
+    token: str | None,
+    seconds: float,
+    profile_format: ProfileFormat = "collapsed",
+    interval_s: float = DEFAULT_INTERVAL_S,
+) -> bytes:
+    """Capture a profile of a running API through ``GET /admin/profile``."""
+    if not base_url.startswith(("http://", "https://")):
+        msg = f"Unsupported URL: {base_url}"
+        raise ValueError(msg)
+    query = urllib.parse.urlencode(
+        {
+            "seconds": seconds,
+            "format": profile_format,
+            "interval_ms": interval_s * 1000,
+        },
+    )
+    request = urllib.request.Request(  # noqa: S310 - scheme checked above
+        f"{base_url.rstrip('/')}/admin/profile?{query}",
+        headers={"Authorization": f"Bearer {token}"} if token else {},
+    )
+    with urllib.request.urlopen(request, timeout=seconds + 30) as response:  # noqa: S310
+        return response.read()
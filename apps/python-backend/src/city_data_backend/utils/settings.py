@@ -50,6 +50,41 @@ class LoggingSettings(BaseSettings):
         description="Path to log file for local file logging",
     )
 
+    log_async: bool = Field(
+        default=True,
+        description="Write log records from a background thread",
+    )
+
+    log_queue_size: int = Field(
+        default=10_000,
+        description="Maximum number of records buffered by the async log sink",
+        ge=1,
+    )
+
+    log_queue_overflow: Literal["drop", "block"] = Field(
+        default="block",
+        description="Whether a full async log queue drops records or blocks",
+    )
+
+    # Performance instrumentation (log_performance)
+    perf_enabled: bool = Field(
+        default=True,
+        description="Whether log_performance wraps decorated functions at all",
+    )
+
+    perf_sample_rate: float = Field(
+        default=1.0,
+        description="Fraction of calls timed by aggregating log_performance sites",
+        ge=0.0,
+        le=1.0,
+    )
+
+    perf_flush_interval: float = Field(
+        default=60.0,
+        description="Seconds between aggregated performance summary logs",
+        gt=0,
+    )
+
     # OpenTelemetry settings
     otel_logs_export_mode: OTelExportMode = Field(
         default=OTelExportMode.FILE,
@@ -170,6 +205,11 @@ class AuthSettings(BaseSettings):
         description="Static API token for bearer authentication",
     )
 
+    admin_api_token: str | None = Field(
+        default=None,
+        description="Separate bearer token for /admin routes; unset disables them",
+    )
+
     oidc_issuer: str | None = Field(
         default=None,
         description="OIDC issuer URL for validating JWTs",
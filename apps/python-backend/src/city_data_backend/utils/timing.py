@@ -0,0 +1,149 @@
+"""Span-style stage timing for request pipelines.
+
+Stages are timed with :func:`stage`, logged through structlog (so the
+``add_opentelemetry_context`` processor attaches trace ids when OpenTelemetry is
+active) and collected per request so they can be rendered as a
+``Server-Timing`` response header.
+"""
+
+import re
+import time
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any
+
+from city_data_backend.utils.logger import get_logger
+
+try:  # Optional dependency: real spans when an OpenTelemetry SDK is configured
+    from opentelemetry import trace  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - exercised when OpenTelemetry is missing
+    trace = None
+
+logger = get_logger(__name__)
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+_TOKEN_PATTERN = re.compile(r"[^A-Za-z0-9!#$%&'*+.^_`|~-]")
+
+
+@dataclass
+class StageTiming:
+    """Duration and attributes of one completed pipeline stage."""
+
+    name: str
+    duration_ms: float
+    attributes: dict[str, Any] = field(default_factory=dict[str, Any])
+
+
+@dataclass
+class RequestTimings:
+    """Stage timings collected while serving a single request."""
+
+    stages: list[StageTiming] = field(default_factory=list[StageTiming])
+
+    def server_timing(self, total_ms: float | None = None) -> str:
+        """Render the stages as a ``Server-Timing`` header value.
+
+        Args:
+            total_ms: Optional end-to-end duration appended as ``total``
+
+        Returns:
+            Header value such as ``metadata;dur=1.2, query;dur=8.0;desc="rows=42"``
+
+        """
+        entries = [
+            _server_timing_entry(timing.name, timing.duration_ms, timing.attributes)
+            for timing in self.stages
+        ]
+        if total_ms is not None:
+            entries.append(_server_timing_entry("total", total_ms, {}))
+        return ", ".join(entries)
+
+    def as_log_fields(self) -> dict[str, float]:
+        """Return ``{stage: duration_ms}`` for a per-request summary log."""
+        totals: dict[str, float] = {}
+        for timing in self.stages:
+            totals[timing.name] = round(
+                totals.get(timing.name, 0.0) + timing.duration_ms,
+                3,
+            )
+        return totals
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings",
+    default=None,
+)
+
+
+def _server_timing_entry(name: str, duration_ms: float, attrs: dict[str, Any]) -> str:
+    entry = f"{_TOKEN_PATTERN.sub('_', name)};dur={duration_ms:.3f}"
+    if attrs:
+        desc = " ".join(f"{key}={value}" for key, value in attrs.items())
+        entry += ';desc="' + desc.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return entry
+
+
+def start_request_timings() -> Token[RequestTimings | None]:
+    """Begin collecting stage timings for the current request context."""
+    return _current.set(RequestTimings())
+
+
+def finish_request_timings(token: Token[RequestTimings | None]) -> RequestTimings:
+    """Stop collecting and return the timings gathered since the start."""
+    timings = _current.get() or RequestTimings()
+    _current.reset(token)
+    return timings
+
+
+def current_request_timings() -> RequestTimings | None:
+    """Return the collector of the current request, if one is active."""
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str, **attributes: Any) -> Iterator[dict[str, Any]]:
+    """Time a pipeline stage and record it on the current request.
+
+    The yielded dict can be filled with attributes known only at the end of
+    the stage (row counts, cache hits). The stage is logged at debug level
+    with its duration, wrapped in an OpenTelemetry span when available, and
+    appended to the active :class:`RequestTimings` if there is one.
+
+    Args:
+        name: Stage name, also used as the ``Server-Timing`` metric name
+        **attributes: Attributes known when the stage starts
+
+    Yields:
+        Mutable attribute mapping for the stage
+
+    """
+    attrs: dict[str, Any] = dict(attributes)
+    started = time.perf_counter()
+    # The span is exited with the stage's exception, so it is recorded on it.
+    with ExitStack() as spans:
+        span = (
+            spans.enter_context(trace.get_tracer(__name__).start_as_current_span(name))
+            if trace
+            else None
+        )
+        try:
+            yield attrs
+        except Exception:
+            attrs["error"] = True
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if span is not None:
+                span.set_attributes(attrs)
+            logger.debug(
+                "Stage completed",
+                stage=name,
+                duration_ms=round(duration_ms, 3),
+                **attrs,
+            )
+            timings = _current.get()
+            if timings is not None:
+                timings.stages.append(StageTiming(name, duration_ms, attrs))
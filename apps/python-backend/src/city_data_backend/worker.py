@@ -1,4 +1,8 @@
-"""Simple worker processing experiment jobs."""
+"""Simple worker processing experiment jobs.
+
+Query execution and optimization modules (and with them pandas) are imported
+when the first job is processed, keeping idle worker startup fast.
+"""
 
 from __future__ import annotations
 
@@ -7,10 +11,10 @@ from datetime import UTC, datetime
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, cast
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from structlog import get_logger
 
-from city_data_backend.database import get_engine, session_scope
+from city_data_backend.database import get_engine, get_read_session, session_scope
 from city_data_backend.db_models import (
     Experiment,
     ExperimentJob,
@@ -18,11 +22,8 @@ from city_data_backend.db_models import (
     OptimizationJob,
 )
 from city_data_backend.services.datasets import init_database
-from city_data_backend.services.optimization import (
-    INTERACTIVE_ARTIFACT_ROOT,
-    OptimizationService,
-)
-from city_data_backend.services.query_runner import QueryRunner
+from city_data_backend.utils.metrics import WORKER_JOB_DURATION, WORKER_QUEUE_DEPTH
+from city_data_backend.utils.profiler import install_profile_signal_handler
 
 POLL_INTERVAL_SECONDS = 3
 
@@ -34,6 +35,18 @@ if TYPE_CHECKING:
     from city_data_backend.models.dspy import QuerySpecDict
 
 
+def _record_queue_depth(
+    session: Session,
+    model: type[ExperimentJob | OptimizationJob],
+    queue: str,
+) -> None:
+    """Publish the number of pending jobs of ``model`` as a gauge."""
+    pending = session.scalar(
+        select(func.count()).select_from(model).where(model.status == "pending"),
+    )
+    WORKER_QUEUE_DEPTH.set(pending or 0, queue=queue)
+
+
 class ExperimentWorker:
     """Process pending experiment jobs sequentially."""
 
@@ -53,6 +66,7 @@ class ExperimentWorker:
     def run_once(self) -> bool:
         """Process a single pending job if available."""
         with session_scope() as session:
+            _record_queue_depth(session, ExperimentJob, "experiment")
             job = session.scalars(
                 select(ExperimentJob).where(ExperimentJob.status == "pending").limit(1),
             ).first()
@@ -63,11 +77,10 @@ class ExperimentWorker:
             job.started_at = now
             job.updated_at = now
             session.commit()
-
-            runner = QueryRunner(session)
+            started = time.perf_counter()
             try:
                 query_spec = cast("QuerySpecDict", job.query_spec or {})
-                result = runner.run(job.dataset_id, query_spec)
+                result = self._run_query(job.dataset_id, query_spec)
                 summary = result.get("summary", {})
                 description = self._build_description(job, summary)
                 candidate = InsightCandidate(
@@ -90,8 +103,27 @@ class ExperimentWorker:
                 job.error_message = str(exc)
                 job.updated_at = datetime.now(tz=UTC)
                 session.commit()
+            WORKER_JOB_DURATION.observe(
+                time.perf_counter() - started,
+                job_type=job.job_type,
+                status=job.status,
+            )
             return True
 
+    def _run_query(
+        self,
+        dataset_id: int,
+        query_spec: QuerySpecDict,
+    ) -> dict[str, Any]:
+        """Run a job's query on a read engine, keeping the job session for writes."""
+        from city_data_backend.services.query_runner import QueryRunner
+
+        read_session = get_read_session()
+        try:
+            return QueryRunner(read_session).run(dataset_id, query_spec)
+        finally:
+            read_session.close()
+
     def _build_description(self, job: ExperimentJob, summary: dict[str, Any]) -> str:
         metrics: list[dict[str, Any]] | None = summary.get("metrics")
         if metrics:
@@ -125,11 +157,21 @@ class OptimizationWorker:
         get_engine()
         with session_scope() as session:
             init_database(session)
-        self.artifact_root = artifact_root or INTERACTIVE_ARTIFACT_ROOT
+        self._artifact_root = artifact_root
+
+    @property
+    def artifact_root(self) -> Path:
+        """Directory compiled program artifacts are written to."""
+        if self._artifact_root is not None:
+            return self._artifact_root
+        from city_data_backend.services.optimization import INTERACTIVE_ARTIFACT_ROOT
+
+        return INTERACTIVE_ARTIFACT_ROOT
 
     def run_once(self) -> bool:
         """Process a single optimization job if available."""
         with session_scope() as session:
+            _record_queue_depth(session, OptimizationJob, "optimization")
             job = session.scalars(
                 select(OptimizationJob)
                 .where(OptimizationJob.status == "pending")
@@ -143,6 +185,9 @@ class OptimizationWorker:
             job.started_at = now
             job.updated_at = now
             session.commit()
+            started = time.perf_counter()
+
+            from city_data_backend.services.optimization import OptimizationService
 
             service = OptimizationService(
                 session=session,
@@ -180,6 +225,11 @@ class OptimizationWorker:
                 job.error_message = str(exc)
                 job.updated_at = datetime.now(tz=UTC)
                 session.commit()
+            WORKER_JOB_DURATION.observe(
+                time.perf_counter() - started,
+                job_type="optimization",
+                status=job.status,
+            )
             return True
 
 
@@ -203,6 +253,7 @@ class WorkerOrchestrator:
 
 def main() -> None:
     """Run the worker in continuous mode."""
+    install_profile_signal_handler()
     orchestrator = WorkerOrchestrator()
     orchestrator.run_forever()
 
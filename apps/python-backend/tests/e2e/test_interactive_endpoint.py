@@ -58,4 +58,7 @@ def test_interactive_endpoint_returns_stats(
     assert body["dataset_id"] == dataset.id
     assert body["query_spec"]["filters"]
     assert body["stats"]["returned_rows"] >= 1
+    server_timing = response.headers["Server-Timing"]
+    for stage_name in ("metadata", "query", "summarize", "record", "total"):
+        assert f"{stage_name};dur=" in server_timing
     assert "insight" in body
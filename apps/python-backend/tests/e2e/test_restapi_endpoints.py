@@ -120,6 +120,7 @@ def stub_planner(monkeypatch: pytest.MonkeyPatch) -> None:
                     filters=[],
                     group_by=["ward"],
                     metrics=[QueryMetric(agg="count", column=None)],
+                    windows=[],
                     order_by=[QueryOrder(column="ward", direction="asc")],
                     limit=10,
                 ),
@@ -203,6 +204,7 @@ def test_interactive_analysis_returns_response(
             filters=[],
             group_by=[],
             metrics=[QueryMetric(agg="count", column=None)],
+            windows=[],
             order_by=[],
             limit=5,
         ),
@@ -3,6 +3,7 @@
 from unittest.mock import MagicMock, patch
 
 import typer
+from typer.testing import CliRunner
 
 from city_data_backend.interfaces.base import BaseInterface
 from city_data_backend.interfaces.cli import CLIInterface
@@ -53,3 +54,12 @@ class TestCLIInterface:
         cli.run()
 
         cli.app.assert_called_once()
+
+    def test_cli_profile_requires_one_target(self) -> None:
+        """Test that the profile command needs exactly one of --url and --pid."""
+        cli = CLIInterface()
+
+        result = CliRunner().invoke(cli.app, ["profile", "--seconds", "1"])
+
+        assert result.exit_code != 0
+        assert "--url or --pid" in result.output
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import sqlite3
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
@@ -18,6 +19,8 @@ from city_data_backend.interfaces.restapi import RestAPIInterface
 from city_data_backend.services.datasets import DatasetRepository, init_database
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
     from sqlalchemy.orm import Session
 
 
@@ -197,3 +200,28 @@ def test_feedback_for_candidate_marks_adopted() -> None:
     assert refreshed is not None
     assert refreshed.adopted is False
     check_session.close()
+
+
+def test_experiment_routes_read_from_the_primary(tmp_path: Path) -> None:
+    """Experiments and insights are visible before replicas catch up."""
+    primary = tmp_path / "primary.db"
+    replica = tmp_path / "replica.db"
+    configure_engine(f"sqlite:///{primary}", read_urls=[])
+    session = get_session()
+    init_database(session)
+    session.close()
+    with sqlite3.connect(primary) as source, sqlite3.connect(replica) as target:
+        source.backup(target)
+    configure_engine(f"sqlite:///{primary}", read_urls=[f"sqlite:///{replica}"])
+    session = get_session()
+    candidate = seed_candidate(session)
+    session.close()
+
+    client = create_client()
+    experiments = client.get("/experiments")
+    experiment = client.get(f"/experiments/{candidate.experiment_id}")
+    insights = client.get(f"/experiments/{candidate.experiment_id}/insights")
+
+    assert [item["id"] for item in experiments.json()] == [candidate.experiment_id]
+    assert experiment.status_code == 200
+    assert [item["id"] for item in insights.json()["insights"]] == [candidate.id]
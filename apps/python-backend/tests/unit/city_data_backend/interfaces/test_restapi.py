@@ -8,9 +8,11 @@ from fastapi.testclient import TestClient
 
 from city_data_backend.interfaces.base import BaseInterface
 from city_data_backend.interfaces.restapi import RestAPIInterface
+from city_data_backend.utils.settings import reset_auth_settings
 
 
 TEST_TOKEN = "test-token"  # noqa: S105
+TEST_ADMIN_TOKEN = "test-admin-token"  # noqa: S105
 
 
 def create_authenticated_client() -> TestClient:
@@ -163,3 +165,46 @@ class TestRestAPISwaggerUIEndpoints:
         assert "interfaces" in analysis
         assert isinstance(analysis["interfaces"], list)
         assert len(analysis["interfaces"]) > 0
+
+    def test_metrics_endpoint_reports_route_latency(self) -> None:
+        """Test that /metrics exposes request latency by route template."""
+        client = create_authenticated_client()
+        client.get("/health")
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'route="/health",status="200"' in response.text
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+
+    def test_admin_profile_returns_speedscope(self) -> None:
+        """Test that /admin/profile returns a speedscope document."""
+        client = create_authenticated_client()
+        reset_auth_settings()
+        try:
+            with patch.dict(os.environ, {"ADMIN_API_TOKEN": TEST_ADMIN_TOKEN}):
+                forbidden = client.get("/admin/profile", params={"seconds": 0.01})
+                response = client.get(
+                    "/admin/profile",
+                    params={"seconds": 0.05, "format": "speedscope", "interval_ms": 1},
+                    headers={"Authorization": f"Bearer {TEST_ADMIN_TOKEN}"},
+                )
+        finally:
+            reset_auth_settings()
+        assert forbidden.status_code == 403
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert "attachment" in response.headers["content-disposition"]
+        assert "profiles" in response.json()
+
+    def test_admin_routes_are_disabled_without_admin_token(self) -> None:
+        """Test that the API token alone cannot reach /admin routes."""
+        client = create_authenticated_client()
+        reset_auth_settings()
+        try:
+            with patch.dict(os.environ):
+                os.environ.pop("ADMIN_API_TOKEN", None)
+                response = client.get("/admin/profile", params={"seconds": 0.01})
+        finally:
+            reset_auth_settings()
+        assert response.status_code == 404
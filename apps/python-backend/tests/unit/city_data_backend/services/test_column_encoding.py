@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, cast
+
+import pandas as pd
+import pytest
+
+from city_data_backend.services.column_encoding import (
+    FrameCache,
+    compact_frame,
+    frame_memory_bytes,
+)
+from city_data_backend.services.query_filters import apply_filters
+
+if TYPE_CHECKING:  # pragma: no cover - imports for type checking only
+    from city_data_backend.models.dspy import QueryFilterDict
+    from city_data_backend.services.datasets import ColumnMetadata
+
+DataFrame = Any
+
+COLUMNS: list[ColumnMetadata] = [
+    {"name": "ward", "data_type": "text", "description": None, "is_index": False},
+    {"name": "code", "data_type": "text", "description": None, "is_index": True},
+    {"name": "year", "data_type": "number", "description": None, "is_index": True},
+    {"name": "rate", "data_type": "number", "description": None, "is_index": False},
+]
+
+
+def _records_frame(rows: int = 1_000) -> DataFrame:
+    wards = ["川崎区", "幸区", "中原区", "高津区"]
+    return pd.DataFrame(
+        {
+            "ward": [None if i % 97 == 0 else wards[i % 4] for i in range(rows)],
+            "code": [f"C{i:05d}" for i in range(rows)],
+            "year": [2000 + i % 25 for i in range(rows)],
+            "rate": [i / 7 for i in range(rows)],
+        },
+    )
+
+
+def test_compact_frame_encodes_text_and_downcasts_integers() -> None:
+    """Repetitive text becomes categorical and integers take the smallest dtype."""
+    frame = _records_frame()
+
+    compact = compact_frame(frame, COLUMNS)
+
+    assert isinstance(compact["ward"].dtype, pd.CategoricalDtype)
+    assert compact["ward"].cat.ordered
+    assert not isinstance(compact["code"].dtype, pd.CategoricalDtype)
+    assert compact["year"].dtype == "int16"
+    assert compact["rate"].dtype == "float64"
+    assert compact["ward"].astype(object).equals(frame["ward"].astype(object))
+    assert frame_memory_bytes(compact) < frame_memory_bytes(frame) / 2
+
+
+def test_compact_frame_leaves_mismatched_columns_alone() -> None:
+    """A "number" column holding text keeps its original values."""
+    frame: DataFrame = pd.DataFrame({"year": ["2020", 2021, None]})
+    columns: list[ColumnMetadata] = [
+        {"name": "year", "data_type": "number", "description": None, "is_index": True},
+    ]
+
+    assert compact_frame(frame, columns) is frame
+
+
+@pytest.mark.parametrize(
+    ("op", "value"),
+    [
+        ("eq", "幸区"),
+        ("gte", "幸区"),
+        ("in", ["川崎区", "存在しない区"]),
+        ("not_in", ["中原区"]),
+        ("is_null", None),
+        ("not_null", None),
+        ("contains", "原"),
+    ],
+)
+def test_filters_on_categorical_columns_match_plain_text(
+    op: str,
+    value: object,
+) -> None:
+    """Evaluating a filter per distinct value selects the same rows."""
+    frame = _records_frame()
+    filters = cast(
+        "list[QueryFilterDict]",
+        [{"column": "ward", "op": op, "value": value}],
+    )
+
+    expected = apply_filters(frame, filters)
+    actual = apply_filters(compact_frame(frame, COLUMNS), filters)
+
+    assert actual.index.equals(expected.index)
+
+
+def test_grouping_categorical_keys_matches_plain_text() -> None:
+    """Integer-code group-bys return the same groups in the same order."""
+    frame = _records_frame()
+    compact = compact_frame(frame, COLUMNS)
+
+    expected = frame.groupby("ward", dropna=False)["year"].agg(["sum", "max"])
+    actual = compact.groupby("ward", dropna=False, observed=True)["year"].agg(
+        ["sum", "max"],
+    )
+
+    assert actual.index.astype(object).equals(expected.index.astype(object))
+    assert actual["sum"].tolist() == expected["sum"].tolist()
+    assert actual["max"].tolist() == expected["max"].tolist()
+
+
+def test_frame_cache_drops_stale_and_least_recently_used_frames() -> None:
+    """Another version is a miss, and old frames make room for new ones."""
+    frame = _records_frame(100)
+    size = frame_memory_bytes(frame)
+    cache = FrameCache(max_bytes=2 * size)
+
+    assert cache.put("a", 1, frame) == size
+    cache.put("b", 1, frame.copy())
+    assert cache.get("a", 1) is frame
+    cache.put("c", 1, frame.copy())
+
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 2) is None
+    assert cache.get("a", 1) is None
+    assert cache.get("c", 1) is not None
+
+
+def test_frame_cache_skips_frames_larger_than_its_budget() -> None:
+    """A frame that can never fit is returned uncached."""
+    frame = _records_frame(100)
+    cache = FrameCache(max_bytes=frame_memory_bytes(frame) - 1)
+
+    cache.put("a", 1, frame)
+
+    assert cache.get("a", 1) is None
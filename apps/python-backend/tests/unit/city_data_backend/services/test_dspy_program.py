@@ -41,6 +41,7 @@ class DummyCompiled(CompiledInteractiveProgram):
             filters=[],
             group_by=["ward"],
             metrics=[QueryMetric(agg="sum", column="population")],
+            windows=[],
             order_by=[QueryOrder(column="population", direction="desc")],
             limit=5,
         )
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from city_data_backend.services.query_join import hash_join
+
+DataFrame = Any
+
+
+def _left() -> DataFrame:
+    return pd.DataFrame(
+        {
+            "ward": pd.Categorical(["A", "B", "A", "C", None, "B"]),
+            "year": pd.Series([2020, 2020, 2021, 2021, 2021, 2022], dtype="int16"),
+            "population": [10, 20, 11, 30, 99, 22],
+        },
+    )
+
+
+def _expected(left: DataFrame, right: DataFrame, how: str) -> DataFrame:
+    """Join with ``DataFrame.merge``, null keys unmatched, in left row order."""
+    keys = ["ward", "year"]
+    plain_left = left.astype({"ward": object, "year": "float64"})
+    plain_right = right.dropna(subset=keys).astype(
+        {"ward": object, "year": "float64"},
+    )
+    merged = plain_left.assign(row=range(len(left))).merge(
+        plain_right,
+        on=keys,
+        how=how,
+        sort=False,
+    )
+    return merged.sort_values("row", kind="stable")
+
+
+@pytest.mark.parametrize("how", ["inner", "left"])
+@pytest.mark.parametrize(
+    "right",
+    [
+        # Smaller side: the hash table is built on the joined dataset.
+        pd.DataFrame(
+            {
+                "ward": ["A", "B", None],
+                "year": [2020.0, 2022.0, 2021.0],
+                "recipients": [1, 2, 3],
+            },
+        ),
+        # Larger side with several rows per key: built on the queried rows.
+        pd.DataFrame(
+            {
+                "ward": ["A", "A", "B", "B", "C", "C", "D", "A"],
+                "year": [2020, 2020, 2020, 2021, 2021, 2021, 2020, 2021],
+                "recipients": [1, 2, 3, 4, 5, 6, 7, 8],
+            },
+        ),
+    ],
+)
+def test_hash_join_matches_merge(how: str, right: DataFrame) -> None:
+    """Either build side gives merge's rows, in the queried rows' order."""
+    left = _left()
+
+    joined = hash_join(left, right, ["ward", "year"], how)
+    expected = _expected(left, right, how)
+
+    assert joined["population"].tolist() == expected["population"].tolist()
+    assert joined["recipients"].tolist() == pytest.approx(
+        expected["recipients"].tolist(),
+        nan_ok=True,
+    )
+    assert isinstance(joined["ward"].dtype, pd.CategoricalDtype)
+
+
+def test_hash_join_expands_duplicate_keys_on_both_sides() -> None:
+    """Non-unique keys on the smaller side fall back to merge's expansion."""
+    left: DataFrame = pd.DataFrame(
+        {"ward": ["A", "A", "B", "B"], "population": [1, 2, 3, 4]},
+    )
+    right: DataFrame = pd.DataFrame(
+        {"ward": ["A", "A", "C"], "recipients": [10, 20, 30]},
+    )
+
+    joined = hash_join(left, right, ["ward"])
+
+    assert joined["population"].tolist() == [1, 1, 2, 2]
+    assert joined["recipients"].tolist() == [10, 20, 10, 20]
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from city_data_backend.database import configure_engine, session_scope
+from city_data_backend.services.datasets import (
+    DatasetRepository,
+    init_database,
+    parse_value,
+)
+from city_data_backend.services.row_hash import (
+    ROW_HASH_BLAKE2B,
+    ROW_HASH_LEGACY,
+    RowHasher,
+    detect_row_hash_scheme,
+    legacy_row_hash,
+)
+
+if TYPE_CHECKING:  # pragma: no cover - imports for type checking only
+    from pathlib import Path
+
+
+def test_detect_row_hash_scheme_distinguishes_legacy_hashes() -> None:
+    """Unprefixed digests belong to the legacy scheme."""
+    hasher = RowHasher(["year", "ward"], ROW_HASH_BLAKE2B)
+
+    assert detect_row_hash_scheme(legacy_row_hash({"year": 2023})) == ROW_HASH_LEGACY
+    assert detect_row_hash_scheme(hasher.hash_fields(["2023", "A"])) == (
+        ROW_HASH_BLAKE2B
+    )
+
+
+def test_row_hasher_ignores_column_order_and_whitespace() -> None:
+    """The canonical encoding sorts columns and strips values like parse_value."""
+    forward = RowHasher(["year", "ward"], ROW_HASH_BLAKE2B)
+    reverse = RowHasher(["ward", "year"], ROW_HASH_BLAKE2B)
+
+    assert forward.hash_fields(["2023", "A"]) == reverse.hash_fields(["A", " 2023 "])
+    assert forward.hash_fields(["2023", "A"]) != forward.hash_fields(["2023", "B"])
+
+
+def test_row_hasher_is_sensitive_to_header_and_separator_values() -> None:
+    """Different headers or values containing the separator never collide."""
+    hasher = RowHasher(["a", "b"], ROW_HASH_BLAKE2B)
+    other_header = RowHasher(["a", "c"], ROW_HASH_BLAKE2B)
+
+    assert hasher.hash_fields(["1", "2"]) != other_header.hash_fields(["1", "2"])
+    assert hasher.hash_fields(["x\x1fy", ""]) != hasher.hash_fields(["x", "y"])
+    assert hasher.hash_fields(["1"]) == hasher.hash_fields(["1", ""])
+
+
+def test_row_hasher_threaded_chunks_match_sequential() -> None:
+    """Chunked hashing across threads returns hashes in input order."""
+    hasher = RowHasher(["id", "value"], ROW_HASH_BLAKE2B)
+    rows = [[str(i), str(i * 2)] for i in range(1_000)]
+
+    assert hasher.hash_rows(rows, workers=4, chunk_size=64) == hasher.hash_rows(rows)
+
+
+def test_legacy_scheme_rejected_by_row_hasher() -> None:
+    """The legacy scheme needs typed rows and cannot hash raw fields."""
+    with pytest.raises(ValueError, match="legacy"):
+        RowHasher(["a"], ROW_HASH_LEGACY)
+
+
+def test_import_keeps_legacy_scheme_for_existing_datasets(tmp_path: Path) -> None:
+    """Datasets with legacy hashes keep deduplicating against them."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    csv_path = tmp_path / "population.csv"
+    csv_path.write_text(
+        "year,ward,population\n2023,A,100\n2023,B,150\n",
+        encoding="utf-8",
+    )
+
+    with session_scope() as session:
+        init_database(session)
+        repo = DatasetRepository(session)
+        dataset = repo.ensure_dataset("population", "legacy", "人口", "", None)
+        legacy_row = {
+            key: parse_value(value)
+            for key, value in {"year": "2023", "ward": "A", "population": "100"}.items()
+        }
+        repo.add_record(dataset, legacy_row, {})
+
+        repo.import_csv("population", "legacy", csv_path, "人口", "", None)
+        scheme = repo.get_row_hash_scheme(dataset)
+        records = repo.get_records(dataset.id)
+
+    assert scheme == ROW_HASH_LEGACY
+    assert len(records) == 2
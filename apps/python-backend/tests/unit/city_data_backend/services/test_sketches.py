@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from city_data_backend.services.sketches import (
+    EXACT_QUANTILE_LIMIT,
+    DistinctSketch,
+    QuantileSketch,
+    merge_sketches,
+)
+
+
+def _batches(values: pd.Series, size: int) -> list[pd.Series]:
+    return [values.iloc[start : start + size] for start in range(0, len(values), size)]
+
+
+def test_distinct_sketch_is_exact_for_small_inputs() -> None:
+    """Small value sets keep their hashes and count exactly across batches."""
+    values = pd.Series(["H001", "H002", None, "H001", "H003", "H002"])
+
+    sketch = merge_sketches(
+        DistinctSketch.from_values(batch) for batch in _batches(values, 2)
+    )
+
+    assert sketch.exact
+    assert sketch.estimate() == values.nunique()
+
+
+def test_distinct_sketch_hashes_numbers_independently_of_dtype() -> None:
+    """Batches holding nulls (float64) and none (int) count the same values."""
+    with_nulls = pd.Series([1, 2, None, 3], dtype="float64")
+    without_nulls = pd.Series([3, 2, 4], dtype="int16")
+
+    sketch = DistinctSketch.from_values(with_nulls).merge(
+        DistinctSketch.from_values(without_nulls),
+    )
+
+    assert sketch.estimate() == 4
+
+
+def test_distinct_sketch_hashes_object_numbers_like_numeric_columns() -> None:
+    """Numbers in object batches count once with the same numbers elsewhere."""
+    mixed = pd.Series([1, "1", 2.5, True, None], dtype=object)
+    numbers = pd.Series([1, 3], dtype="int64")
+    floats = pd.Series([2.5, 1.0])
+    flags = pd.Series([True, False])
+
+    sketch = merge_sketches(
+        DistinctSketch.from_values(batch) for batch in (mixed, numbers, floats, flags)
+    )
+
+    # 1, "1", 2.5, True, 3 and False
+    assert sketch.estimate() == 6
+
+
+def test_distinct_sketch_estimates_large_counts() -> None:
+    """Merged HyperLogLog registers stay within a few percent of the truth."""
+    rng = np.random.default_rng(7)
+    values = pd.Series(rng.integers(0, 80_000, 200_000))
+
+    sketch = merge_sketches(
+        DistinctSketch.from_values(batch) for batch in _batches(values, 30_000)
+    )
+
+    assert not sketch.exact
+    assert sketch.estimate() == pytest.approx(values.nunique(), rel=0.05)
+
+
+def test_quantile_sketch_is_exact_for_small_inputs() -> None:
+    """Up to the exact limit, quantiles match pandas' linear interpolation."""
+    values = pd.Series([5.0, None, 1.0, 3.0, 8.0, 2.0, 13.0])
+
+    sketch = merge_sketches(
+        QuantileSketch.from_values(batch) for batch in _batches(values, 3)
+    )
+
+    assert sketch.exact
+    for q in (0.0, 0.25, 0.5, 0.9, 1.0):
+        assert sketch.quantile(q) == pytest.approx(values.quantile(q))
+
+
+def test_quantile_sketch_approximates_large_inputs() -> None:
+    """A merged t-digest keeps the rank error of its quantiles small."""
+    rng = np.random.default_rng(11)
+    samples = rng.lognormal(3, 1, 100_000)
+    values = pd.Series(samples)
+
+    sketch = merge_sketches(
+        QuantileSketch.from_values(batch) for batch in _batches(values, 7_000)
+    )
+
+    assert not sketch.exact
+    assert len(sketch.means) < EXACT_QUANTILE_LIMIT
+    ordered = np.sort(samples)
+    for q in (0.01, 0.5, 0.9, 0.99):
+        estimate = sketch.quantile(q)
+        assert estimate is not None
+        rank = np.searchsorted(ordered, estimate) / len(ordered)
+        assert rank == pytest.approx(q, abs=0.005)
+
+
+def test_quantile_sketch_without_values_has_no_quantile() -> None:
+    """An all-null group yields None rather than NaN."""
+    assert QuantileSketch.from_values(pd.Series([None, None])).quantile(0.5) is None
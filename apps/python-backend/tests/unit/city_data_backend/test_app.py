@@ -31,6 +31,9 @@ class TestApplication:
         mock_settings.log_level = "INFO"
         mock_settings.log_format = "json"
         mock_settings.log_file_path = None
+        mock_settings.log_async = True
+        mock_settings.log_queue_size = 10_000
+        mock_settings.log_queue_overflow = "drop"
         mock_get_settings.return_value = mock_settings
 
         mock_interface_settings = MagicMock()
@@ -58,6 +61,9 @@ class TestApplication:
             log_level="INFO",
             log_format="json",
             log_file=None,
+            async_sink=True,
+            queue_size=10_000,
+            overflow="drop",
         )
 
         # Verify interface was created
@@ -87,6 +93,9 @@ class TestApplication:
         mock_settings.log_level = "DEBUG"
         mock_settings.log_format = "console"
         mock_settings.log_file_path = None
+        mock_settings.log_async = True
+        mock_settings.log_queue_size = 10_000
+        mock_settings.log_queue_overflow = "drop"
         mock_get_settings.return_value = mock_settings
 
         mock_interface_settings = MagicMock()
@@ -115,6 +124,9 @@ class TestApplication:
             log_level="DEBUG",
             log_format="console",
             log_file=None,
+            async_sink=True,
+            queue_size=10_000,
+            overflow="drop",
         )
 
         # Verify interface was created
@@ -142,6 +154,9 @@ class TestApplication:
         mock_settings.log_level = "INFO"
         mock_settings.log_format = "json"
         mock_settings.log_file_path = None
+        mock_settings.log_async = True
+        mock_settings.log_queue_size = 10_000
+        mock_settings.log_queue_overflow = "drop"
         mock_get_settings.return_value = mock_settings
 
         mock_interface_settings = MagicMock()
@@ -186,6 +201,9 @@ class TestApplication:
         mock_settings.log_level = "INFO"
         mock_settings.log_format = "json"
         mock_settings.log_file_path = None
+        mock_settings.log_async = True
+        mock_settings.log_queue_size = 10_000
+        mock_settings.log_queue_overflow = "drop"
         mock_get_settings.return_value = mock_settings
 
         mock_interface_settings = MagicMock()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from city_data_backend.database import (
+    configure_engine,
+    get_engine,
+    get_read_engine,
+    get_read_engines,
+    get_read_session,
+    session_scope,
+)
+from city_data_backend.services.datasets import DatasetRepository, init_database
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_file_sqlite_uses_wal_and_tuned_pragmas(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """File-backed SQLite connections are switched to WAL with tuned pragmas."""
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "1234")
+    configure_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+
+    with get_engine().connect() as connection:
+        journal_mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+        synchronous = connection.execute(text("PRAGMA synchronous")).scalar()
+        busy_timeout = connection.execute(text("PRAGMA busy_timeout")).scalar()
+
+    assert journal_mode == "wal"
+    assert synchronous == 1  # NORMAL
+    assert busy_timeout == 1234
+
+
+def test_read_session_sees_commits_but_rejects_writes(tmp_path: Path) -> None:
+    """The read-only engine reads committed rows and refuses to write."""
+    configure_engine(f"sqlite:///{tmp_path / 'read.db'}")
+    with session_scope() as session:
+        session.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+        session.execute(text("INSERT INTO items (id) VALUES (1)"))
+
+    assert get_read_engine() is not get_engine()
+    read_session = get_read_session()
+    try:
+        count = read_session.execute(text("SELECT COUNT(*) FROM items")).scalar()
+        assert count == 1
+        with pytest.raises(OperationalError, match="readonly"):
+            read_session.execute(text("INSERT INTO items (id) VALUES (2)"))
+    finally:
+        read_session.close()
+
+
+def test_memory_sqlite_shares_engine_with_reads() -> None:
+    """In-memory SQLite reuses the primary engine instead of an empty database."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+
+    assert get_read_engine() is get_engine()
+
+
+def _replicate(primary: Path, replica: Path) -> None:
+    with sqlite3.connect(primary) as source, sqlite3.connect(replica) as target:
+        source.backup(target)
+
+
+def test_queries_route_to_replicas_unless_consistent(tmp_path: Path) -> None:
+    """Replica reads lag behind the primary until ``consistent`` is requested."""
+    primary = tmp_path / "primary.db"
+    replica = tmp_path / "replica.db"
+    configure_engine(f"sqlite:///{primary}", read_urls=[])
+    with session_scope() as session:
+        init_database(session)
+    _replicate(primary, replica)
+
+    configure_engine(f"sqlite:///{primary}", read_urls=[f"sqlite:///{replica}"])
+    with session_scope() as session:
+        DatasetRepository(session).ensure_dataset(
+            "population",
+            "wards",
+            "Wards",
+            "Population by ward",
+            2024,
+        )
+
+    stale = get_read_session()
+    fresh = get_read_session(consistent=True)
+    try:
+        replica_view = DatasetRepository(fresh, read_session=stale).list_datasets()
+        primary_view = DatasetRepository(fresh).list_datasets()
+        assert replica_view == []
+        assert [meta["slug"] for meta in primary_view] == ["wards"]
+        assert fresh.get_bind() is get_engine()
+    finally:
+        stale.close()
+        fresh.close()
+    assert stale.get_bind() is not get_engine()
+
+
+def test_read_engines_rotate_round_robin(tmp_path: Path) -> None:
+    """Each replica URL gets its own engine and reads rotate between them."""
+    urls = [f"sqlite:///{tmp_path / f'replica-{index}.db'}" for index in range(2)]
+    configure_engine(f"sqlite:///{tmp_path / 'primary.db'}", read_urls=urls)
+
+    engines = get_read_engines()
+    picked = {id(get_read_engine()) for _ in range(4)}
+
+    assert [str(engine.url) for engine in engines] == urls
+    assert picked == {id(engine) for engine in engines}
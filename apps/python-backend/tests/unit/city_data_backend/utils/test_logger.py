@@ -1,7 +1,10 @@
 """Unit tests for logger functionality."""
 
 import json
+import logging
+import logging.handlers
 import tempfile
+import threading
 from pathlib import Path
 from typing import Any
 
@@ -9,10 +12,15 @@ import pytest
 import structlog
 
 from city_data_backend.utils.logger import (
+    AsyncLogHandler,
+    DurationHistogram,
     configure_logging,
+    flush_performance_stats,
     get_logger,
     log_performance,
+    shutdown_logging,
 )
+from city_data_backend.utils.settings import reset_settings
 
 # Test constants
 EXPECTED_DURATION_150 = 150
@@ -289,3 +297,152 @@ class TestPerformanceLogging:
             assert log_entry["function_name"] == "failing_function"
             assert "exception" in log_entry
             assert log_entry["exception"] == f"ValueError: {TEST_EXCEPTION_MESSAGE}"
+
+    def test_log_performance_aggregates_into_summary(self) -> None:
+        """Test aggregated mode logs one percentile summary per function."""
+        flush_performance_stats()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = Path(temp_dir) / "perf_aggregate_test.log"
+            configure_logging(
+                log_level="INFO",
+                log_format="json",
+                log_file=str(log_file),
+            )
+            logger = get_logger("perf_aggregate_test")
+
+            @log_performance(logger, aggregate=True, sample_rate=1.0)
+            def hot_function(value: int) -> int:
+                if value < 0:
+                    raise ValueError(TEST_EXCEPTION_MESSAGE)
+                return value
+
+            for value in range(100):
+                hot_function(value)
+            with pytest.raises(ValueError, match=TEST_EXCEPTION_MESSAGE):
+                hot_function(-1)
+            assert log_file.read_text() == ""
+
+            shutdown_logging()
+            entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+
+        summary = next(
+            entry
+            for entry in entries
+            if entry["function_name"].endswith("hot_function")
+        )
+        assert summary["event"] == "Function performance summary"
+        assert summary["sampled_calls"] == 101
+        assert summary["errors"] == 1
+        assert summary["p50_ms"] <= summary["p99_ms"] <= summary["max_ms"]
+
+    def test_log_performance_disabled_and_zero_sample_rate(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test disabled instrumentation leaves functions unwrapped."""
+        logger = get_logger("perf_disabled_test")
+
+        def target() -> int:
+            return EXPECTED_INT_42
+
+        assert log_performance(logger, aggregate=True, sample_rate=0)(target) is target
+        monkeypatch.setenv("PERF_ENABLED", "false")
+        reset_settings()
+        try:
+            assert log_performance(logger)(target) is target
+        finally:
+            reset_settings()
+
+    def test_duration_histogram_percentiles(self) -> None:
+        """Test histogram percentiles stay within the bucket resolution."""
+        histogram = DurationHistogram()
+        for duration_ms in range(1, 1001):
+            histogram.add(float(duration_ms))
+
+        assert histogram.percentile(0.5) == pytest.approx(500, rel=0.05)
+        assert histogram.percentile(0.99) == pytest.approx(990, rel=0.05)
+        assert histogram.percentile(1.0) == 1000
+
+
+class _BlockingListHandler(logging.Handler):
+    """Collect messages, holding the first one until released."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.unblocked = threading.Event()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.unblocked.wait(timeout=5)
+        self.messages.append(record.getMessage())
+
+
+class TestAsyncLogSink:
+    """Unit tests for the background-thread log sink."""
+
+    def test_async_sink_flushes_on_shutdown(self) -> None:
+        """Test queued records are all written by shutdown_logging."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = Path(temp_dir) / "async_test.log"
+            configure_logging(
+                log_level="INFO",
+                log_format="json",
+                log_file=str(log_file),
+                async_sink=True,
+            )
+            logger = get_logger("async_test")
+            for index in range(500):
+                logger.info("Queued message", index=index)
+
+            shutdown_logging()
+            lines = log_file.read_text().splitlines()
+            root_handlers = logging.getLogger().handlers
+
+            assert [json.loads(line)["index"] for line in lines] == list(range(500))
+            assert not any(isinstance(h, AsyncLogHandler) for h in root_handlers)
+            logging.getLogger().handlers.clear()
+
+    def test_async_sink_drops_when_full(self) -> None:
+        """Test the drop policy counts overflow and reports it once written."""
+        target = _BlockingListHandler()
+        handler = AsyncLogHandler([target], queue_size=2, overflow="drop")
+        record_logger = logging.getLogger("async_drop_test")
+        record_logger.propagate = False
+        record_logger.addHandler(handler)
+        try:
+            for index in range(20):
+                record_logger.warning("message %d", index)
+            assert handler.dropped > 0
+        finally:
+            target.unblocked.set()
+            record_logger.removeHandler(handler)
+            handler.close()
+
+        assert target.messages[0] == "message 0"
+        assert (
+            target.messages[-1] == f"Dropped {handler.dropped} log records (queue full)"
+        )
+        assert len(target.messages) == 20 - handler.dropped + 1
+
+    def test_async_sink_rolls_rotating_file_handlers_over(self) -> None:
+        """Test rotating handlers get one emit per record, so they still roll over."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = Path(temp_dir) / "rotating.log"
+            target = logging.handlers.RotatingFileHandler(
+                log_file,
+                maxBytes=64,
+                backupCount=1,
+            )
+            handler = AsyncLogHandler([target])
+            record_logger = logging.getLogger("async_rotating_test")
+            record_logger.propagate = False
+            record_logger.addHandler(handler)
+            try:
+                for index in range(10):
+                    record_logger.warning("rotating message %d", index)
+            finally:
+                record_logger.removeHandler(handler)
+                handler.close()
+
+            assert (Path(temp_dir) / "rotating.log.1").exists()
+            assert log_file.stat().st_size <= 64
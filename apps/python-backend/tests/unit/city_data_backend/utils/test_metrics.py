@@ -0,0 +1,133 @@
+"""Unit tests for the metrics registry and Prometheus rendering."""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from typing import TYPE_CHECKING
+
+from city_data_backend.utils.metrics import (
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    configure_metrics,
+    record_cache_access,
+    render_metrics,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def test_render_counter_gauge_and_histogram() -> None:
+    """Samples are rendered with totals, labels and cumulative buckets."""
+    registry = MetricsRegistry()
+    requests = Counter("requests", "Handled requests.", ("route",), registry=registry)
+    depth = Gauge("depth", "Queue depth.", registry=registry)
+    latency = Histogram(
+        "latency_seconds",
+        "Latency.",
+        buckets=(0.1, 1.0),
+        registry=registry,
+    )
+
+    requests.inc(route="/a")
+    requests.inc(2, route="/a")
+    depth.set(5)
+    depth.dec()
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(3.0)
+
+    text = render_metrics(registry)
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/a"} 3' in text
+    assert "depth 4" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_sum 3.55" in text
+    assert "latency_seconds_count 3" in text
+
+
+def test_multiprocess_files_are_merged(tmp_path: Path) -> None:
+    """Counters are summed across process files and gauges honour their mode."""
+    registry = MetricsRegistry(tmp_path)
+    jobs = Counter("jobs", "Jobs.", registry=registry)
+    busy = Gauge("busy", "Busy workers.", registry=registry, multiprocess_mode="max")
+    jobs.inc(2)
+    busy.set(7)
+    registry.reset(tmp_path)
+    # Pretend the values so far were written by another live process.
+    (tmp_path / f"metrics_{os.getpid()}.db").rename(
+        tmp_path / f"metrics_{os.getppid()}.db",
+    )
+    jobs.inc(3)
+    busy.set(4)
+
+    text = render_metrics(registry)
+    assert "jobs_total 5" in text
+    assert "busy 7" in text
+    registry.reset(None)
+
+
+def test_mmap_file_grows_while_other_threads_increment(tmp_path: Path) -> None:
+    """Remapping the file for new series never races value updates."""
+    registry = MetricsRegistry(tmp_path)
+    hits = Counter("hits", "Hits.", registry=registry)
+    series = Counter("series", "Series.", ("key",), registry=registry)
+    errors: list[BaseException] = []
+
+    def increment() -> None:
+        try:
+            for _ in range(5_000):
+                hits.inc()
+        except BaseException as exc:
+            errors.append(exc)
+
+    def add_series() -> None:
+        # Long label values fill the initial 64 KiB quickly and force remaps.
+        for index in range(5_000):
+            series.inc(key=f"{index:0>200}")
+
+    threads = [threading.Thread(target=increment) for _ in range(4)]
+    threads.append(threading.Thread(target=add_series))
+    interval = sys.getswitchinterval()
+    # Switch threads often so increments land between close and remap.
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert "hits_total 20000" in render_metrics(registry)
+    registry.reset(None)
+
+
+def test_cache_hit_ratio_and_env_configuration(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The global registry derives hit ratios and honours the env directory."""
+    monkeypatch.setenv("METRICS_MULTIPROC_DIR", str(tmp_path))
+    configure_metrics()
+    try:
+        record_cache_access("compiled_program", hit=True)
+        record_cache_access("compiled_program", hit=True)
+        record_cache_access("compiled_program", hit=False)
+
+        text = render_metrics()
+        assert REGISTRY.multiproc_dir == tmp_path
+        assert any(tmp_path.glob("metrics_*.db"))
+        assert 'cache_hit_ratio{cache="compiled_program"} 0.6666666666666666' in text
+    finally:
+        REGISTRY.reset(None)
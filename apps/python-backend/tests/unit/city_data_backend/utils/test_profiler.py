@@ -0,0 +1,106 @@
+"""Unit tests for the sampling profiler and its output formats."""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import stat
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from city_data_backend.utils.profiler import (
+    PROFILE_SIGNAL,
+    ProfilerBusyError,
+    SamplingProfiler,
+    capture_profile,
+    install_profile_signal_handler,
+    profile_output_path,
+    profile_request_path,
+    profile_runtime_dir,
+    request_process_profile,
+    wait_for_profile,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_profiler_renders_collapsed_and_speedscope() -> None:
+    """Stacks of other threads are aggregated into both output formats."""
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy")
+    worker.start()
+    try:
+        with SamplingProfiler(interval_s=0.001) as profiler:
+            time.sleep(0.1)
+    finally:
+        stop.set()
+        worker.join()
+    result = profiler.result
+
+    assert result.samples > 0
+    collapsed = result.to_collapsed()
+    assert any(
+        line.startswith("busy;") and "_busy_loop" in line
+        for line in collapsed.splitlines()
+    )
+    document = result.to_speedscope()
+    busy = next(p for p in document["profiles"] if p["name"] == "busy")
+    frames = document["shared"]["frames"]
+    assert busy["type"] == "sampled"
+    assert len(busy["samples"]) == len(busy["weights"])
+    assert any(frames[i]["name"] == "_busy_loop" for i in busy["samples"][0])
+
+
+def test_only_one_capture_at_a_time() -> None:
+    """A second profiler in the same process is rejected while one runs."""
+    with SamplingProfiler(), pytest.raises(ProfilerBusyError):
+        capture_profile(0.01)
+    assert capture_profile(0.01).duration_s > 0
+
+
+@pytest.mark.skipif(PROFILE_SIGNAL is None, reason="requires SIGUSR2")
+def test_signal_triggered_profile() -> None:
+    """A process with the handler installed writes the requested profile."""
+    assert PROFILE_SIGNAL is not None
+    previous = signal.getsignal(PROFILE_SIGNAL)
+    try:
+        assert install_profile_signal_handler()
+        output = request_process_profile(os.getpid(), 0.05)
+        assert wait_for_profile(output, timeout_s=5)
+    finally:
+        signal.signal(PROFILE_SIGNAL, previous)
+
+    assert output.parent == profile_runtime_dir()
+    assert output.read_text("utf-8").strip()
+    assert stat.S_IMODE(output.parent.stat().st_mode) == 0o700
+    output.unlink()
+
+
+@pytest.mark.skipif(PROFILE_SIGNAL is None, reason="requires SIGUSR2")
+def test_profile_requests_never_follow_symlinks(tmp_path: Path) -> None:
+    """A request planted as a symlink is ignored rather than read through."""
+    planted = tmp_path / "request.json"
+    planted.write_text(json.dumps({"seconds": 0.01}), "utf-8")
+    request_path = profile_request_path(os.getpid())
+    request_path.unlink(missing_ok=True)
+    request_path.symlink_to(planted)
+    assert PROFILE_SIGNAL is not None
+    previous = signal.getsignal(PROFILE_SIGNAL)
+    try:
+        assert install_profile_signal_handler()
+        os.kill(os.getpid(), PROFILE_SIGNAL)
+    finally:
+        signal.signal(PROFILE_SIGNAL, previous)
+        request_path.unlink()
+
+    assert not profile_output_path(os.getpid(), "collapsed").exists()
@@ -0,0 +1,102 @@
+"""Unit tests for stage timing and Server-Timing rendering."""
+
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from city_data_backend.utils import timing
+from city_data_backend.utils.timing import (
+    RequestTimings,
+    StageTiming,
+    current_request_timings,
+    finish_request_timings,
+    stage,
+    start_request_timings,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+def test_stage_records_on_active_request() -> None:
+    """Stages are appended to the active collector with late attributes."""
+    token = start_request_timings()
+    with stage("query", dataset=1) as attrs:
+        attrs["rows_out"] = 3
+    timings = finish_request_timings(token)
+
+    assert [timing.name for timing in timings.stages] == ["query"]
+    assert timings.stages[0].attributes == {"dataset": 1, "rows_out": 3}
+    assert timings.stages[0].duration_ms >= 0
+    assert current_request_timings() is None
+
+
+def test_stage_without_request_and_on_error() -> None:
+    """Stages work outside requests and mark failures before re-raising."""
+    with stage("standalone"):
+        pass
+
+    token = start_request_timings()
+    with pytest.raises(RuntimeError), stage("record"):
+        raise RuntimeError
+    timings = finish_request_timings(token)
+
+    assert timings.stages[0].attributes == {"error": True}
+
+
+class _RecordingTracer:
+    """Tracer whose spans remember the exception they were exited with."""
+
+    def __init__(self) -> None:
+        self.errors: list[BaseException] = []
+
+    def get_tracer(self, name: str) -> "_RecordingTracer":  # noqa: ARG002
+        return self
+
+    @contextmanager
+    def start_as_current_span(self, name: str) -> "Iterator[_RecordingTracer]":  # noqa: ARG002
+        try:
+            yield self
+        except BaseException as exc:
+            self.errors.append(exc)
+            raise
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        pass
+
+
+def test_stage_span_sees_the_stage_exception(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The OpenTelemetry span is exited with the error, so it is recorded."""
+    tracer = _RecordingTracer()
+    monkeypatch.setattr(timing, "trace", tracer)
+
+    with pytest.raises(RuntimeError, match="boom"), stage("query"):
+        raise RuntimeError("boom")
+
+    assert [str(exc) for exc in tracer.errors] == ["boom"]
+
+
+def test_server_timing_header_format() -> None:
+    """Stages render as Server-Timing metrics with escaped descriptions."""
+    timings = RequestTimings(
+        stages=[
+            StageTiming("metadata", 1.23456),
+            StageTiming("predict", 0.5, {"hit": True}),
+            StageTiming("bad name", 2.0, {"note": 'say "hi"'}),
+        ],
+    )
+
+    header = timings.server_timing(total_ms=10.0)
+
+    assert header == (
+        'metadata;dur=1.235, predict;dur=0.500;desc="hit=True", '
+        'bad_name;dur=2.000;desc="note=say \\"hi\\"", total;dur=10.000'
+    )
+    assert timings.as_log_fields() == {
+        "metadata": 1.235,
+        "predict": 0.5,
+        "bad name": 2.0,
+    }
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import csv
+from typing import TYPE_CHECKING
+
+from benchmarks.filters import run as run_filter_benchmark
+from benchmarks.ordering import run as run_ordering_benchmark
+from benchmarks.startup import import_time_s, unexpected_heavy_modules
+from benchmarks.suite import (
+    Comparison,
+    compare_to_baseline,
+    format_comparison,
+    run_size,
+)
+from benchmarks.synthetic import HEADER, KAWASAKI_WARDS, write_city_csv
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_write_city_csv_is_deterministic(tmp_path: Path) -> None:
+    """The generator writes the requested rows and repeats for the same seed."""
+    first = write_city_csv(tmp_path / "a.csv", 100)
+    second = write_city_csv(tmp_path / "b.csv", 100)
+
+    with first.open(encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+
+    assert rows[0] == list(HEADER)
+    assert len(rows) == 101
+    assert {row[3] for row in rows[1:]} == {ward for _, ward in KAWASAKI_WARDS}
+    assert first.read_bytes() == second.read_bytes()
+
+
+def test_run_size_covers_every_case(tmp_path: Path) -> None:
+    """A tiny run produces timings for ingestion, queries and the pipeline."""
+    results = run_size(50, tmp_path, repeat=1)
+
+    names = {result.name for result in results}
+    assert "import_csv" in names
+    assert "query_runner.top_k" in names
+    assert "interactive.q0" in names
+    assert all(result.to_dict()["median_s"] >= 0 for result in results)
+
+
+def test_compare_to_baseline_flags_regressions() -> None:
+    """Cases slower than the threshold are reported as regressions."""
+    baseline = {
+        "results": [
+            {"name": "import_csv", "rows": 10, "median_s": 1.0},
+            {"name": "query_runner.count_all", "rows": 10, "median_s": 1.0},
+        ],
+    }
+    current = {
+        "results": [
+            {"name": "import_csv", "rows": 10, "median_s": 1.05},
+            {"name": "query_runner.count_all", "rows": 10, "median_s": 1.5},
+            {"name": "interactive.q0", "rows": 10, "median_s": 1.0},
+        ],
+    }
+
+    comparisons = compare_to_baseline(current, baseline)
+
+    assert [c.key for c in comparisons if c.is_regression(0.1)] == [
+        "query_runner.count_all[10]",
+    ]
+    assert len(comparisons) == 2
+    assert "REGRESSION" in format_comparison(comparisons, 0.1)
+    assert not Comparison("x", 2.0, 1.0).is_regression(0.1)
+
+
+def test_entry_points_do_not_import_heavy_modules() -> None:
+    """CLI and script startup stay free of web frameworks and pandas."""
+    assert unexpected_heavy_modules() == {}
+    assert import_time_s("city_data_backend.types") > 0
+
+
+def test_filter_benchmark_implementations_agree() -> None:
+    """Chained and single-pass filtering select the same rows."""
+    chained, single_pass = run_filter_benchmark(5_000, repeat=1)
+
+    assert chained.rows_out == single_pass.rows_out > 0
+
+
+def test_ordering_benchmark_paths_agree() -> None:
+    """Top-k selection and the full sort return identical frames."""
+    results = run_ordering_benchmark(5_000, repeat=1)
+
+    assert all(result.identical for result in results)
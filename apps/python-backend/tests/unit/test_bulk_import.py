@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import pytest
+import yaml
+
+from city_data_backend.database import configure_engine, session_scope
+from city_data_backend.services.bulk_import import (
+    BulkImporter,
+    ManifestEntry,
+    load_manifest,
+)
+from city_data_backend.services.datasets import (
+    DatasetRepository,
+    ParsedDataFile,
+    parse_csv_file,
+)
+
+if TYPE_CHECKING:  # pragma: no cover - imports for type checking only
+    from pathlib import Path
+
+    from city_data_backend.db_models import Dataset
+
+
+def _write_manifest(tmp_path: Path) -> Path:
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "pop_a.csv").write_text(
+        "year,ward,population\n2023,A,100\n2023,B,150\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "data" / "pop_b.csv").write_text(
+        "year,ward,population\n2023,B,150\n2022,A,120\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "data" / "welfare.csv").write_text(
+        "year,ward,facilities\n2023,A,3\n",
+        encoding="utf-8",
+    )
+    manifest = {
+        "datasets": [
+            {
+                "category": "population",
+                "slug": "population_by_ward",
+                "path": "data/pop_a.csv",
+                "name": "人口",
+                "year": 2023,
+                "index": ["year"],
+            },
+            {
+                "category": "population",
+                "slug": "population_by_ward",
+                "path": "data/pop_b.csv",
+                "name": "人口",
+            },
+            {
+                "category": "welfare",
+                "slug": "welfare_facilities",
+                "path": "data/welfare.csv",
+                "name": "福祉施設",
+            },
+        ],
+    }
+    manifest_path = tmp_path / "manifest.yaml"
+    manifest_path.write_text(yaml.safe_dump(manifest, allow_unicode=True))
+    return manifest_path
+
+
+def test_load_manifest_resolves_relative_paths(tmp_path: Path) -> None:
+    """Manifest entries resolve paths relative to the manifest file."""
+    entries = load_manifest(_write_manifest(tmp_path))
+
+    assert [entry.dataset_slug for entry in entries] == [
+        "population_by_ward",
+        "population_by_ward",
+        "welfare_facilities",
+    ]
+    assert entries[0].path == tmp_path / "data" / "pop_a.csv"
+    assert entries[0].index_columns == ["year"]
+    assert entries[1].index_columns is None
+
+
+def test_load_manifest_rejects_missing_keys(tmp_path: Path) -> None:
+    """Entries without required keys raise a descriptive error."""
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text('[{"category": "population"}]', encoding="utf-8")
+
+    with pytest.raises(ValueError, match="missing required key"):
+        load_manifest(manifest_path)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_bulk_importer_parses_in_parallel_and_dedupes(
+    tmp_path: Path,
+    workers: int,
+) -> None:
+    """Files are imported once per dataset and duplicate rows are skipped."""
+    configure_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    entries = load_manifest(_write_manifest(tmp_path))
+
+    report = BulkImporter(parse_workers=workers).run(entries)
+
+    assert report.files_failed == 0
+    assert report.writer_count == 1
+    assert report.rows_parsed == 5
+    assert report.rows_inserted == 4
+    assert "Rows inserted: 4" in report.format_summary()
+    with session_scope() as session:
+        repo = DatasetRepository(session)
+        counts = {
+            meta["slug"]: len(repo.get_records(meta["id"]))
+            for meta in repo.list_datasets()
+        }
+    assert counts == {"population_by_ward": 3, "welfare_facilities": 1}
+
+
+def test_bulk_importer_reports_failed_files(tmp_path: Path) -> None:
+    """A missing file is reported without aborting the remaining entries."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    entries = load_manifest(_write_manifest(tmp_path))
+    (tmp_path / "data" / "welfare.csv").unlink()
+
+    report = BulkImporter().run(entries)
+
+    assert report.files_failed == 1
+    assert report.results[2].error is not None
+    assert report.rows_inserted == 3
+    assert "FAILED" in report.format_summary()
+
+
+def test_bulk_importer_skips_unchanged_files_on_rerun(tmp_path: Path) -> None:
+    """A second run over the same manifest skips every file."""
+    configure_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    entries = load_manifest(_write_manifest(tmp_path))
+    BulkImporter().run(entries)
+
+    report = BulkImporter().run(entries)
+
+    assert report.files_skipped == 3
+    assert report.rows_parsed == 0
+    assert report.files_failed == 0
+
+
+def test_bulk_importer_bounds_parsed_files_waiting_for_the_writer(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Parses run at most ``max_pending`` files ahead of the stored ones."""
+    configure_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    entries: list[ManifestEntry] = []
+    for index in range(8):
+        path = tmp_path / f"part_{index}.csv"
+        path.write_text(f"year,value\n2023,{index}\n", encoding="utf-8")
+        entries.append(ManifestEntry("stats", "parts", path, "Parts"))
+    stored: list[Path] = []
+    ahead: list[int] = []
+    original_store = DatasetRepository.store_parsed_file
+
+    def spy_store(
+        repo: DatasetRepository,
+        dataset: Dataset,
+        parsed: ParsedDataFile,
+        file_type: str = "csv",
+    ) -> int:
+        inserted = original_store(repo, dataset, parsed, file_type)
+        stored.append(parsed.path)
+        return inserted
+
+    def spy_parse(path: Path, *args: Any, **kwargs: Any) -> ParsedDataFile:
+        ahead.append(len(ahead) - len(stored))
+        return parse_csv_file(path, *args, **kwargs)
+
+    monkeypatch.setattr(DatasetRepository, "store_parsed_file", spy_store)
+
+    report = BulkImporter(parser=spy_parse, max_pending=2).run(entries)
+
+    assert report.files_failed == 0
+    assert stored == [entry.path for entry in entries]
+    assert max(ahead) < 2
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import codecs
 from typing import TYPE_CHECKING
 
-from sqlalchemy import text
+from sqlalchemy import select, text
 
 from city_data_backend.database import configure_engine, session_scope
+from city_data_backend.db_models import Dataset, DatasetFile
+from city_data_backend.services import datasets
 from city_data_backend.services.datasets import DatasetRepository, init_database
 
 if TYPE_CHECKING:  # pragma: no cover - imports for type checking only
+    from collections.abc import Iterator
     from pathlib import Path
 
+    import pytest
+
 
 def test_import_csv_and_metadata(tmp_path: Path) -> None:
     """Verify CSV import stores metadata, records, and index columns."""
@@ -46,3 +52,192 @@ def test_import_csv_and_metadata(tmp_path: Path) -> None:
             {"dataset_id": dataset.id},
         ).all()
     assert any("year" in row[0] for row in index_values), "year should be indexed"
+
+
+def _import_population(repo: DatasetRepository, csv_path: Path) -> int:
+    dataset = repo.import_csv(
+        category_slug="population",
+        dataset_slug="population_incremental",
+        csv_path=csv_path,
+        dataset_name="人口",
+        description="テスト人口データ",
+        year=None,
+    )
+    return dataset.id
+
+
+def test_reimport_skips_unchanged_and_parses_only_appended_rows(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Fingerprints skip unchanged files and limit appends to the new bytes."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    csv_path = tmp_path / "population.csv"
+    csv_path.write_text(
+        "year,ward,population\n2023,A,100\n2023,B,150\n",
+        encoding="utf-8",
+    )
+    parsed_batches: list[int] = []
+    original_read = datasets.read_csv_table
+
+    def spy_read(
+        path: Path,
+        start_offset: int = 0,
+        encoding: str | None = None,
+    ) -> tuple[list[str], list[list[str]]]:
+        header, rows = original_read(path, start_offset, encoding)
+        parsed_batches.append(len(rows))
+        return header, rows
+
+    fingerprinted: list[Path] = []
+    original_fingerprint = datasets.fingerprint_file
+
+    def spy_fingerprint(
+        path: Path,
+        prefix_length: int | None = None,
+    ) -> tuple[datasets.FileFingerprint, str | None]:
+        fingerprinted.append(path)
+        return original_fingerprint(path, prefix_length)
+
+    monkeypatch.setattr(datasets, "read_csv_table", spy_read)
+    monkeypatch.setattr(datasets, "fingerprint_file", spy_fingerprint)
+
+    with session_scope() as session:
+        init_database(session)
+        repo = DatasetRepository(session)
+        dataset_id = _import_population(repo, csv_path)
+        _import_population(repo, csv_path)
+        assert parsed_batches == [2]
+
+        with csv_path.open("a", encoding="utf-8") as f:
+            f.write("2024,A,110\n")
+        _import_population(repo, csv_path)
+        assert parsed_batches == [2, 1]
+        # The append reuses the fingerprint hashed while planning it.
+        assert fingerprinted == [csv_path, csv_path]
+
+        records = repo.get_records(dataset_id)
+        files = session.scalars(select(DatasetFile)).all()
+
+    assert len(records) == 3
+    assert len(files) == 1
+    assert files[0].size_bytes == csv_path.stat().st_size
+    assert files[0].content_hash is not None
+
+
+def test_reimport_rewritten_file_parses_everything(tmp_path: Path) -> None:
+    """A file whose existing content changed is fully re-imported."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    csv_path = tmp_path / "population.csv"
+    csv_path.write_text("year,ward,population\n2023,A,100\n", encoding="utf-8")
+
+    with session_scope() as session:
+        init_database(session)
+        repo = DatasetRepository(session)
+        dataset_id = _import_population(repo, csv_path)
+        csv_path.write_text(
+            "year,ward,population\n2023,A,101\n2023,B,150\n",
+            encoding="utf-8",
+        )
+        dataset = repo.session.get(Dataset, dataset_id)
+        assert dataset is not None
+        assert repo.plan_file_import(dataset, csv_path).mode == "full"
+        _import_population(repo, csv_path)
+        records = repo.get_records(dataset_id)
+
+    assert len(records) == 3
+
+
+def test_import_cp932_csv_without_transcoding(tmp_path: Path) -> None:
+    """CP932 files are detected and decoded while streaming, including appends."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    csv_path = tmp_path / "population_sjis.csv"
+    csv_path.write_bytes("区,人口\n川崎区,100\n幸区,150\n".encode("cp932"))
+
+    with session_scope() as session:
+        init_database(session)
+        repo = DatasetRepository(session)
+        dataset_id = _import_population(repo, csv_path)
+        with csv_path.open("ab") as f:
+            f.write("中原区,200\n".encode("cp932"))
+        _import_population(repo, csv_path)
+        records = repo.get_records(dataset_id)
+
+    assert datasets.detect_csv_encoding(csv_path) == "cp932"
+    assert [record["区"] for record in records] == ["川崎区", "幸区", "中原区"]
+
+
+def test_detect_csv_encoding_handles_bom_and_truncated_sample(tmp_path: Path) -> None:
+    """A UTF-8 BOM is stripped and a sample cut mid-character stays UTF-8."""
+    bom_path = tmp_path / "bom.csv"
+    bom_path.write_bytes(codecs.BOM_UTF8 + "year,区\n2023,川崎区\n".encode())
+    utf8_path = tmp_path / "utf8.csv"
+    utf8_path.write_text("区\n川崎区\n", encoding="utf-8")
+
+    header, _ = datasets.read_csv_table(bom_path)
+
+    assert datasets.detect_csv_encoding(bom_path) == "utf-8-sig"
+    assert header == ["year", "区"]
+    assert datasets.detect_csv_encoding(utf8_path, sample_size=5) == "utf-8"
+
+
+def test_reservoir_sample_is_maintained_incrementally(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Appends keep each stratum's sample equal to a sample rebuilt from scratch."""
+    monkeypatch.setenv("SAMPLE_STRATUM_SIZE", "5")
+    configure_engine("sqlite+pysqlite:///:memory:")
+    csv_path = tmp_path / "population.csv"
+    csv_path.write_text(
+        "year,ward,population\n"
+        + "".join(f"{2020 + i % 2},W{i % 3},{i}\n" for i in range(20)),
+        encoding="utf-8",
+    )
+
+    with session_scope() as session:
+        init_database(session)
+        repo = DatasetRepository(session)
+        dataset_id = _import_population(repo, csv_path)
+        with csv_path.open("a", encoding="utf-8") as f:
+            f.write("".join(f"{2020 + i % 3},W{i % 3},{i}\n" for i in range(20, 50)))
+        _import_population(repo, csv_path)
+        incremental = repo.get_sample(dataset_id)
+        repo.rebuild_sample(dataset_id)
+        rebuilt = repo.get_sample(dataset_id)
+
+    assert incremental is not None
+    assert rebuilt is not None
+    assert incremental.population == {"2020": 20, "2021": 20, "2022": 10}
+    assert incremental.population_rows == 50
+    assert sorted(incremental.strata) == ["2020"] * 5 + ["2021"] * 5 + ["2022"] * 5
+    assert sorted(map(str, incremental.records)) == sorted(map(str, rebuilt.records))
+
+
+def _no_rows(*_args: object) -> Iterator[object]:
+    return iter(())
+
+
+def test_add_records_counts_rows_stored_after_a_concurrent_writer(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Rows another writer stored first are neither counted nor sampled twice."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    rows: list[dict[str, object]] = [{"ward": "A"}, {"ward": "B"}, {"ward": "A"}]
+    index_values: list[dict[str, object]] = [{"ward": "A"}, {"ward": "B"}, {}]
+    hashes = ["h1", "h2", "h3"]
+
+    with session_scope() as session:
+        init_database(session)
+        repo = DatasetRepository(session)
+        dataset = repo.ensure_dataset("population", "race", "Race", "", None)
+        assert repo.add_records(dataset, rows[:1], index_values[:1], hashes[:1]) == 1
+        # The other writer's row is not visible yet when pending rows are picked.
+        monkeypatch.setattr(session, "scalars", _no_rows)
+        inserted = repo.add_records(dataset, rows, index_values, hashes)
+        monkeypatch.undo()
+        sample = repo.get_sample(dataset.id)
+
+    assert inserted == 2
+    assert sample is not None
+    assert sample.population_rows == 3
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import TYPE_CHECKING
+
+import pytest
+from openpyxl import Workbook
+
+from city_data_backend.database import configure_engine, session_scope
+from city_data_backend.services import datasets
+from city_data_backend.services.datasets import DatasetRepository, init_database
+
+if TYPE_CHECKING:  # pragma: no cover - imports for type checking only
+    from collections.abc import Collection, Iterator
+    from pathlib import Path
+
+
+def _write_workbook(path: Path) -> Path:
+    workbook = Workbook()
+    population = workbook.worksheets[0]
+    population.title = "人口"
+    population.append(["year", "ward", "population", "surveyed_on"])
+    population.append([2023, " A ", 100, date(2023, 4, 1)])
+    population.append([None, None, None, None])
+    population.append([2023, "B", 150.5])
+    welfare = workbook.create_sheet("福祉")
+    welfare.append(["year", "facilities", "open"])
+    welfare.append([2023, 3, True])
+    workbook.save(path)
+    return path
+
+
+def _import(repo: DatasetRepository, path: Path, **kwargs: object) -> list[int]:
+    imported = repo.import_excel(
+        category_slug="population",
+        dataset_slug="city_book",
+        excel_path=path,
+        dataset_name="市勢",
+        description="テストブック",
+        year=2023,
+        **kwargs,  # type: ignore[arg-type]
+    )
+    return [dataset.id for dataset in imported]
+
+
+def test_import_excel_keeps_native_types_per_sheet(tmp_path: Path) -> None:
+    """Every sheet becomes a dataset and cell values keep their native types."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    path = _write_workbook(tmp_path / "city.xlsx")
+
+    with session_scope() as session:
+        init_database(session)
+        repo = DatasetRepository(session)
+        population_id, welfare_id = _import(repo, path)
+        population = repo.get_dataset_metadata(population_id)
+        population_rows = repo.get_records(population_id)
+        welfare_rows = repo.get_records(welfare_id)
+
+    assert population["slug"] == "city_book_人口"
+    assert population["name"] == "市勢 (人口)"
+    assert population_rows == [
+        {
+            "year": 2023,
+            "ward": "A",
+            "population": 100,
+            "surveyed_on": "2023-04-01T00:00:00",
+        },
+        {"year": 2023, "ward": "B", "population": 150.5, "surveyed_on": None},
+    ]
+    assert welfare_rows == [{"year": 2023, "facilities": 3, "open": True}]
+
+
+def test_import_excel_skips_unchanged_workbook(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Re-importing one sheet of an unchanged workbook reads no worksheet."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    path = _write_workbook(tmp_path / "city.xlsx")
+    calls: list[Collection[str] | None] = []
+    original = datasets.read_excel_tables
+
+    def spy(
+        excel_path: Path,
+        sheet_names: Collection[str] | None = None,
+    ) -> Iterator[datasets.WorksheetTable]:
+        calls.append(sheet_names)
+        return original(excel_path, sheet_names)
+
+    monkeypatch.setattr(datasets, "read_excel_tables", spy)
+
+    with session_scope() as session:
+        init_database(session)
+        repo = DatasetRepository(session)
+        _, welfare_id = _import(repo, path)
+        reimported = _import(repo, path, sheet_names=["福祉"])
+        welfare = repo.get_dataset_metadata(welfare_id)
+        records = repo.get_records(welfare_id)
+
+    assert len(calls) == 1
+    assert reimported == [welfare_id]
+    assert welfare["slug"] == "city_book_福祉"
+    assert len(records) == 1
+
+
+def test_single_sheet_workbook_keeps_the_dataset_slug(tmp_path: Path) -> None:
+    """Only workbooks with several sheets get per-sheet slugs."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    workbook = Workbook()
+    workbook.worksheets[0].append(["year", "population"])
+    workbook.worksheets[0].append([2023, 100])
+    path = tmp_path / "single.xlsx"
+    workbook.save(path)
+
+    with session_scope() as session:
+        init_database(session)
+        repo = DatasetRepository(session)
+        (dataset_id,) = _import(repo, path)
+        dataset = repo.get_dataset_metadata(dataset_id)
+
+    assert dataset["slug"] == "city_book"
+    assert dataset["name"] == "市勢"
+
+
+@pytest.mark.parametrize(
+    ("title", "expected"),
+    [("人口 2023", "人口_2023"), ("Wards (A-Z)", "wards_a_z"), ("---", None)],
+)
+def test_sheet_slug_is_derived_from_the_title(title: str, expected: str | None) -> None:
+    """Titles become readable slugs; punctuation-only titles are hashed."""
+    slug = datasets.sheet_slug(title)
+
+    if expected is None:
+        assert slug.startswith("sheet_")
+        assert slug == datasets.sheet_slug(title)
+    else:
+        assert slug == expected
+
+
+def test_import_excel_rejects_unknown_sheets(tmp_path: Path) -> None:
+    """Requesting a missing worksheet raises a descriptive error."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    path = _write_workbook(tmp_path / "city.xlsx")
+
+    with session_scope() as session:
+        init_database(session)
+        repo = DatasetRepository(session)
+        with pytest.raises(ValueError, match="Worksheets not found"):
+            _import(repo, path, sheet_names=["missing"])
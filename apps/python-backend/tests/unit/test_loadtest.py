@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from benchmarks.loadtest import (
+    LoadTestReport,
+    RequestOutcome,
+    parse_mix,
+    percentile,
+    prepare_in_process_app,
+    run_load,
+)
+from city_data_backend.utils.settings import reset_auth_settings
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+@pytest.fixture
+def api_token(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    """Provide a fresh API token for the in-process app."""
+    monkeypatch.setenv("API_TOKEN", "load-token")
+    reset_auth_settings()
+    yield "load-token"
+    reset_auth_settings()
+
+
+def test_percentile_uses_nearest_rank() -> None:
+    """Percentiles pick observed values using the nearest-rank method."""
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_parse_mix_validates_endpoints() -> None:
+    """Unknown endpoints and all-zero weights are rejected."""
+    assert parse_mix("interactive=3, datasets") == {"interactive": 3, "datasets": 1}
+    with pytest.raises(ValueError, match="Unknown endpoint"):
+        parse_mix("health=1")
+    with pytest.raises(ValueError, match="positive weight"):
+        parse_mix("datasets=0")
+
+
+def test_report_counts_errors_per_endpoint() -> None:
+    """Error rates are computed from non-2xx responses and transport errors."""
+    report = LoadTestReport(
+        outcomes=[
+            RequestOutcome("datasets", 200, 0.01),
+            RequestOutcome("datasets", 500, 0.02),
+            RequestOutcome("interactive", None, 0.03, "ConnectError: refused"),
+        ],
+        elapsed_s=1.0,
+        concurrency=2,
+    )
+
+    summary = report.summary()
+
+    assert summary["overall"]["errors"] == 2
+    assert summary["endpoints"]["datasets"]["error_rate"] == 0.5
+    assert summary["overall"]["throughput_rps"] == 3.0
+    assert "TOTAL" in report.format_table()
+
+
+def test_run_load_against_in_process_app(tmp_path: Path, api_token: str) -> None:
+    """The default mix runs against the in-process app without errors."""
+    app, dataset_id, token = prepare_in_process_app(tmp_path, rows=200)
+
+    async def _run() -> LoadTestReport:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+            base_url="http://loadtest",
+            headers={"Authorization": f"Bearer {token}"},
+        ) as client:
+            return await run_load(
+                client,
+                dataset_id,
+                parse_mix("interactive=2,datasets=1,experiments_list=1"),
+                requests=12,
+                concurrency=3,
+            )
+
+    report = asyncio.run(_run())
+
+    assert token == api_token
+    assert len(report.outcomes) == 12
+    assert report.summary()["overall"]["errors"] == 0
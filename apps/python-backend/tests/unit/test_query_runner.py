@@ -1,14 +1,37 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import os
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+import pytest
+from pydantic import ValidationError
 
 from city_data_backend.database import configure_engine, session_scope
+from city_data_backend.models.dspy import QueryFilter
 from city_data_backend.services.datasets import DatasetRepository, init_database
+from city_data_backend.services.query_filters import (
+    QueryValidationError,
+    apply_filters,
+    compile_filters,
+)
+from city_data_backend.services.query_ordering import sort_and_limit
+from city_data_backend.services.query_parallel import (
+    encode_columns,
+    shutdown_pool,
+    worker_pool,
+)
 from city_data_backend.services.query_runner import QueryRunner
 
 if TYPE_CHECKING:  # pragma: no cover - imports for type checking only
     from pathlib import Path
 
+    from sqlalchemy.orm import Session
+
+    from city_data_backend.models.dspy import QueryFilterDict, QueryMetricDict
+
+DataFrame = Any
+
 
 def test_group_and_metric_execution(tmp_path: Path) -> None:
     """Ensure query runner executes filters, grouping, and metrics."""
@@ -43,3 +66,648 @@ def test_group_and_metric_execution(tmp_path: Path) -> None:
     assert result["summary"]["returned_rows"] == 2
     assert result["data"][0]["population_sum"] == 150
     assert {row["ward"] for row in result["data"]} == {"A", "B"}
+
+
+def test_dataset_frames_are_reused_until_records_are_added(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Repeated queries skip loading records; a new record reloads them."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    csv_path = tmp_path / "population.csv"
+    csv_path.write_text(
+        "year,ward,population\n2023,A,100\n2023,B,150\n",
+        encoding="utf-8",
+    )
+    loads: list[int] = []
+    get_records = DatasetRepository.get_records
+
+    def counting_get_records(
+        repo: DatasetRepository,
+        dataset_id: int,
+    ) -> list[dict[str, Any]]:
+        loads.append(dataset_id)
+        return get_records(repo, dataset_id)
+
+    monkeypatch.setattr(DatasetRepository, "get_records", counting_get_records)
+    query_spec = {"metrics": [{"agg": "sum", "column": "population"}]}
+
+    with session_scope() as session:
+        init_database(session)
+        repo = DatasetRepository(session)
+        dataset = repo.import_csv(
+            category_slug="population",
+            dataset_slug="population_by_ward",
+            csv_path=csv_path,
+            dataset_name="人口",
+            description="テスト人口データ",
+            year=2023,
+        )
+        runner = QueryRunner(session)
+        first = runner.run(dataset.id, query_spec)
+        second = runner.run(dataset.id, query_spec)
+        repo.add_record(
+            dataset,
+            {"year": 2023, "ward": "C", "population": 50},
+            {"year": 2023, "ward": "C"},
+        )
+        third = runner.run(dataset.id, query_spec)
+
+    assert first["data"] == second["data"] == [{"sum_population": 250}]
+    assert third["data"] == [{"sum_population": 300}]
+    assert loads == [dataset.id, dataset.id]
+
+
+def test_filters_run_most_selective_first_in_one_selection() -> None:
+    """Predicates are reordered by selectivity and applied as one selection."""
+    frame: DataFrame = pd.DataFrame(
+        {
+            "year": [2020, 2021, 2022, 2023] * 25,
+            "ward": [f"w{index % 10}" for index in range(100)],
+        },
+    )
+    filters: list[QueryFilterDict] = [
+        {"column": "year", "op": "gte", "value": 2021},
+        {"column": "ward", "op": "eq", "value": "w3"},
+    ]
+
+    predicates = compile_filters(frame, filters)
+    filtered = apply_filters(frame, filters)
+
+    assert [predicate.column for predicate in predicates] == ["ward", "year"]
+    expected = frame[(frame["year"] >= 2021) & (frame["ward"] == "w3")]
+    assert filtered.equals(expected)
+
+
+def test_filters_reject_unknown_operators() -> None:
+    """Unknown operators are reported as validation errors."""
+    frame = pd.DataFrame({"year": [2023]})
+
+    with pytest.raises(QueryValidationError, match="Unsupported operator"):
+        apply_filters(frame, [{"column": "year", "op": "like", "value": 1}])
+
+
+@pytest.mark.parametrize(
+    ("query_filter", "expected_codes"),
+    [
+        ({"column": "ward", "op": "in", "value": ["Kawasaki", "Saiwai"]}, [1, 2]),
+        ({"column": "ward", "op": "not_in", "value": ["Kawasaki"]}, [2, 3, 4]),
+        ({"column": "population", "op": "between", "value": [150, 300]}, [2, 3]),
+        ({"column": "population", "op": "is_null"}, [4]),
+        ({"column": "population", "op": "not_null"}, [1, 2, 3]),
+        ({"column": "ward", "op": "contains", "value": "aka"}, [3]),
+        ({"column": "code", "op": "startswith", "value": "1"}, [1]),
+    ],
+)
+def test_extended_filter_operators(
+    query_filter: QueryFilterDict,
+    expected_codes: list[int],
+) -> None:
+    """Set, range, null and string operators select the expected rows."""
+    frame = pd.DataFrame(
+        {
+            "code": [1, 2, 3, 4],
+            "ward": ["Kawasaki", "Saiwai", "Nakahara", None],
+            "population": [100, 200, 300, None],
+        },
+    )
+
+    filtered: DataFrame = apply_filters(frame, [query_filter])
+
+    assert filtered["code"].tolist() == expected_codes
+
+
+def test_filter_values_are_validated() -> None:
+    """Operands that do not fit the operator are rejected early."""
+    with pytest.raises(ValidationError, match="expects a list"):
+        QueryFilter(column="ward", op="in", value="Kawasaki")
+    with pytest.raises(ValidationError, match="'eq' expects a value"):
+        QueryFilter(column="ward", op="eq")
+    QueryFilter(column="ward", op="is_null")
+    with pytest.raises(QueryValidationError, match=r"\[low, high\]"):
+        apply_filters(
+            pd.DataFrame({"year": [2023]}),
+            [{"column": "year", "op": "between", "value": [2020]}],
+        )
+
+
+@pytest.mark.parametrize(
+    ("columns", "ascending"),
+    [
+        (["value"], [False]),
+        (["value"], [True]),
+        (["value", "name"], [False, False]),
+        (["group", "value"], [True, False]),
+    ],
+)
+def test_top_k_matches_full_stable_sort(
+    columns: list[str],
+    ascending: list[bool],
+) -> None:
+    """Top-k selection returns the same rows and tie order as a full sort."""
+    frame = pd.DataFrame(
+        {
+            "value": [3.0, 1.0, 3.0, None, 2.0, 3.0, 1.0, 2.0] * 8,
+            "name": [f"n{index % 5}" for index in range(64)],
+            "group": [index % 3 for index in range(64)],
+        },
+    )
+    expected = frame.sort_values(by=columns, ascending=ascending, kind="stable")
+
+    for limit in (1, 5, 20, 60):
+        assert sort_and_limit(frame, columns, ascending, limit).equals(
+            expected.head(limit),
+        )
+
+
+def _import_streaming_fixture(session: Session, tmp_path: Path) -> int:
+    csv_path = tmp_path / "stream.csv"
+    rows = [
+        f"{2020 + index % 3},{'ABC'[index % 3]},{index * 1.5}" for index in range(11)
+    ]
+    csv_path.write_text(
+        "year,ward,population\n" + "\n".join(rows) + "\n",
+        encoding="utf-8",
+    )
+    init_database(session)
+    dataset = DatasetRepository(session).import_csv(
+        category_slug="population",
+        dataset_slug="streaming",
+        csv_path=csv_path,
+        dataset_name="人口",
+        description="ストリーミング集計",
+        year=2023,
+    )
+    return dataset.id
+
+
+@pytest.mark.parametrize(
+    "query_spec",
+    [
+        {
+            "group_by": ["ward"],
+            "metrics": [
+                {"agg": "sum", "column": "population"},
+                {"agg": "avg", "column": "population"},
+                {"agg": "min", "column": "population"},
+                {"agg": "max", "column": "population"},
+                {"agg": "count"},
+            ],
+            "order_by": [{"column": "ward", "direction": "asc"}],
+        },
+        {
+            "filters": [{"column": "year", "op": "gte", "value": 2021}],
+            "group_by": ["year", "ward"],
+            "metrics": [{"agg": "avg", "column": "population"}],
+            "order_by": [{"column": "year", "direction": "desc"}],
+            "limit": 2,
+        },
+        {
+            "filters": [{"column": "ward", "op": "in", "value": ["A", "C"]}],
+            "metrics": [{"agg": "count"}, {"agg": "avg", "column": "population"}],
+        },
+        {
+            "group_by": ["ward"],
+            "metrics": [
+                {"agg": "count_distinct", "column": "year"},
+                {"agg": "median", "column": "population"},
+                {"agg": "percentile", "column": "population", "p": 90},
+            ],
+            "order_by": [{"column": "ward", "direction": "asc"}],
+        },
+        {
+            "metrics": [
+                {"agg": "count_distinct", "column": "ward"},
+                {"agg": "percentile", "column": "population", "p": 25},
+            ],
+        },
+    ],
+)
+def test_streaming_aggregation_matches_in_memory(
+    tmp_path: Path,
+    query_spec: dict[str, Any],
+) -> None:
+    """Batch-wise partial aggregates give the same result as one groupby."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    with session_scope() as session:
+        dataset_id = _import_streaming_fixture(session, tmp_path)
+        runner = QueryRunner(session, batch_size=2)
+        expected = runner.run(dataset_id, query_spec, streaming=False)
+        streamed = runner.run(dataset_id, query_spec, streaming=True)
+
+    assert streamed["summary"] == expected["summary"]
+    assert len(streamed["data"]) == len(expected["data"])
+    for streamed_row, expected_row in zip(
+        streamed["data"],
+        expected["data"],
+        strict=True,
+    ):
+        assert streamed_row == pytest.approx(expected_row)
+
+
+@pytest.mark.parametrize(
+    ("metric", "message"),
+    [
+        ({"agg": "percentile", "column": "population"}, "requires p"),
+        ({"agg": "percentile", "column": "population", "p": 120}, "requires p"),
+        ({"agg": "median", "column": None}, "requires a column"),
+    ],
+)
+def test_sketch_aggregators_are_validated(
+    tmp_path: Path,
+    metric: dict[str, Any],
+    message: str,
+) -> None:
+    """Percentiles need p in [0, 100] and sketch aggregators need a column."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    with session_scope() as session:
+        dataset_id = _import_streaming_fixture(session, tmp_path)
+        with pytest.raises(QueryValidationError, match=message):
+            QueryRunner(session).run(dataset_id, {"metrics": [metric]})
+
+
+def test_streaming_is_chosen_above_the_row_threshold(tmp_path: Path) -> None:
+    """Datasets larger than the threshold are read in batches."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    query_spec = {"group_by": ["ward"], "metrics": [{"agg": "count"}]}
+    with session_scope() as session:
+        dataset_id = _import_streaming_fixture(session, tmp_path)
+        runner = QueryRunner(session, streaming_threshold_rows=5, batch_size=4)
+        batch_sizes = [
+            len(batch) for batch in runner.repo.iter_record_batches(dataset_id, 4)
+        ]
+        result = runner.run(dataset_id, query_spec)
+
+    assert batch_sizes == [4, 4, 3]
+    assert sorted(row["count"] for row in result["data"]) == [3, 4, 4]
+
+
+def test_parallel_aggregation_matches_single_groupby(tmp_path: Path) -> None:
+    """Chunks aggregated in worker processes merge into the serial result."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    query_spec = {
+        "group_by": ["year", "ward"],
+        "metrics": [
+            {"agg": "sum", "column": "population"},
+            {"agg": "avg", "column": "population"},
+            {"agg": "max", "column": "population"},
+            {"agg": "count"},
+        ],
+        "order_by": [{"column": "population", "direction": "desc"}],
+    }
+    with session_scope() as session:
+        dataset_id = _import_streaming_fixture(session, tmp_path)
+        serial = QueryRunner(session, parallel_workers=1).run(dataset_id, query_spec)
+        parallel = QueryRunner(
+            session,
+            parallel_threshold_rows=1,
+            parallel_workers=2,
+        ).run(dataset_id, query_spec)
+
+    assert parallel["summary"] == serial["summary"]
+    for parallel_row, serial_row in zip(parallel["data"], serial["data"], strict=True):
+        assert parallel_row == pytest.approx(serial_row)
+
+
+def test_parallel_aggregation_needs_numeric_metric_columns() -> None:
+    """Frames whose metric columns cannot be shared stay on the serial path."""
+    frame = pd.DataFrame({"ward": ["A", "B", None], "label": ["x", "y", "z"]})
+    text_max: list[QueryMetricDict] = [{"agg": "max", "column": "label"}]
+    count: list[QueryMetricDict] = [{"agg": "count", "column": None}]
+
+    encoded = encode_columns(frame, ["ward"], text_max)
+    shareable = encode_columns(frame, ["ward"], count)
+
+    assert encoded is None
+    assert shareable is not None
+    arrays, uniques = shareable
+    assert arrays["ward"].tolist() == [0, 1, 2]
+    assert uniques["ward"][:2].tolist() == ["A", "B"]
+
+
+def test_parallel_queries_share_one_worker_pool() -> None:
+    """The pool is started once per worker count, not per query."""
+    shutdown_pool()
+    try:
+        pool = worker_pool(2)
+
+        assert worker_pool(2) is pool
+        assert pool.submit(os.getpid).result() != os.getpid()
+        assert worker_pool(3) is not pool
+    finally:
+        shutdown_pool()
+
+
+YEARLY_POPULATION = {
+    "A": [100, 110, 121, 121],
+    "B": [50, 0, 40, 60],
+}
+
+
+def _import_yearly_fixture(session: Session, tmp_path: Path) -> int:
+    csv_path = tmp_path / "yearly.csv"
+    rows = [
+        f"{2020 + offset},{ward},{value}"
+        for ward, values in YEARLY_POPULATION.items()
+        for offset, value in enumerate(values)
+    ]
+    csv_path.write_text(
+        "year,ward,population\n" + "\n".join(reversed(rows)) + "\n",
+        encoding="utf-8",
+    )
+    init_database(session)
+    dataset = DatasetRepository(session).import_csv(
+        category_slug="population",
+        dataset_slug="yearly",
+        csv_path=csv_path,
+        dataset_name="人口推移",
+        description="年次推移",
+        year=2023,
+    )
+    return dataset.id
+
+
+def test_window_metrics_follow_each_partition_in_time_order(tmp_path: Path) -> None:
+    """Year-over-year, moving and ranking windows are computed per ward."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    query_spec = {
+        "group_by": ["ward", "year"],
+        "metrics": [{"agg": "sum", "column": "population"}],
+        "windows": [
+            {"func": "lag", "column": "population", "order_by": "year"},
+            {"func": "pct_change", "column": "population", "order_by": "year"},
+            {
+                "func": "rolling_mean",
+                "column": "population",
+                "order_by": "year",
+                "n": 2,
+            },
+            {"func": "cumsum", "column": "population", "order_by": "year"},
+            {"func": "rank", "column": "population", "partition_by": ["year"]},
+        ],
+        "order_by": [{"column": "ward", "direction": "asc"}],
+    }
+    with session_scope() as session:
+        dataset_id = _import_yearly_fixture(session, tmp_path)
+        result = QueryRunner(session).run(dataset_id, query_spec)
+        streamed = QueryRunner(session, batch_size=3).run(
+            dataset_id,
+            query_spec,
+            streaming=True,
+        )
+
+    frame: DataFrame = pd.DataFrame(result["data"]).sort_values(["ward", "year"])
+    ward_b = frame[frame["ward"] == "B"]
+    assert ward_b["population_sum_lag"].tolist()[1:] == [50, 0, 40]
+    # A change from zero has no finite ratio.
+    assert ward_b["population_sum_pct_change"].tolist()[1:] == pytest.approx(
+        [-1.0, float("nan"), 0.5],
+        nan_ok=True,
+    )
+    assert ward_b["population_sum_rolling_mean2"].tolist()[1:] == [25, 20, 50]
+    assert ward_b["population_sum_cumsum"].tolist() == [50, 50, 90, 150]
+    assert ward_b["population_sum_rank"].tolist() == [2, 2, 2, 2]
+    assert result["summary"]["windows"] == query_spec["windows"]
+    for streamed_row, row in zip(streamed["data"], result["data"], strict=True):
+        assert streamed_row == pytest.approx(row, nan_ok=True)
+
+
+def test_window_keys_must_be_group_by_columns(tmp_path: Path) -> None:
+    """Windows are ordered and partitioned by columns of the grouped result."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    query_spec = {
+        "group_by": ["ward"],
+        "metrics": [{"agg": "sum", "column": "population"}],
+        "windows": [{"func": "pct_change", "column": "population", "order_by": "year"}],
+    }
+    with session_scope() as session:
+        dataset_id = _import_yearly_fixture(session, tmp_path)
+        with pytest.raises(QueryValidationError, match="must be a group_by column"):
+            QueryRunner(session).run(dataset_id, query_spec)
+
+
+@pytest.mark.parametrize("func", ["cumsum", "pct_change", "rolling_mean"])
+def test_windows_on_text_columns_are_rejected(tmp_path: Path, func: str) -> None:
+    """Arithmetic windows need numbers; lag and rank accept any column."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    query_spec: dict[str, Any] = {
+        "group_by": ["year"],
+        "metrics": [{"agg": "max", "column": "ward"}],
+        "windows": [{"func": func, "column": "ward", "order_by": "year", "n": 2}],
+    }
+    with session_scope() as session:
+        dataset_id = _import_yearly_fixture(session, tmp_path)
+        with pytest.raises(QueryValidationError, match="needs a numeric column"):
+            QueryRunner(session).run(dataset_id, query_spec)
+        query_spec["windows"] = [
+            {"func": "lag", "column": "ward", "order_by": "year"},
+            {"func": "rank", "column": "ward"},
+        ]
+        result = QueryRunner(session).run(dataset_id, query_spec)
+
+    assert [row["ward_max_lag"] for row in result["data"]][1:] == ["B", "B", "B"]
+
+
+def _import_welfare_fixture(session: Session, tmp_path: Path) -> int:
+    csv_path = tmp_path / "welfare.csv"
+    rows = ["ward,year,recipients,population"] + [
+        f"{ward},{year},{recipients},{recipients * 10}"
+        for ward, year, recipients in [
+            ("A", 2020, 5),
+            ("A", 2021, 6),
+            ("A", 2022, 7),
+            ("A", 2023, 8),
+            ("B", 2020, 1),
+            ("B", 2021, 2),
+            ("B", 2022, 3),
+            ("C", 2022, 9),
+        ]
+    ]
+    csv_path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    dataset = DatasetRepository(session).import_csv(
+        category_slug="welfare",
+        dataset_slug="welfare",
+        csv_path=csv_path,
+        dataset_name="生活保護",
+        description="受給者数",
+        year=2023,
+        index_columns=["ward", "year"],
+    )
+    return dataset.id
+
+
+def test_join_adds_columns_of_a_second_dataset(tmp_path: Path) -> None:
+    """Rows match on the shared index columns, in memory and when streaming."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    with session_scope() as session:
+        dataset_id = _import_yearly_fixture(session, tmp_path)
+        welfare_id = _import_welfare_fixture(session, tmp_path)
+        query_spec = {
+            "join": {"dataset_id": welfare_id},
+            "group_by": ["ward"],
+            "metrics": [
+                {"agg": "sum", "column": "population"},
+                {"agg": "sum", "column": "recipients"},
+                {"agg": "max", "column": "welfare.population"},
+            ],
+            "order_by": [{"column": "ward", "direction": "asc"}],
+        }
+        result = QueryRunner(session).run(dataset_id, query_spec)
+        streamed = QueryRunner(session, batch_size=3).run(
+            dataset_id,
+            query_spec,
+            streaming=True,
+        )
+
+    assert result["data"] == [
+        {
+            "ward": "A",
+            "population_sum": 452,
+            "recipients_sum": 26,
+            "welfare.population_max": 80,
+        },
+        {
+            "ward": "B",
+            "population_sum": 90,
+            "recipients_sum": 6,
+            "welfare.population_max": 30,
+        },
+    ]
+    assert result["summary"]["requested_rows"] == 7
+    assert "welfare.population" in {column["name"] for column in result["schema"]}
+    assert streamed["data"] == result["data"]
+
+
+def test_left_join_keeps_unmatched_rows(tmp_path: Path) -> None:
+    """A left join keeps rows without a partner, with nulls for its columns."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    with session_scope() as session:
+        dataset_id = _import_yearly_fixture(session, tmp_path)
+        welfare_id = _import_welfare_fixture(session, tmp_path)
+        result = QueryRunner(session).run(
+            dataset_id,
+            {
+                "join": {
+                    "dataset_id": welfare_id,
+                    "on": ["ward", "year"],
+                    "how": "left",
+                    "columns": ["recipients"],
+                },
+                "filters": [{"column": "recipients", "op": "is_null"}],
+                "group_by": ["ward", "year"],
+                "metrics": [{"agg": "count"}],
+            },
+        )
+
+    assert result["data"] == [{"ward": "B", "year": 2023, "count": 1}]
+
+
+@pytest.mark.parametrize(
+    ("join", "message"),
+    [
+        ({"dataset_id": 999}, "Unknown join dataset"),
+        ({"on": ["population"]}, "not an index column"),
+        ({"columns": ["missing"]}, "Unknown join column"),
+        ({"how": "outer"}, "Unsupported join type"),
+    ],
+)
+def test_join_is_validated(
+    tmp_path: Path,
+    join: dict[str, Any],
+    message: str,
+) -> None:
+    """Joins need an existing dataset, index keys and known columns."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    with session_scope() as session:
+        dataset_id = _import_yearly_fixture(session, tmp_path)
+        welfare_id = _import_welfare_fixture(session, tmp_path)
+        query_spec = {
+            "join": {"dataset_id": welfare_id, **join},
+            "metrics": [{"agg": "count"}],
+        }
+        with pytest.raises(QueryValidationError, match=message):
+            QueryRunner(session).run(dataset_id, query_spec)
+
+
+APPROXIMATE_SPEC: dict[str, Any] = {
+    "filters": [{"column": "population", "op": "gte", "value": 3}],
+    "group_by": ["ward"],
+    "metrics": [
+        {"agg": "count"},
+        {"agg": "sum", "column": "population"},
+        {"agg": "avg", "column": "population"},
+    ],
+    "order_by": [{"column": "ward", "direction": "asc"}],
+    "approximate": True,
+}
+
+
+def test_approximate_query_on_a_complete_sample_is_exact(tmp_path: Path) -> None:
+    """When every row is sampled the estimates are exact with zero-width bounds."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    with session_scope() as session:
+        dataset_id = _import_streaming_fixture(session, tmp_path)
+        runner = QueryRunner(session)
+        exact = runner.run(dataset_id, {**APPROXIMATE_SPEC, "approximate": False})
+        estimated = runner.run(dataset_id, APPROXIMATE_SPEC)
+
+    summary = estimated["summary"]
+    assert summary["approximate"] is True
+    assert summary["sample_rows"] == summary["population_rows"] == 11
+    for estimated_row, exact_row, bounds in zip(
+        estimated["data"],
+        exact["data"],
+        summary["confidence_intervals"],
+        strict=True,
+    ):
+        assert estimated_row == pytest.approx(exact_row)
+        for column in ("count", "population_sum", "population_mean"):
+            assert bounds[column] == pytest.approx([exact_row[column]] * 2)
+
+
+def test_approximate_query_reports_intervals_around_estimates(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A partial sample yields estimates inside their confidence intervals."""
+    monkeypatch.setenv("SAMPLE_STRATUM_SIZE", "2")
+    configure_engine("sqlite+pysqlite:///:memory:")
+    with session_scope() as session:
+        dataset_id = _import_streaming_fixture(session, tmp_path)
+        estimated = QueryRunner(session).run(dataset_id, APPROXIMATE_SPEC)
+
+    summary = estimated["summary"]
+    assert summary["sample_rows"] == 6
+    assert summary["population_rows"] == 11
+    assert summary["confidence_level"] == 0.95
+    for row, bounds in zip(
+        estimated["data"],
+        summary["confidence_intervals"],
+        strict=True,
+    ):
+        for column in ("count", "population_sum"):
+            low, high = bounds[column]
+            assert low <= row[column] <= high
+
+
+def test_approximate_query_without_current_sample_runs_exactly(
+    tmp_path: Path,
+) -> None:
+    """Records added outside the bulk path make the sample stale."""
+    configure_engine("sqlite+pysqlite:///:memory:")
+    with session_scope() as session:
+        dataset_id = _import_streaming_fixture(session, tmp_path)
+        repo = DatasetRepository(session)
+        dataset = repo.ensure_dataset(
+            "population",
+            "streaming",
+            "人口",
+            "ストリーミング集計",
+            2023,
+        )
+        repo.add_record(dataset, {"year": 2024, "ward": "A", "population": 7}, {})
+        result = QueryRunner(session).run(dataset_id, APPROXIMATE_SPEC)
+
+    assert result["summary"]["approximate"] is False
+    assert "confidence_intervals" not in result["summary"]
+    assert sum(row["count"] for row in result["data"]) == 10
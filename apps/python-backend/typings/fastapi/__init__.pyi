@@ -7,6 +7,7 @@ __all__ = [
     "Depends",
     "FastAPI",
     "HTTPException",
+    "Query",
     "status",
 ]
 
@@ -41,6 +42,21 @@ def Depends(
     use_cache: bool = True,
 ) -> _Depends: ...
 
+def Query(
+    default: Any = ...,
+    *,
+    alias: str | None = None,
+    title: str | None = None,
+    description: str | None = None,
+    gt: float | None = None,
+    ge: float | None = None,
+    lt: float | None = None,
+    le: float | None = None,
+    min_length: int | None = None,
+    max_length: int | None = None,
+    **kwargs: Any,
+) -> Any: ...
+
 class _Status:
     HTTP_200_OK: int
     HTTP_201_CREATED: int
@@ -115,5 +131,6 @@ class FastAPI:
         generate_unique_id_function: Callable[..., str] | None = None,
     ) -> Callable[[_F], _F]: ...
     def on_event(self, event_type: str) -> Callable[[_F], _F]: ...
+    def middleware(self, middleware_type: str) -> Callable[[_F], _F]: ...
 
     routes: list[Any]
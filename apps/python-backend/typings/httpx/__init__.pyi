@@ -1,4 +1,5 @@
-from typing import Any
+from types import TracebackType
+from typing import Any, Self
 
 class Response:
     status_code: int
@@ -6,3 +7,32 @@ class Response:
     text: str
 
     def json(self) -> Any: ...
+
+class HTTPError(Exception): ...
+
+class ASGITransport:
+    def __init__(self, app: Any, raise_app_exceptions: bool = True) -> None: ...
+
+class AsyncClient:
+    def __init__(
+        self,
+        *,
+        base_url: str = "",
+        headers: dict[str, str] | None = None,
+        timeout: float | None = ...,
+        transport: ASGITransport | None = None,
+    ) -> None: ...
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        json: Any = None,
+    ) -> Response: ...
+    async def __aenter__(self) -> Self: ...
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None: ...
@@ -1,4 +1,4 @@
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
 from contextlib import AbstractContextManager
 from typing import Any, overload
 
@@ -19,11 +19,20 @@ def raises(
     match: str | None = None,
 ) -> AbstractContextManager[Any]: ...
 
+def approx(
+    expected: Any,
+    rel: float | None = None,
+    abs: float | None = None,  # noqa: A002
+    *,
+    nan_ok: bool = False,
+) -> Any: ...
+
 class Mark:
     def skip(self, *, reason: str = "") -> Any: ...
+    def skipif(self, condition: bool, *, reason: str = "") -> Any: ...
     def parametrize(
         self,
-        argnames: str | list[str],
+        argnames: str | Sequence[str],
         argvalues: list[Any],
         *,
         ids: list[str] | None = None,
@@ -37,6 +46,7 @@ class MonkeyPatch:
     def delenv(self, name: str, raising: bool = True) -> None: ...
     def setattr(self, target: Any, name: str, value: Any) -> None: ...
     def delattr(self, target: Any, name: str) -> None: ...
+    def undo(self) -> None: ...
 
 class LogRecord:
     levelname: str